@@ -47,9 +47,9 @@ from .i18n import N_
 from .interaction import Interaction
 from .models import main
 from .models import selection
+from .models import tracked
 from .widgets import cfgactions
 from .widgets import standard
-from .widgets import startup
 from .settings import Session
 from .settings import Settings
 from . import cmd
@@ -63,6 +63,7 @@ from . import guicmds
 from . import hidpi
 from . import icons
 from . import i18n
+from . import perf
 from . import qtcompat
 from . import qtutils
 from . import resources
@@ -255,11 +256,16 @@ class ColaApplication:
         # Defer connection so that local cola.inotify is honored
         context = self.context
         monitor = context.fsmonitor
+        model = context.model
         monitor.files_changed.connect(
-            cmds.run(cmds.Refresh, context), type=Qt.QueuedConnection
+            partial(model.request_refresh, main.STATUS, update_index=True),
+            type=Qt.QueuedConnection,
         )
         monitor.config_changed.connect(
-            cmds.run(cmds.RefreshConfig, context), type=Qt.QueuedConnection
+            partial(model.request_refresh, main.CONFIG), type=Qt.QueuedConnection
+        )
+        model.refresh_scheduler.finished.connect(
+            partial(refresh_finished, context), type=Qt.QueuedConnection
         )
         # Start the filesystem monitor thread
         monitor.start()
@@ -380,38 +386,52 @@ def application_init(
     setup_environment()
     process_args(args, setup_repo=setup_repo)
 
+    if args.perf or args.perf_report:
+        perf.startup.on_complete(partial(perf_report, args))
+
     context = new_context(args, app_name=app_name)
     enforce_single_instance(context)
 
     timer = context.timer
-    timer.start('init')
-
     if setup_worktree:
-        new_worktree(context, args.repo, args.prompt)
+        with timer.phase('new_worktree'):
+            new_worktree(context, args.repo, args.prompt)
         if update:
-            context.model.update_status()
+            with timer.phase('update_status'):
+                context.model.update_status()
 
-    timer.stop('init')
-    if args.perf:
-        timer.display('init')
     return context
 
 
+def perf_report(args: argparse.Namespace, profile: perf.StartupProfile) -> None:
+    """Display and write the startup performance report"""
+    if args.perf:
+        profile.display()
+    if args.perf_report:
+        try:
+            profile.write(args.perf_report)
+        except OSError as exc:
+            core.print_stderr(f'error: unable to write {args.perf_report}: {exc}')
+
+
 def new_context(
     args: argparse.Namespace, app_name: str = 'Git Cola'
 ) -> ApplicationContext:
     """Create top-level ApplicationContext objects"""
     context = ApplicationContext(args)
+    context.timer = timer = perf.startup.timer
     context.timestamp = time.time()
     context.settings = args.settings or Settings.read()
-    context.git = git.create()
+    with timer.phase('git.create'):
+        context.git = git.create()
     context.cfg = gitcfg.create(context)
-    context.fsmonitor = fsmonitor.create(context)
+    with timer.phase('fsmonitor.create'):
+        context.fsmonitor = fsmonitor.create(context)
     context.selection = selection.create()
     context.model = main.create(context)
+    context.tracked_paths = tracked.create(context)
     context.app_name = app_name
     context.app = new_application(context, args)
-    context.timer = Timer()
 
     return context
 
@@ -490,6 +510,8 @@ def application_run(
     if stop:
         stop(context, view)
     context.app.stop()
+    # Report the startup timings when the main window was closed early.
+    perf.startup.complete()
 
     return result
 
@@ -497,6 +519,8 @@ def application_run(
 def initialize_view(context: ApplicationContext, view: ViewType) -> None:
     """Register the main widget and display it"""
     context.set_view(view)
+    FirstPaint(context, view)
+    context.timer.start('first_paint')
     view.show()
     if sys.platform == 'darwin':
         view.raise_()
@@ -559,6 +583,11 @@ def add_common_arguments(parser: argparse.ArgumentParser) -> None:
         '--perf', action='store_true', default=False, help=argparse.SUPPRESS
     )
 
+    # Write a JSON report with the startup timings
+    parser.add_argument(
+        '--perf-report', metavar='<file>', default=None, help=argparse.SUPPRESS
+    )
+
     # Specify the GUI theme
     parser.add_argument(
         '--theme', metavar='<name>', default=None, help='specify a GUI theme name'
@@ -603,6 +632,8 @@ def new_worktree(context: ApplicationContext, repo: str, prompt: bool) -> None:
         # If we've gotten into this loop then that means that neither the
         # current directory nor the default repository were available.
         # Prompt the user for a repository.
+        from .widgets import startup
+
         startup_dlg = startup.StartupDialog(context, parent)
         gitdir = startup_dlg.find_git_repo()
         if not gitdir:
@@ -641,9 +672,30 @@ def async_update(context: ApplicationContext) -> None:
     git-cola should startup as quickly as possible.
     """
     update_index = context.cfg.get('cola.updateindex', True)
-    update_status = partial(context.model.update_status, update_index=update_index)
-    task = qtutils.SimpleTask(update_status)
-    context.runtask.start(task)
+    scheduler = context.model.refresh_scheduler
+
+    def update_status_finished(_kinds):
+        scheduler.finished.disconnect(update_status_finished)
+        context.timer.stop('update_status')
+        startup_finished(context)
+
+    context.timer.start('update_status')
+    scheduler.finished.connect(update_status_finished)
+    context.model.request_refresh(main.STATUS, update_index=update_index)
+
+
+def refresh_finished(context: ApplicationContext, kinds) -> None:
+    """Follow up on refreshes that were run by the refresh scheduler"""
+    if main.FILES in kinds:
+        context.fsmonitor.refresh()
+        context.selection.selection_changed.emit()
+
+
+def startup_finished(context: ApplicationContext) -> None:
+    """Complete the startup profile once the window and status are ready"""
+    timer = context.timer
+    if timer.is_stopped('first_paint') and timer.is_stopped('update_status'):
+        perf.startup.complete()
 
 
 def startup_message() -> None:
@@ -684,40 +736,13 @@ def initialize() -> str:
             os.chdir('..')
 
 
-class Timer:
-    """Simple performance timer"""
-
-    def __init__(self) -> None:
-        self._data = {}
-
-    def start(self, key: str) -> None:
-        """Start a timer"""
-        now = time.time()
-        self._data[key] = [now, now]
-
-    def stop(self, key: str) -> float:
-        """Stop a timer and return its elapsed time"""
-        entry = self._data[key]
-        entry[1] = time.time()
-        return self.elapsed(key)
-
-    def elapsed(self, key: str) -> float:
-        """Return the elapsed time for a timer"""
-        entry = self._data[key]
-        return entry[1] - entry[0]
-
-    def display(self, key) -> None:
-        """Display a timer"""
-        elapsed = self.elapsed(key)
-        sys.stdout.write(f'{key}: {elapsed:.5f}s\n')
-
-
 class NullArgs:
     """Stub arguments for interactive API use"""
 
     def __init__(self) -> None:
         self.icon_themes = []
         self.perf = False
+        self.perf_report = None
         self.prompt = False
         self.repo = core.getcwd()
         self.session = None
@@ -742,8 +767,9 @@ class ApplicationContext:
         self.git: git.Git | None = None
         self.cfg: gitcfg.GitConfig | None = None
         self.model: main.MainModel | None = None
+        self.tracked_paths: tracked.TrackedPaths | None = None
         self.notifier = Notifier(self)
-        self.timer: Timer | None = None  # Timer
+        self.timer: perf.Timer | None = None
         self.runtask: qtutils.RunTask | None = None
         self.settings: Settings | None = None
         self.selection: selection.SelectionModel | None = None
@@ -811,6 +837,24 @@ class Notifier(QtCore.QObject):
         self.emit_log(f'[git] {message}')
 
 
+class FirstPaint(QtCore.QObject):
+    """Record the time at which the main window is first painted"""
+
+    def __init__(self, context: ApplicationContext, view: ViewType) -> None:
+        super().__init__(view)
+        self.context = context
+        view.installEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:
+        """Stop the "first_paint" timer when the first paint event is seen"""
+        if event.type() == QtCore.QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.context.timer.stop('first_paint')
+            perf.startup.window_shown()
+            startup_finished(self.context)
+        return False
+
+
 def find_git() -> str | None:
     """Return the path of git.exe, or None if we can't find it."""
     if not utils.is_win32():
@@ -1,7 +1,6 @@
 """Editor commands"""
 from __future__ import annotations
 import os
-import re
 import sys
 from fnmatch import fnmatch
 from io import StringIO
@@ -1508,14 +1507,14 @@ class DiffImage(EditModel):
         elif self.unmerged:
             images = self.unmerged_images()
         elif self.untracked:
-            images = [(filename, False)]
+            images = [main.ImageSource(filename)]
         else:
             images = []
 
         self.model.set_images(images)
         super().do()
 
-    def staged_images(self) -> list[Any | tuple[str, bool]]:
+    def staged_images(self) -> list[main.ImageSource]:
         context = self.context
         head = self.model.head
         missing_blob_oid = self.model.missing_blob_oid
@@ -1538,11 +1537,9 @@ class DiffImage(EditModel):
                 if annex:
                     annex_image = gitcmds.annex_path(context, head, filename)
                 if annex_image:
-                    images.append((annex_image, False))  # git annex HEAD
+                    images.append(main.ImageSource(annex_image))  # git annex HEAD
                 else:
-                    image = gitcmds.write_blob_path(context, head, old_oid, filename)
-                    if image:
-                        images.append((image, True))
+                    images.append(main.ImageSource(filename, old_oid))
 
             if new_oid != missing_blob_oid:
                 found_in_annex = False
@@ -1551,17 +1548,15 @@ class DiffImage(EditModel):
                     if status == 0:
                         details = out.split(' ')
                         if details and details[0] == 'A':  # newly added file
-                            images.append((filename, False))
+                            images.append(main.ImageSource(filename))
                             found_in_annex = True
 
                 if not found_in_annex:
-                    image = gitcmds.write_blob(context, new_oid, filename)
-                    if image:
-                        images.append((image, True))
+                    images.append(main.ImageSource(filename, new_oid))
 
         return images
 
-    def unmerged_images(self) -> list[tuple[str, bool]]:
+    def unmerged_images(self) -> list[main.ImageSource]:
         context = self.context
         head = self.model.head
         missing_blob_oid = self.model.missing_blob_oid
@@ -1580,9 +1575,9 @@ class DiffImage(EditModel):
             for merge_head in merge_heads:
                 image = gitcmds.annex_path(context, merge_head, filename)
                 if image:
-                    annex_images.append((image, False))
+                    annex_images.append(main.ImageSource(image))
             if annex_images:
-                annex_images.append((filename, False))
+                annex_images.append(main.ImageSource(filename))
                 return annex_images
 
         # DIFF FORMAT FOR MERGES
@@ -1612,21 +1607,13 @@ class DiffImage(EditModel):
                 for i in range(num_parents):
                     offset = num_parents + i + 1
                     oid = parts[offset]
-                    try:
-                        merge_head = merge_heads[i]
-                    except IndexError:
-                        merge_head = 'HEAD'
                     if oid != missing_blob_oid:
-                        image = gitcmds.write_blob_path(
-                            context, merge_head, oid, filename
-                        )
-                        if image:
-                            images.append((image, True))
+                        images.append(main.ImageSource(filename, oid))
 
-        images.append((filename, False))
+        images.append(main.ImageSource(filename))
         return images
 
-    def modified_images(self) -> list[tuple[str, bool]]:
+    def modified_images(self) -> list[main.ImageSource]:
         context = self.context
         head = self.model.head
         missing_blob_oid = self.model.missing_blob_oid
@@ -1638,18 +1625,16 @@ class DiffImage(EditModel):
         if annex:  # Check for a pre-image from git-annex
             annex_image = gitcmds.annex_path(context, head, filename)
         if annex_image:
-            images.append((annex_image, False))  # git annex HEAD
+            images.append(main.ImageSource(annex_image))  # git annex HEAD
         else:
             worktree = self.git.diff_files('--', filename)[STDOUT]
             parts = worktree.split(' ')
             if len(parts) > 3:
                 oid = parts[2]
                 if oid != missing_blob_oid:
-                    image = gitcmds.write_blob_path(context, head, oid, filename)
-                    if image:
-                        images.append((image, True))  # HEAD
+                    images.append(main.ImageSource(filename, oid))  # HEAD
 
-        images.append((filename, False))  # worktree
+        images.append(main.ImageSource(filename))  # worktree
         return images
 
 
@@ -2853,22 +2838,19 @@ def check_conflicts(context: ApplicationContext, unmerged: list[Any]) -> list[An
 
     """
     if prefs.check_conflicts(context):
-        unmerged = [path for path in unmerged if is_conflict_free(path)]
+        markers = gitcmds.conflict_markers(unmerged)
+        unmerged = [
+            path
+            for path in unmerged
+            if not markers[path] or should_stage_conflicts(path)
+        ]
     return unmerged
 
 
 def is_conflict_free(path) -> bool:
     """Return True if `path` contains no conflict markers"""
-    rgx = re.compile(r'^(<<<<<<<|\|\|\|\|\|\|\||>>>>>>>) ')
-    try:
-        with core.xopen(path, 'rb') as f:
-            for line in f:
-                line = core.decode(line, errors='ignore')
-                if rgx.match(line):
-                    return should_stage_conflicts(path)
-    except OSError:
-        # We can't read this file ~ we may be staging a removal
-        pass
+    if gitcmds.conflict_marker_lines(path):
+        return should_stage_conflicts(path)
     return True
 
 
@@ -278,9 +278,9 @@ def prep_for_subprocess(cmd: list[UStr | str], shell: bool = False) -> list[UStr
 
 @interruptable
 def communicate(
-    proc: subprocess.Popen,
+    proc: subprocess.Popen, input_data: bytes | None = None
 ) -> tuple[None, bytes] | tuple[bytes, bytes]:
-    return proc.communicate()
+    return proc.communicate(input_data)
 
 
 def run_command(cmd: list[UStr | str], *args, **kwargs) -> tuple[int, UStr, UStr]:
@@ -288,19 +288,44 @@ def run_command(cmd: list[UStr | str], *args, **kwargs) -> tuple[int, UStr, UStr
 
     This provides a simpler interface to the subprocess module.
     The results are formatted as a 3-tuple: (exit_code, output, errors)
+    The "input_data" argument is written to the command's stdin.
     The other arguments are passed on to start_command().
 
     """
     encoding = kwargs.pop('encoding', None)
+    input_data = kwargs.pop('input_data', None)
+    if input_data is not None:
+        input_data = encode(input_data, encoding=encoding)
+    exit_code, output, errors = run_command_raw(
+        cmd, *args, input_data=input_data, **kwargs
+    )
+    return (
+        exit_code,
+        decode_output(output, encoding=encoding),
+        decode_output(errors, encoding=encoding),
+    )
+
+
+def run_command_raw(
+    cmd: list[UStr | str], *args, **kwargs
+) -> tuple[int, bytes | None, bytes | None]:
+    """Run the given command to completion and return its undecoded results
+
+    The "input_data" argument is written to the command's stdin as-is.
+    The other arguments are passed on to start_command().
+    """
+    input_data = kwargs.pop('input_data', None)
     try:
         process = start_command(cmd, *args, **kwargs)
     except FileNotFoundError as err:
-        return (EXIT_UNAVAILABLE, UStr('', ENCODING), UStr(f'{err}', ENCODING))
-    (output, errors) = communicate(process)
-    output = decode(output, encoding=encoding)
-    errors = decode(errors, encoding=encoding)
-    exit_code = process.returncode
-    return (exit_code, output or UStr('', ENCODING), errors or UStr('', ENCODING))
+        return (EXIT_UNAVAILABLE, b'', encode(f'{err}'))
+    (output, errors) = communicate(process, input_data)
+    return (process.returncode, output, errors)
+
+
+def decode_output(value: bytes | None, encoding: str | None = None) -> UStr:
+    """Decode the output of a command, which may be missing"""
+    return decode(value, encoding=encoding) or UStr('', ENCODING)
 
 
 @interruptable
@@ -1,5 +1,4 @@
 """Display models and utility functions"""
-import collections
 from datetime import datetime
 from typing import Any, TYPE_CHECKING
 
@@ -21,42 +20,59 @@ if TYPE_CHECKING:
 NOTIFICATIONS_AVAILABLE = bool(notify2 or notifypy)
 
 
+# Paths that need more trailing components than this are displayed in full.
+MAX_SUFFIX_COMPONENTS = 128
+
+
+class SuffixNode:
+    """A node in a trie of reversed path components"""
+
+    __slots__ = ('count', 'ends', 'children')
+
+    def __init__(self) -> None:
+        self.count = 0  # The number of paths that share this suffix.
+        self.ends = 0  # The number of paths that are exactly this suffix.
+        self.children: dict[str, SuffixNode] = {}
+
+
 def shorten_paths(source_paths) -> dict[Any, Any]:
-    """Shorten a sequence of paths into unique strings for display"""
-    result = {}
-    # Start by assuming that all paths are in conflict.
-    # On each iteration we will collect all the path suffixes, move the newly
-    # unique entries to the result, and repeat until no conflicts remain.
-    count = 0
-    conflicts = list(source_paths)
-    in_conflict = True
-    while in_conflict:
-        count += 1
-        # Gather the suffixes for the current paths in conflict
-        suffixes = collections.defaultdict(list)
-        for path in conflicts:
-            suffix = path_suffix(path, count)
-            suffixes[suffix].append(path)
-
-        # Loop over the suffixes to gather new conflicts and unique entries.
-        conflicts = []
-        in_conflict = False
-
-        for suffix, paths in suffixes.items():
-            # If only a single path exists for the suffix then no conflict
-            # exists, and the suffix is valid.
-            if len(paths) == 1:
-                result[paths[0]] = suffix
-            # If this loop runs too long then bail out by using the full path.
-            elif count >= 128:
-                for path in paths:
-                    result[path] = path
-            # If multiple paths map to the same suffix then the paths are
-            # considered in conflict, and will be reprocessed.
-            else:
-                conflicts.extend(paths)
-                in_conflict = True
+    """Shorten a sequence of paths into unique strings for display
+
+    Each path is displayed using its shortest suffix of trailing components
+    that no other path shares. The suffixes are found by inserting each path's
+    components in reverse into a trie that counts the paths below each node, so
+    the work is linear in the total number of path components.
+    """
+    paths = list(source_paths)
+    all_parts = [normalize_path(path).split('/') for path in paths]
+    root = SuffixNode()
+    for parts in all_parts:
+        node = root
+        for part in reversed(parts):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = SuffixNode()
+            node = child
+            node.count += 1
+        node.ends += 1
 
+    result = {}
+    for path, parts in zip(paths, all_parts):
+        node = root
+        size = 0
+        for part in reversed(parts):
+            node = node.children[part]
+            size += 1
+            if node.count == 1:
+                break
+        if node.count == 1 and size <= MAX_SUFFIX_COMPONENTS:
+            result[path] = '/'.join(parts[-size:])
+        elif node.ends == 1 and size < MAX_SUFFIX_COMPONENTS:
+            # Other paths extend this path, so the full path is unique.
+            result[path] = '/'.join(parts)
+        else:
+            # Duplicate paths are displayed as-is.
+            result[path] = path
     return result
 
 
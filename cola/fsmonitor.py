@@ -19,7 +19,6 @@ from qtpy.QtCore import Signal
 
 from . import utils
 from . import core
-from . import gitcmds
 from . import version
 from .compat import bchr
 from .i18n import N_
@@ -277,9 +276,12 @@ if AVAILABLE == 'inotify':
             context = self.context
             try:
                 if self._worktree is not None:
+                    snapshot = context.tracked_paths.snapshot()
                     tracked_dirs = {
-                        os.path.dirname(os.path.join(self._worktree, path))
-                        for path in gitcmds.tracked_files(context)
+                        os.path.join(self._worktree, dirname)
+                        if dirname
+                        else self._worktree
+                        for dirname in snapshot.file_dirs()
                     }
                     self._refresh_watches(
                         tracked_dirs,
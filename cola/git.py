@@ -9,6 +9,7 @@ import time
 from typing import Any, TYPE_CHECKING
 
 from . import core
+from . import perf
 from .compat import int_types
 from .compat import ustr
 from .compat import WIN32
@@ -262,6 +263,7 @@ class Git:
         _cwd: TextType | None = None,
         _decode: bool = True,
         _encoding: str | None = None,
+        _input: TextType | bytes | None = None,
         _raw: bool = False,
         _stdin: int | None = None,
         _stderr: int | None = subprocess.PIPE,
@@ -276,6 +278,7 @@ class Git:
         :param _cwd: working directory, defaults to the current directory.
         :param _decode: whether to decode output, defaults to True.
         :param _encoding: default encoding, defaults to None (utf-8).
+        :param _input: optional data to write to the command's stdin.
         :param _readonly: avoid taking the index lock. Assume the command is read-only.
         :param _raw: do not strip trailing whitespace.
         :param _stdin: optional stdin filehandle.
@@ -295,19 +298,22 @@ class Git:
             # process from the console it should fork and call os.setsid().
             extra['preexec_fn'] = os.setsid
 
-        start_time = time.time()
+        if _input is not None:
+            _input = core.encode(_input, encoding=_encoding)
+
+        start_time = time.perf_counter()
 
         # Start the process
         # Guard against thread-unsafe .git/index.lock files
         if not _readonly:
             _index_lock.acquire()
         try:
-            status, out, err = core.run_command(
+            status, out, err = core.run_command_raw(
                 command,
                 add_env=_add_env,
                 cwd=_cwd,
-                encoding=_encoding,
-                stdin=_stdin,
+                input_data=_input,
+                stdin=subprocess.PIPE if _input is not None else _stdin,
                 stdout=_stdout,
                 stderr=_stderr,
                 no_win32_startupinfo=_no_win32_startupinfo,
@@ -318,8 +324,13 @@ class Git:
             if not _readonly:
                 _index_lock.release()
 
-        end_time = time.time()
+        end_time = time.perf_counter()
         elapsed_time = abs(end_time - start_time)
+        # The output size is recorded before decoding so that it costs nothing.
+        stdout_bytes = len(out) if out else 0
+        perf.record_git_command(command, start_time, elapsed_time, status, stdout_bytes)
+        out = core.decode_output(out, encoding=_encoding)
+        err = core.decode_output(err, encoding=_encoding)
 
         if not _raw and out is not None:
             out = core.UStr(out.rstrip('\n'), out.encoding)
@@ -353,6 +364,7 @@ class Git:
             '_cwd',
             '_decode',
             '_encoding',
+            '_input',
             '_stdin',
             '_stdout',
             '_stderr',
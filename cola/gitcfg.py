@@ -6,6 +6,7 @@ import copy
 import fnmatch
 import os
 import struct
+import threading
 from typing import Any, Callable, TYPE_CHECKING
 
 try:
@@ -20,6 +21,7 @@ from qtpy import QtCore
 from qtpy.QtCore import Signal
 
 from . import core
+from . import perf
 from . import utils
 from . import version
 from . import resources
@@ -111,22 +113,27 @@ class GitConfig(QtCore.QObject):
         self._cache_paths = []
         self._attr_cache = {}
         self._binary_cache = {}
+        # Serializes updates. Readers are not blocked because updates build new
+        # dicts and replace the old ones once they are complete.
+        self._lock = threading.RLock()
 
     def reset(self) -> None:
-        self._cache_key = None
-        self._cache_paths = []
-        self._attr_cache.clear()
-        self._binary_cache.clear()
-        self.reset_values()
+        with self._lock:
+            self._cache_key = None
+            self._cache_paths = []
+            self._attr_cache.clear()
+            self._binary_cache.clear()
+            self.reset_values()
 
     def reset_values(self) -> None:
-        self._system.clear()
-        self._global.clear()
-        self._global_or_system.clear()
-        self._local.clear()
-        self._all.clear()
-        self._renamed_keys.clear()
-        self._multi_values.clear()
+        with self._lock:
+            self._system = {}
+            self._global = {}
+            self._global_or_system = {}
+            self._local = {}
+            self._all = {}
+            self._renamed_keys = {}
+            self._multi_values = collections.defaultdict(list)
 
     def user(self) -> dict[Any, Any]:
         return copy.deepcopy(self._global)
@@ -151,8 +158,21 @@ class GitConfig(QtCore.QObject):
         """Read git config value into the system, user and repo dicts."""
         if self._is_cached():
             return
-
-        self.reset_values()
+        with self._lock:
+            # Another thread may have updated the values while we waited.
+            if self._is_cached():
+                return
+            with perf.startup.timer.phase('gitcfg.update'):
+                self._update()
+
+    def _update(self) -> None:
+        system = {}
+        global_ = {}
+        global_or_system = {}
+        local = {}
+        all_values = {}
+        renamed_keys = {}
+        multi_values = collections.defaultdict(list)
 
         show_scope = version.check_git(self.context, 'config-show-scope')
         show_origin = version.check_git(self.context, 'config-show-origin')
@@ -171,32 +191,41 @@ class GitConfig(QtCore.QObject):
         cache_paths = set()
 
         for current_scope, current_key, current_value, continuation in reader(
-            self.context, cache_paths, self._renamed_keys
+            self.context, cache_paths, renamed_keys
         ):
             # Store the values for fast cached lookup.
-            self._all[current_key] = current_value
+            all_values[current_key] = current_value
 
             # macOS has credential.helper=osxkeychain in the "unknown" scope from
             # /Applications/Xcode.app/Contents/Developer/usr/share/git-core/gitconfig.
             # Treat "unknown" as equivalent to "system" (lowest priority).
             if current_scope in (system_scope, unknown_scope):
-                self._system[current_key] = current_value
-                self._global_or_system[current_key] = current_value
+                system[current_key] = current_value
+                global_or_system[current_key] = current_value
             elif current_scope == global_scope:
-                self._global[current_key] = current_value
-                self._global_or_system[current_key] = current_value
+                global_[current_key] = current_value
+                global_or_system[current_key] = current_value
             # "worktree" is treated as equivalent to "local".
             elif current_scope in (local_scope, worktree_scope):
-                self._local[current_key] = current_value
+                local[current_key] = current_value
 
             # Add this value to the multi-values storage used by get_all().
             # This allows us to handle keys that store multiple values.
             if continuation:
                 # If this is a continuation line then we should *not* append to its
                 # multi-values list. We should update it in-place.
-                self._multi_values[current_key][-1] = current_value
+                multi_values[current_key][-1] = current_value
             else:
-                self._multi_values[current_key].append(current_value)
+                multi_values[current_key].append(current_value)
+
+        # Replace the values all at once so that readers never see partial values.
+        self._system = system
+        self._global = global_
+        self._global_or_system = global_or_system
+        self._local = local
+        self._all = all_values
+        self._renamed_keys = renamed_keys
+        self._multi_values = multi_values
 
         # Update the cache
         self._cache_paths = sorted(cache_paths)
@@ -207,14 +236,17 @@ class GitConfig(QtCore.QObject):
 
     def _get(
         self,
-        src: dict[str, ConfigValue],
+        scope: str,
         key: str,
         default: ConfigValue,
         func: Callable[[], bool] | None = None,
         cached: bool = True,
     ) -> Any:
+        """Return a value from the dict named by "scope", e.g. "_all" """
+        src = getattr(self, scope)
         if not cached or not src:
             self.update()
+            src = getattr(self, scope)
         try:
             value = self._get_value(src, key)
         except KeyError:
@@ -247,7 +279,7 @@ class GitConfig(QtCore.QObject):
         cached: bool = True,
     ) -> Any:
         """Return the string value for a config key."""
-        return self._get(self._all, key, default, func=func, cached=cached)
+        return self._get('_all', key, default, func=func, cached=cached)
 
     def get_all(self, key: str) -> list[Any]:
         """Return all values for a key sorted in priority order
@@ -275,29 +307,30 @@ class GitConfig(QtCore.QObject):
         """
         if not self._multi_values:
             self.update()
+        multi_values = self._multi_values
         # Check for this key as-is.
-        if key in self._multi_values:
-            return self._multi_values[key]
+        if key in multi_values:
+            return multi_values[key]
 
         # Check for a renamed version of this key (x.kittycat -> x.kittyCat)
         renamed_key = self._renamed_keys.get(key.lower(), key)
-        if renamed_key in self._multi_values:
-            return self._multi_values[renamed_key]
+        if renamed_key in multi_values:
+            return multi_values[renamed_key]
 
         key_lower = key.lower()
-        if key_lower in self._multi_values:
-            return self._multi_values[key_lower]
+        if key_lower in multi_values:
+            return multi_values[key_lower]
         # Nothing found -> empty list.
         return []
 
     def get_user(self, key, default=None) -> Any:
-        return self._get(self._global, key, default)
+        return self._get('_global', key, default)
 
     def get_repo(self, key: str, default: ConfigValue | None = None) -> str:
-        return self._get(self._local, key, default)
+        return self._get('_local', key, default)
 
     def get_user_or_system(self, key, default=None) -> Any:
-        return self._get(self._global_or_system, key, default)
+        return self._get('_global_or_system', key, default)
 
     def get_object_format(self) -> str:
         """Return the cached repostiory object format (sha256, sha1)"""
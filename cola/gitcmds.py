@@ -1,9 +1,14 @@
 """Git commands and queries for Git"""
 from __future__ import annotations
-from collections.abc import Iterator
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
+import mmap
 import os
 import re
+import threading
 from io import StringIO
 from typing import Any, TYPE_CHECKING
 
@@ -13,7 +18,6 @@ from . import utils
 from . import version
 from .git import STDOUT
 from .i18n import N_
-from .interaction import Interaction
 from .models import dag
 from .models import prefs
 
@@ -22,18 +26,51 @@ if TYPE_CHECKING:
     from .git import Git
     from .types import TextType
 
+# The maximum number of git queries that are run concurrently by run_queries().
+MAX_CONCURRENT_QUERIES = 6
+# Lines that start with a conflict marker. "=======" is not considered
+# because it is commonly used to underline headings.
+CONFLICT_MARKER_REGEX = re.compile(
+    rb'^(?:<<<<<<<|\|\|\|\|\|\|\||>>>>>>>) ', re.MULTILINE
+)
+
 
 def add(
     context: ApplicationContext, items: list[str], u: bool = False
 ) -> tuple[int, str, str]:
     """Run "git add" while preventing argument overflow"""
-    git_add = context.git.add
     if prefs.verbose_simple_commands(context):
         log_paths = core.list2cmdline(items)
         context.notifier.git_cmd(f'git add -- {log_paths}')
-    return utils.slice_func(
-        items, lambda paths: git_add('--', force=True, verbose=True, u=u, *paths)
-    )
+    return run_with_pathspecs(context, 'add', items, force=True, verbose=True, u=u)
+
+
+def run_with_pathspecs(
+    context: ApplicationContext, cmd: str, paths: list[str], *args, **kwargs
+) -> tuple[int, str, str]:
+    """Run a git command over paths using a single process
+
+    The paths are written to the command's stdin using "--pathspec-from-file".
+    Older versions of git run the command over slices of the paths to avoid
+    "Argument list too long" errors.
+    """
+    func = getattr(context.git, cmd)
+    if not paths:
+        return (0, '', '')
+    if version.check_git(context, 'pathspec-from-file'):
+        return func(
+            pathspec_from_file='-',
+            pathspec_file_nul=True,
+            _input=_nul_separated(paths),
+            *args,
+            **kwargs,
+        )
+    return utils.slice_func(paths, lambda chunk: func(*args, '--', *chunk, **kwargs))
+
+
+def _nul_separated(paths: list[str]) -> bytes:
+    """Encode paths as NUL-terminated records for --pathspec-file-nul and -z"""
+    return b''.join(core.encode(path) + b'\0' for path in paths)
 
 
 def apply_diff(context: ApplicationContext, filename: str) -> Any:
@@ -106,6 +143,70 @@ def changed_files(context: ApplicationContext, oid: str) -> list[str]:
     return result
 
 
+def changed_files_for_oids(
+    context: ApplicationContext, oids: list[str]
+) -> dict[str, list[str]] | None:
+    """Return the filenames changed by each commit using a single "git diff-tree"
+
+    Commits are compared against their first parent, as with changed_files().
+    The result maps each of the specified oids to its list of changed paths.
+    None is returned when the oids cannot be resolved, eg. when an abbreviated
+    oid is ambiguous, so that callers can fall back to changed_files().
+    """
+    oids = list(dict.fromkeys(oids))
+    if not oids:
+        return {}
+    git = context.git
+    # Resolve abbreviated oids and their first parents. "diff-tree --stdin"
+    # only accepts full object names.
+    status, out, _ = git.rev_list(
+        '--stdin',
+        '--no-walk=unsorted',
+        '--parents',
+        _input='\n'.join(oids) + '\n',
+        _readonly=True,
+    )
+    lines = out.splitlines() if status == 0 else []
+    if len(lines) != len(oids):
+        return None
+    commits = [line.split() for line in lines]
+    for oid, commit in zip(oids, commits):
+        if not commit[0].startswith(oid):
+            return None
+
+    # Compare each commit against its first parent only. Root commits are
+    # compared against the empty tree using --root.
+    stdin = ''.join(' '.join(commit[:2]) + '\n' for commit in commits)
+    status, out, _ = git.diff_tree(
+        '--stdin',
+        '--always',
+        '--root',
+        name_only=True,
+        r=True,
+        z=True,
+        _input=stdin,
+        _readonly=True,
+    )
+    if status != 0:
+        return None
+    # The output is "<oid>\0<path>\0<path>\0...<oid>\0..." in input order.
+    result = {}
+    entries = iter(out.split('\0'))
+    next_oid = next(entries, None)
+    for idx, (oid, commit) in enumerate(zip(oids, commits)):
+        if next_oid != commit[0]:
+            return None
+        following = commits[idx + 1][0] if idx + 1 < len(commits) else None
+        paths = result[oid] = []
+        for entry in entries:
+            if entry == following:
+                break
+            if entry:
+                paths.append(entry)
+        next_oid = following
+    return result
+
+
 def diff_tree(
     context: ApplicationContext, *args
 ) -> tuple[TextType, TextType, TextType]:
@@ -119,24 +220,36 @@ def git_diff_tree(git_repo: Git, *args) -> tuple[TextType, TextType, TextType]:
     )
 
 
-def listdir(context: ApplicationContext, dirname: str, ref: str = 'HEAD'):
+def listdir(
+    context: ApplicationContext,
+    dirname: str,
+    ref: str = 'HEAD',
+    tracked: tuple[list[str], list[str]] | None = None,
+):
     """Get the contents of a directory according to Git
 
     Query Git for the content of a directory, taking ignored
     files into account.
 
+    :param tracked: (dirs, files) tuple of tracked entries, e.g. from the
+        tracked paths cache. "git ls-tree <ref>" is used when not specified.
+
     """
     dirs = []
     files = []
 
-    # first, parse git ls-tree to get the tracked files
-    # in a list of (type, path) tuples
-    entries = ls_tree(context, dirname, ref=ref)
-    for entry in entries:
-        if entry[0][0] == 't':  # tree
-            dirs.append(entry[1])
-        else:
-            files.append(entry[1])
+    if tracked is not None:
+        dirs.extend(tracked[0])
+        files.extend(tracked[1])
+    else:
+        # first, parse git ls-tree to get the tracked files
+        # in a list of (type, path) tuples
+        entries = ls_tree(context, dirname, ref=ref)
+        for entry in entries:
+            if entry[0][0] == 't':  # tree
+                dirs.append(entry[1])
+            else:
+                files.append(entry[1])
 
     # gather untracked files
     untracked = untracked_files(context, paths=[dirname], directory=True)
@@ -197,9 +310,20 @@ class CurrentBranchCache:
     value = None
 
 
+class LogPageCache:
+    """Cache for LogPages.page()"""
+
+    # The number of pages that are kept in memory.
+    size = 16
+    pages: OrderedDict[tuple, tuple[list[str], list[str]]] = OrderedDict()
+    lock = threading.Lock()
+
+
 def reset() -> None:
     """Reset cached value in this module (e.g. the cached current branch)"""
     CurrentBranchCache.key = None
+    with LogPageCache.lock:
+        LogPageCache.pages.clear()
 
 
 def current_branch(context: ApplicationContext) -> core.UStr:
@@ -675,12 +799,10 @@ def reset_paths(
 ) -> tuple[int, str, str]:
     """Run "git reset" while preventing argument overflow"""
     items = list(set(items))
-    func = context.git.reset
     if prefs.verbose_simple_commands(context):
         log_paths = core.list2cmdline(items)
         context.notifier.git_cmd(f'git reset -- {log_paths}')
-    status, out, err = utils.slice_func(items, lambda paths: func(head, '--', *paths))
-    return (status, out, err)
+    return run_with_pathspecs(context, 'reset', items, head)
 
 
 def unstage_paths(
@@ -701,7 +823,52 @@ def untrack_paths(context: ApplicationContext, args: list[str]) -> tuple[int, st
     if prefs.verbose_simple_commands(context):
         log_paths = core.list2cmdline(args)
         context.notifier.git_cmd(f'git update-index --force-remove -- {log_paths}')
-    return context.git.update_index('--', force_remove=True, *set(args))
+    # The paths are streamed to a single process to avoid argument overflow.
+    return context.git.update_index(
+        force_remove=True, z=True, stdin=True, _input=_nul_separated(set(args))
+    )
+
+
+def run_queries(
+    queries: dict[str, Callable[[], Any]], max_workers: int = MAX_CONCURRENT_QUERIES
+) -> dict[str, Any]:
+    """Run independent queries concurrently and return their results by name
+
+    Queries that run commands without "_readonly=True" are still serialized
+    by the index lock in Git.execute().
+    """
+    if len(queries) < 2:
+        return {name: query() for name, query in queries.items()}
+    max_workers = min(max_workers, len(queries))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(query) for name, query in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def conflict_marker_lines(path: str) -> list[int]:
+    """Return the line numbers of the conflict markers in a file"""
+    lines = []
+    try:
+        with core.xopen(path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return lines
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                line = 1
+                offset = 0
+                for match in CONFLICT_MARKER_REGEX.finditer(data):
+                    start = match.start()
+                    line += data[offset:start].count(b'\n')
+                    offset = start
+                    lines.append(line)
+    except (OSError, ValueError):
+        # We can't read this file ~ we may be staging a removal
+        pass
+    return lines
+
+
+def conflict_markers(paths: list[str]) -> dict[str, list[int]]:
+    """Scan files concurrently and return the conflict marker lines for each path"""
+    return run_queries({path: partial(conflict_marker_lines, path) for path in paths})
 
 
 def worktree_state(
@@ -718,24 +885,44 @@ def worktree_state(
     """
     if update_index:
         context.git.update_index(refresh=True)
-
-    staged, unmerged, staged_deleted, staged_submods = diff_index(
-        context, head, paths=paths
+    queries = worktree_state_queries(
+        context, head=head, display_untracked=display_untracked, paths=paths
     )
-    modified, unstaged_deleted, modified_submods = diff_worktree(context, paths)
+    return worktree_state_from_results(run_queries(queries))
+
+
+def worktree_state_queries(
+    context: ApplicationContext,
+    head: str = 'HEAD',
+    display_untracked: bool = True,
+    paths: list[str] | None = None,
+) -> dict[str, Callable[[], Any]]:
+    """Return the independent read-only queries used by worktree_state()"""
+    queries = {
+        'diff_index': partial(diff_index, context, head, paths=paths),
+        'diff_worktree': partial(diff_worktree, context, paths),
+        # Look for upstream modified files if this is a tracking branch
+        'upstream_changed': partial(diff_upstream, context, head),
+    }
     if display_untracked:
-        untracked = untracked_files(context, paths=paths)
-    else:
-        untracked = []
+        queries['untracked'] = partial(untracked_files, context, paths=paths)
+    return queries
+
+
+def worktree_state_from_results(
+    results: dict[str, Any],
+) -> dict[str, list[str] | list[Any] | set[str] | set[Any]]:
+    """Combine the results of worktree_state_queries() into a worktree state"""
+    staged, unmerged, staged_deleted, staged_submods = results['diff_index']
+    modified, unstaged_deleted, modified_submods = results['diff_worktree']
+    untracked = results.get('untracked', [])
+    upstream_changed = results['upstream_changed']
 
     # Remove unmerged paths from the modified list
     if unmerged:
         unmerged_set = set(unmerged)
         modified = [path for path in modified if path not in unmerged_set]
 
-    # Look for upstream modified files if this is a tracking branch
-    upstream_changed = diff_upstream(context, head)
-
     # Keep stuff sorted
     staged.sort()
     modified.sort()
@@ -755,6 +942,22 @@ def worktree_state(
     }
 
 
+def filter_worktree_state(
+    state: dict[str, Any], status_filter: re.Pattern[str] | None
+) -> dict[str, Any]:
+    """Return a worktree state whose status lists only contain matching paths
+
+    status_filter is a regex from utils.compile_path_filter().
+    """
+    if status_filter is None:
+        return state
+    search = status_filter.search
+    filtered = dict(state)
+    for key in ('staged', 'modified', 'unmerged', 'untracked'):
+        filtered[key] = [path for path in state.get(key, []) if search(path)]
+    return filtered
+
+
 def _parse_raw_diff(out: TextType) -> Iterator[tuple[str, str, bool]]:
     while out:
         info, path, out = out.split('\0', 2)
@@ -931,23 +1134,89 @@ def parse_rev_list(raw_revs) -> list[tuple[str, str]]:
 
 
 def log_helper(
-    context: ApplicationContext, all: bool = False, extra_args=None
+    context: ApplicationContext,
+    all: bool = False,
+    extra_args=None,
+    max_count: int | None = None,
+    skip: int = 0,
 ) -> tuple[list[str], list[str]]:
-    """Return parallel arrays containing oids and summaries."""
+    """Return parallel arrays containing oids and summaries.
+
+    Use "max_count" and "skip" to read a window of the history.
+    """
     revs = []
     summaries = []
     args = []
     if extra_args:
         args = extra_args
-    output = log(context, pretty='oneline', all=all, *args)
+    kwargs = {}
+    if max_count is not None:
+        kwargs['max_count'] = max_count
+    if skip:
+        kwargs['skip'] = skip
+    output = log(context, pretty='format:%H %s', all=all, *args, **kwargs)
     for line in output.splitlines():
-        match = REV_LIST_REGEX.match(line)
-        if match:
-            revs.append(match.group(1))
-            summaries.append(match.group(2))
+        oid, _, summary = line.partition(' ')
+        if oid:
+            revs.append(oid)
+            summaries.append(summary)
     return (revs, summaries)
 
 
+class LogPages:
+    """Read the oids and summaries from "git log" in fixed-size pages
+
+    Pages are cached by the commit that HEAD points to, and by all of the refs
+    when "all" is specified, so the cache is only used while the history that
+    is being read has not changed.
+    """
+
+    page_size = 1000
+
+    def __init__(
+        self,
+        context: ApplicationContext,
+        all: bool = False,
+        extra_args: list[str] | None = None,
+        page_size: int | None = None,
+    ) -> None:
+        self.context = context
+        self.all = all
+        self.extra_args = list(extra_args or [])
+        if page_size is not None:
+            self.page_size = page_size
+        self.key = (self._tip(), all, tuple(self.extra_args), self.page_size)
+
+    def _tip(self) -> str:
+        """Return a key identifying the state of the history"""
+        git = self.context.git
+        if self.all:
+            out = git.for_each_ref(format='%(objectname)', _readonly=True)[STDOUT]
+            return out + '\n' + git.rev_parse('HEAD', _readonly=True)[STDOUT]
+        return git.rev_parse('HEAD', _readonly=True)[STDOUT]
+
+    def page(self, index: int) -> tuple[list[str], list[str]]:
+        """Return the oids and summaries for a page. Page 0 is the newest"""
+        key = self.key + (index,)
+        with LogPageCache.lock:
+            result = LogPageCache.pages.get(key)
+            if result is not None:
+                LogPageCache.pages.move_to_end(key)
+                return result
+        result = log_helper(
+            self.context,
+            all=self.all,
+            extra_args=self.extra_args,
+            max_count=self.page_size,
+            skip=index * self.page_size,
+        )
+        with LogPageCache.lock:
+            LogPageCache.pages[key] = result
+            while len(LogPageCache.pages) > LogPageCache.size:
+                LogPageCache.pages.popitem(last=False)
+        return result
+
+
 def rev_list_range(context: ApplicationContext, start, end) -> list[tuple[str, str]]:
     """Return (oid, summary) pairs between start and end."""
     revrange = f'{start}..{end}'
@@ -1101,48 +1370,6 @@ def rev_parse(context: ApplicationContext, name: str) -> str:
     return result
 
 
-def write_blob(context: ApplicationContext, oid: str, filename: str) -> str:
-    """Write a blob to a temporary file and return the path
-
-    Modern versions of Git allow invoking filters.  Older versions
-    get the object content as-is.
-
-    """
-    if version.check_git(context, 'cat-file-filters-path'):
-        return cat_file_to_path(context, filename, oid)
-    return cat_file_blob(context, filename, oid)
-
-
-def cat_file_blob(context: ApplicationContext, filename: str, oid: str) -> str:
-    """Write a blob from git to the specified filename"""
-    return cat_file(context, filename, 'blob', oid)
-
-
-def cat_file_to_path(context, filename: str, oid: str) -> str:
-    """Extract a file from a commit ref and a write it to the specified filename"""
-    return cat_file(context, filename, oid, path=filename, filters=True)
-
-
-def cat_file(context: ApplicationContext, filename: str, *args, **kwargs) -> str:
-    """Redirect git cat-file output to a path"""
-    result = None
-    # Use the original filename in the suffix so that the generated filename
-    # has the correct extension, and so that it resembles the original name.
-    basename = os.path.basename(filename)
-    suffix = '-' + basename  # ensures the correct filename extension
-    path = utils.tmp_filename('blob', suffix=suffix)
-    with open(path, 'wb') as tmp_file:
-        status, out, err = context.git.cat_file(
-            _raw=True, _readonly=True, _stdout=tmp_file, *args, **kwargs
-        )
-        Interaction.command(N_('Error'), 'git cat-file', status, out, err)
-        if status == 0:
-            result = path
-    if not result:
-        core.unlink(path)
-    return result
-
-
 def cat_file_from_ref(context: ApplicationContext, ref: str, filename: str) -> str:
     """Read file contents using git cat-file"""
     status, out, _ = context.git.cat_file(
@@ -1151,13 +1378,27 @@ def cat_file_from_ref(context: ApplicationContext, ref: str, filename: str) -> s
     return out
 
 
-def write_blob_path(
-    context: ApplicationContext, head: str, oid: str, filename: str
-) -> str:
-    """Use write_blob() when modern git is available"""
+def read_blob(context: ApplicationContext, oid: str, filename: str) -> bytes | None:
+    """Return the content of a blob as bytes
+
+    Filters for `filename` are applied when git supports "cat-file --filters".
+    """
     if version.check_git(context, 'cat-file-filters-path'):
-        return write_blob(context, oid, filename)
-    return cat_file_blob(context, filename, head + ':' + filename)
+        status, out, _ = context.git.cat_file(
+            oid,
+            path=filename,
+            filters=True,
+            _encoding='bytes',
+            _raw=True,
+            _readonly=True,
+        )
+    else:
+        status, out, _ = context.git.cat_file(
+            'blob', oid, _encoding='bytes', _raw=True, _readonly=True
+        )
+    if status != 0:
+        return None
+    return out
 
 
 def annex_path(context: ApplicationContext, head: str, filename: str):
@@ -15,11 +15,7 @@ from . import resources
 from .i18n import N_
 from .interaction import Interaction
 from .widgets import completion
-from .widgets import editremotes
 from .widgets import switcher
-from .widgets.browse import BrowseBranch
-from .widgets.selectcommits import select_commits
-from .widgets.selectcommits import select_commits_and_output
 
 if TYPE_CHECKING:
     from qtpy import QtWidgets
@@ -57,12 +53,16 @@ def delete_remote_branch(context: ApplicationContext) -> None:
 
 def browse_current(context: ApplicationContext) -> None:
     """Launch the 'Browse Current Branch' dialog."""
+    from .widgets.browse import BrowseBranch
+
     branch = gitcmds.current_branch(context)
     BrowseBranch.browse(context, branch)
 
 
 def browse_other(context: ApplicationContext) -> None:
     """Prompt for a branch and inspect content at that point in time."""
+    from .widgets.browse import BrowseBranch
+
     # Prompt for a branch to browse
     branch = choose_ref(context, N_('Browse Commits...'), N_('Browse'))
     if not branch:
@@ -82,9 +82,11 @@ def checkout_branch(context: ApplicationContext, default: Any = None) -> None:
 
 def cherry_pick(context: ApplicationContext) -> None:
     """Launch the 'Cherry-Pick' dialog."""
-    revs, summaries = gitcmds.log_helper(context, all=True)
-    commits = select_commits(
-        context, N_('Cherry-Pick Commit'), revs, summaries, multiselect=False
+    from .widgets.selectcommits import select_commits_from_log
+
+    pages = gitcmds.LogPages(context, all=True)
+    commits = select_commits_from_log(
+        context, N_('Cherry-Pick Commit'), pages, multiselect=False
     )
     if not commits:
         return
@@ -137,6 +139,8 @@ def new_bare_repo(context: ApplicationContext) -> str | None:
         return result
     # Add a new remote pointing to the bare repo
     parent = qtutils.active_window()
+    from .widgets import editremotes
+
     add_remote = editremotes.add_remote(
         context, parent, name=os.path.basename(repo), url=repo, readonly_url=True
     )
@@ -177,9 +181,11 @@ def prompt_for_new_bare_repo() -> str | None:
 
 def export_patches(context: ApplicationContext) -> None:
     """Run 'git format-patch' on a list of commits."""
-    revs, summaries = gitcmds.log_helper(context)
-    to_export_and_output = select_commits_and_output(
-        context, N_('Export Patches'), revs, summaries
+    from .widgets.selectcommits import select_commits_and_output_from_log
+
+    pages = gitcmds.LogPages(context)
+    to_export_and_output = select_commits_and_output_from_log(
+        context, N_('Export Patches'), pages
     )
     if not to_export_and_output['to_export']:
         return
@@ -188,7 +194,7 @@ def export_patches(context: ApplicationContext) -> None:
         cmds.FormatPatch,
         context,
         reversed(to_export_and_output['to_export']),
-        reversed(revs),
+        reversed(to_export_and_output['revs']),
         output=to_export_and_output['output'],
     )
 
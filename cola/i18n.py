@@ -1,17 +1,24 @@
 """i18n and l10n support for git-cola"""
 from __future__ import annotations
+import hashlib
 import locale
+import mmap
 import os
-
-try:
-    import polib
-except ImportError:
-    from . import polib
+import struct
 import sys
+import tempfile
 
 from . import core
 from . import resources
 
+# Compiled catalogs use the GNU .mo file format along with its hash table.
+MO_MAGIC = 0x950412DE
+MO_HEADER = struct.Struct('<7I')
+MO_ENTRY = struct.Struct('<2I')
+MO_HASH_ENTRY = struct.Struct('<I')
+# Change this whenever the contents of the compiled catalogs change.
+CATALOG_VERSION = 1
+
 
 class NullTranslation:
     """This is a pass-through object that does nothing"""
@@ -43,19 +50,246 @@ class Translation:
     def __init__(self, lang: str | None) -> None:
         self.lang = lang
         self.messages = {}
+        self.catalog: Catalog | None = None
         self.filename = get_filename_for_locale(lang)
         if self.filename:
             self.load()
 
     def load(self) -> None:
-        """Read the .po file content into memory"""
-        po = polib.pofile(self.filename, encoding='utf-8')
-        messages = self.messages
-        for entry in po.translated_entries():
-            messages[entry.msgid] = entry.msgstr
+        """Load the compiled catalog, or read the .po file content into memory"""
+        self.catalog = load_catalog(self.filename)
+        if self.catalog is None:
+            self.messages.update(read_po_messages(self.filename))
 
     def gettext(self, value: str) -> str:
-        return self.messages.get(value, value)
+        try:
+            return self.messages[value]
+        except KeyError:
+            pass
+        if self.catalog is None:
+            return value
+        # Remember the results from the catalog, including misses.
+        result = self.messages[value] = self.catalog.get(value, value)
+        return result
+
+
+class Catalog:
+    """Look up messages in a memory-mapped .mo file using its hash table"""
+
+    def __init__(self, filename: str) -> None:
+        with open(filename, 'rb') as catalog_file:
+            self._data = mmap.mmap(catalog_file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._data)
+        if size < MO_HEADER.size:
+            self.close()
+            raise ValueError(f'{filename}: truncated catalog')
+        (
+            magic,
+            _revision,
+            self._count,
+            self._ids_offset,
+            self._strs_offset,
+            self._hash_size,
+            self._hash_offset,
+        ) = MO_HEADER.unpack_from(self._data, 0)
+        # The tables must lie within the file so that get() can read them safely.
+        tables_size = self._count * MO_ENTRY.size
+        if (
+            magic != MO_MAGIC
+            or self._hash_size < 3
+            or self._ids_offset + tables_size > size
+            or self._strs_offset + tables_size > size
+            or self._hash_offset + self._hash_size * MO_HASH_ENTRY.size > size
+        ):
+            self.close()
+            raise ValueError(f'{filename}: invalid catalog')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Release the memory map"""
+        self._data.close()
+
+    def get(self, msgid: str, default: str | None = None) -> str | None:
+        """Return the translation for a message id"""
+        if not msgid:
+            return default  # The empty message id holds the header entry.
+        data = self._data
+        key = msgid.encode('utf-8')
+        key_len = len(key)
+        hash_size = self._hash_size
+        hash_value = _hashpjw(key)
+        idx = hash_value % hash_size
+        incr = 1 + (hash_value % (hash_size - 2))
+        # Each slot is probed at most once in case the hash table is corrupt.
+        for _ in range(hash_size):
+            (entry,) = MO_HASH_ENTRY.unpack_from(data, self._hash_offset + idx * 4)
+            if not entry or entry > self._count:
+                return default
+            entry_offset = (entry - 1) * MO_ENTRY.size
+            length, offset = MO_ENTRY.unpack_from(data, self._ids_offset + entry_offset)
+            if length == key_len and data[offset : offset + length] == key:
+                length, offset = MO_ENTRY.unpack_from(
+                    data, self._strs_offset + entry_offset
+                )
+                return data[offset : offset + length].decode('utf-8', 'replace')
+            if idx >= hash_size - incr:
+                idx -= hash_size - incr
+            else:
+                idx += incr
+        return default
+
+
+def read_po_messages(filename: str) -> dict[str, str]:
+    """Parse the translated messages from a .po file"""
+    try:
+        import polib
+    except ImportError:
+        from . import polib
+
+    po = polib.pofile(filename, encoding='utf-8')
+    return {entry.msgid: entry.msgstr for entry in po.translated_entries()}
+
+
+def catalog_filename(filename: str) -> str | None:
+    """Return the compiled catalog path for a .po file in the cache directory
+
+    The path is keyed on the .po file's location, size and modification time so
+    that a new catalog is compiled whenever the .po file changes.
+    """
+    try:
+        stat = core.stat(filename)
+    except OSError:
+        return None
+    parts = (CATALOG_VERSION, core.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    key = ':'.join(str(part) for part in parts)
+    digest = hashlib.sha256(core.encode(key)).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return resources.cache_home('i18n', f'{name}-{digest}.mo')
+
+
+def load_catalog(filename: str) -> Catalog | None:
+    """Return the compiled catalog for a .po file, compiling it when stale
+
+    None is returned when the catalog cannot be written to the cache directory.
+    Corrupt catalogs are removed and compiled again.
+    """
+    path = catalog_filename(filename)
+    if not path:
+        return None
+    if core.exists(path):
+        try:
+            return Catalog(path)
+        except OSError:
+            return None
+        except ValueError:
+            try:
+                core.remove(path)
+            except OSError:
+                return None
+    try:
+        compile_catalog(filename, path)
+        return Catalog(path)
+    except (OSError, ValueError):
+        return None
+
+
+def compile_catalog(filename: str, path: str) -> None:
+    """Compile a .po file into a .mo catalog and remove catalogs for older versions"""
+    messages = read_po_messages(filename)
+    dirname, basename = os.path.split(path)
+    if not core.isdir(dirname):
+        core.makedirs(dirname)
+    prefix = basename.rsplit('-', 1)[0] + '-'
+    # Write to a temporary file so that readers never see partial catalogs.
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.' + prefix, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as catalog_file:
+            catalog_file.write(mo_data(messages))
+        os.replace(tmp_path, path)
+    except OSError:
+        if core.exists(tmp_path):
+            core.remove(tmp_path)
+        raise
+    for entry in os.listdir(dirname):
+        if entry.startswith(prefix) and entry.endswith('.mo') and entry != basename:
+            try:
+                os.remove(os.path.join(dirname, entry))
+            except OSError:
+                pass  # The catalog may still be mapped by another process.
+
+
+def mo_data(messages: dict[str, str]) -> bytes:
+    """Encode messages in the GNU .mo format along with its hash table"""
+    # The header entry lets standard .mo readers decode the UTF-8 strings.
+    header_entry = 'Content-Type: text/plain; charset=UTF-8\n'
+    messages = dict(messages, **{'': header_entry})
+    items = sorted(
+        (msgid.encode('utf-8'), msgstr.encode('utf-8'))
+        for msgid, msgstr in messages.items()
+    )
+    count = len(items)
+    hash_size = _next_prime(max(3, count * 4 // 3))
+    ids_offset = MO_HEADER.size
+    strs_offset = ids_offset + count * MO_ENTRY.size
+    hash_offset = strs_offset + count * MO_ENTRY.size
+    data_offset = hash_offset + hash_size * MO_HASH_ENTRY.size
+
+    ids_table = []
+    strs_table = []
+    strings = []
+    offset = data_offset
+    for idx in (0, 1):
+        table = strs_table if idx else ids_table
+        for item in items:
+            value = item[idx]
+            table.append(MO_ENTRY.pack(len(value), offset))
+            strings.append(value + b'\0')
+            offset += len(value) + 1
+
+    hash_table = [0] * hash_size
+    for entry, (msgid, _) in enumerate(items):
+        hash_value = _hashpjw(msgid)
+        idx = hash_value % hash_size
+        incr = 1 + (hash_value % (hash_size - 2))
+        while hash_table[idx]:
+            if idx >= hash_size - incr:
+                idx -= hash_size - incr
+            else:
+                idx += incr
+        hash_table[idx] = entry + 1
+
+    header = MO_HEADER.pack(
+        MO_MAGIC, 0, count, ids_offset, strs_offset, hash_size, hash_offset
+    )
+    return b''.join([
+        header,
+        b''.join(ids_table),
+        b''.join(strs_table),
+        struct.pack(f'<{hash_size}I', *hash_table),
+        b''.join(strings),
+    ])
+
+
+def _hashpjw(value: bytes) -> int:
+    """The hash function used by the GNU .mo format"""
+    hash_value = 0
+    for byte in value:
+        hash_value = (hash_value << 4) + byte
+        high_bits = hash_value & 0xF0000000
+        if high_bits:
+            hash_value ^= high_bits >> 24
+            hash_value ^= high_bits
+    return hash_value
+
+
+def _next_prime(value: int) -> int:
+    """Return the smallest odd prime greater than or equal to value"""
+    value |= 1
+    while any(value % divisor == 0 for divisor in range(3, int(value**0.5) + 1, 2)):
+        value += 2
+    return value
 
 
 def gettext(value: str) -> str:
@@ -4,15 +4,17 @@ import argparse
 import sys
 from typing import Callable, TYPE_CHECKING
 
+# perf is imported first so that GIT_COLA_PERF_IMPORTS can measure all imports.
+from . import perf
 from . import app
 from . import cmds
 from . import compat
 from . import core
 from . import version
-from .widgets.main import MainView
 
 if TYPE_CHECKING:
     from .app import ApplicationContext
+    from .widgets.main import MainView
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -30,7 +32,8 @@ def main(argv: list[str] | None = None) -> int:
         argv.insert(0, 'cola')
     elif help_commands in argv:
         argv.append('--help')
-    args: argparse.Namespace | list[bytes] = parse_args(argv)
+    with perf.startup.timer.phase('parse_args'):
+        args: argparse.Namespace | list[bytes] = parse_args(argv)
     return args.func(args)
 
 
@@ -513,6 +516,7 @@ def cmd_cola(
     args: argparse.Namespace, context: ApplicationContext | None = None
 ) -> int:
     """The "git cola" entry point"""
+    from .widgets.main import MainView
 
     status_filter = args.status_filter
     if status_filter:
@@ -521,17 +525,13 @@ def cmd_cola(
     if context is None:
         context = app.application_init(args)
 
-    context.timer.start('view')
-    view = MainView(context)
-    if args.amend:
-        cmds.do(cmds.AmendMode, context, amend=True)
+    with context.timer.phase('MainView'):
+        view = MainView(context)
+        if args.amend:
+            cmds.do(cmds.AmendMode, context, amend=True)
 
-    if status_filter:
-        view.set_filter(core.relpath(status_filter))
-
-    context.timer.stop('view')
-    if args.perf:
-        context.timer.display('view')
+        if status_filter:
+            view.set_filter(core.relpath(status_filter))
 
     return app.application_run(context, view, start=start_cola, stop=app.default_stop)
 
@@ -10,6 +10,7 @@ from .. import core
 from .. import icons
 from .. import utils
 from .. import qtutils
+from .. import searchindex
 from ..git import STDOUT
 from ..i18n import N_
 
@@ -70,7 +71,7 @@ class GitRepoModel(QtGui.QStandardItemModel):
         cfg = context.cfg
         self.turbo = cfg.get('cola.turbo', False)
         self.default_author = cfg.get('user.name', N_('Author'))
-        self._interesting_paths = set()
+        self._interesting_paths = searchindex.PathTrie()
         self._interesting_files = set()
         self._runtask = qtutils.RunTask(parent=parent)
 
@@ -164,7 +165,8 @@ class GitRepoModel(QtGui.QStandardItemModel):
     def populate_dir(self, parent: GitRepoItem, path: str) -> None:
         """Populate a subtree"""
         context = self.context
-        dirs, paths = gitcmds.listdir(context, path)
+        tracked = context.tracked_paths.snapshot().listdir(path)
+        dirs, paths = gitcmds.listdir(context, path, tracked=tracked)
 
         # Insert directories before file paths
         for dirname in dirs:
@@ -193,11 +195,11 @@ class GitRepoModel(QtGui.QStandardItemModel):
         """Return True if path has a status."""
         return path in self._interesting_paths
 
-    def get_paths(self, files=None) -> set[str]:
+    def get_paths(self, files=None) -> searchindex.PathTrie:
         """Return paths of interest; e.g. paths with a status."""
         if files is None:
             files = self.get_files()
-        return utils.add_parents(files)
+        return searchindex.PathTrie(files)
 
     def get_files(self):
         model = self.model
@@ -215,7 +217,7 @@ class GitRepoModel(QtGui.QStandardItemModel):
             self.restore.emit()
 
         # Existing items
-        for path in sorted(new_paths.union(old_paths)):
+        for path in sorted(new_paths.paths().union(old_paths)):
             self.update_entry(path)
 
         self._interesting_files = new_files
@@ -319,11 +321,11 @@ class GitRepoInfoTask(qtutils.Task):
     def status(self) -> tuple[str | None, str]:
         """Return the status for the entry's path."""
         model = self.context.model
-        unmerged = utils.add_parents(model.unmerged)
-        modified = utils.add_parents(model.modified)
-        staged = utils.add_parents(model.staged)
-        untracked = utils.add_parents(model.untracked)
-        upstream_changed = utils.add_parents(model.upstream_changed)
+        unmerged = model.path_trie('unmerged')
+        modified = model.path_trie('modified')
+        staged = model.path_trie('staged')
+        untracked = model.path_trie('untracked')
+        upstream_changed = model.path_trie('upstream_changed')
 
         path = self.path
         if path in unmerged:
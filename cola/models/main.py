@@ -1,15 +1,21 @@
 """The central cola model"""
 from __future__ import annotations
+from functools import partial
 import os
-from typing import Any, Callable, TYPE_CHECKING
+import re
+import threading
+from typing import Any, Callable, NamedTuple, TYPE_CHECKING
 
 from qtpy import QtCore
+from qtpy.QtCore import Qt
 from qtpy.QtCore import Signal
 
 from .. import core
 from .. import git
 from .. import gitcmds
 from .. import gitcfg
+from .. import qtutils
+from .. import searchindex
 from .. import version
 from ..git import STDOUT, transform_kwargs
 from ..interaction import Interaction
@@ -24,6 +30,13 @@ FETCH_HEAD = 'FETCH_HEAD'
 PUSH = 'push'
 PULL = 'pull'
 
+# The kinds of refreshes that are merged by the RefreshScheduler.
+FILES = 'files'
+REFS = 'refs'
+CONFIG = 'config'
+SUBMODULES = 'submodules'
+STATUS = frozenset((FILES, REFS, CONFIG))
+
 
 def create(context) -> MainModel:
     """Create the repository status model"""
@@ -109,6 +122,8 @@ class MainModel(QtCore.QObject):
         self.project = ''
         self.remotes = []
         self.filter_paths: list[str] | None = None
+        # Client-side regex from utils.compile_path_filter() for the status lists.
+        self.status_filter: re.Pattern[str] | None = None
         self.images = []
 
         self.commitmsg = ''  # current commit message
@@ -127,13 +142,19 @@ class MainModel(QtCore.QObject):
         self.staged_deleted: set[str] = set()
         self.unstaged_deleted: set[str] = set()
         self.submodules: set[str] = set()
+        # The unfiltered result of the last worktree status query.
+        self.worktree_state: dict[str, Any] = {}
         self.submodules_list: list[Any] | None = None  # lazy loaded
+        # Path trees of the status lists keyed by attribute name.
+        self._path_tries: dict[str, tuple[list[str], searchindex.PathTrie]] = {}
+        self._path_tries_lock = threading.Lock()
 
         self.error = None  # The last error message.
         self.ref_sort = 0  # (0: version, 1:reverse-chrono)
         self.local_branches = []
         self.remote_branches = []
         self.tags = []
+        self.refresh_scheduler = RefreshScheduler(self)
         if cwd:
             self.set_worktree(cwd)
 
@@ -164,6 +185,20 @@ class MainModel(QtCore.QObject):
     def all_branches(self) -> list[str]:
         return self.local_branches + self.remote_branches
 
+    def path_trie(self, name: str) -> searchindex.PathTrie:
+        """Return a tree of a status list, eg. "staged", and its parent directories
+
+        The tree is built once for each list and is shared until the list is
+        replaced by the next status refresh. Worker threads can call this method.
+        """
+        paths = getattr(self, name)
+        with self._path_tries_lock:
+            entry = self._path_tries.get(name)
+            if entry is None or entry[0] is not paths:
+                entry = (paths, searchindex.PathTrie(paths))
+                self._path_tries[name] = entry
+        return entry[1]
+
     def set_worktree(self, worktree: str) -> bool:
         last_worktree = self.git.paths.worktree
         self.git.set_worktree(worktree)
@@ -262,7 +297,7 @@ class MainModel(QtCore.QObject):
         if changed:
             self.file_type_changed.emit(file_type)
 
-    def set_images(self, images: list[tuple[str, bool] | Any]) -> None:
+    def set_images(self, images: list[ImageSource]) -> None:
         """Update the images shown in the preview pane"""
         self.images = images
         self.images_changed.emit(images)
@@ -298,9 +333,28 @@ class MainModel(QtCore.QObject):
         self.mode_changed.emit(mode)
 
     def update_path_filter(self, filter_paths: list[str]) -> None:
+        """Re-query git and only scan the paths matching the pathspecs"""
         self.filter_paths = filter_paths
         self.update_file_status()
 
+    def set_status_filter(
+        self,
+        status_filter: re.Pattern[str] | None,
+        state: dict[str, Any] | None = None,
+        filtered: dict[str, Any] | None = None,
+    ) -> None:
+        """Filter the status lists without re-querying git
+
+        "filtered" is the result of filtering "state" in the background. It is
+        recomputed when the worktree state has been refreshed since then.
+        """
+        self.status_filter = status_filter
+        if filtered is None or state is not self.worktree_state:
+            filtered = gitcmds.filter_worktree_state(self.worktree_state, status_filter)
+        self.emit_about_to_update()
+        self._apply_worktree_state(filtered)
+        self.emit_updated()
+
     def emit_about_to_update(self) -> None:
         self.previous_contents.emit(
             self.staged, self.unmerged, self.modified, self.untracked
@@ -310,6 +364,12 @@ class MainModel(QtCore.QObject):
     def emit_updated(self) -> None:
         self.updated.emit()
 
+    def request_refresh(
+        self, kinds: Any = STATUS, update_index: bool = False, reset: bool = False
+    ) -> None:
+        """Schedule a background refresh that is merged with pending requests"""
+        self.refresh_scheduler.request(kinds, update_index=update_index, reset=reset)
+
     def update_file_status(self, update_index: bool = False) -> None:
         """Update modified/staged files status"""
         self.emit_about_to_update()
@@ -322,19 +382,63 @@ class MainModel(QtCore.QObject):
         self.update_file_status()
 
     def update_status(self, update_index: bool = False, reset: bool = False) -> None:
+        self.refresh_scheduler.satisfied(
+            (FILES, REFS, SUBMODULES) if reset else (FILES, REFS),
+            update_index=update_index,
+        )
         # Give observers a chance to respond
         self.emit_about_to_update()
-        self.initialized = True
+        kinds = (FILES, REFS, SUBMODULES) if reset else (FILES, REFS)
+        # Leaving amend mode changes the head that the staged queries diff against.
         self._update_merge_rebase_status()
-        self._update_files(update_index=update_index)
+        # The queries are independent so they are run concurrently and their
+        # results are applied to the model together.
+        results = gitcmds.run_queries(
+            self.status_queries(kinds, update_index=update_index)
+        )
+        self.initialized = True
+        self._set_worktree_state(results)
         self._update_remotes()
-        self._update_branches_and_tags()
+        self._set_branches_and_tags(results)
         self._update_commitmsg()
         self.update_config()
         if reset:
-            self.update_submodules_list()
+            self._set_submodules_list(results)
         self.emit_updated()
 
+    def status_queries(
+        self, kinds: Any, update_index: bool = False
+    ) -> dict[str, Callable[[], Any]]:
+        """Return the independent git queries used to refresh the specified kinds"""
+        context = self.context
+        queries = {}
+        if FILES in kinds:
+            if update_index:
+                # Refreshing the index writes to it so it must complete before
+                # the read-only queries start.
+                self.git.update_index(refresh=True)
+            queries.update(
+                gitcmds.worktree_state_queries(
+                    context,
+                    head=self.head,
+                    display_untracked=prefs.display_untracked(context),
+                    paths=self.filter_paths,
+                )
+            )
+        if REFS in kinds:
+            sort_types = (
+                'version:refname',
+                '-committerdate',
+            )
+            sort_key = sort_types[self.ref_sort]
+            queries['refs'] = partial(
+                gitcmds.all_refs, context, split=True, sort_key=sort_key
+            )
+            queries['current_branch'] = partial(gitcmds.current_branch, context)
+        if SUBMODULES in kinds:
+            queries['submodules_list'] = partial(gitcmds.list_submodule, context)
+        return queries
+
     def update_config(self, emit: bool = False, reset: bool = False) -> None:
         if reset:
             self.cfg.reset()
@@ -354,20 +458,25 @@ class MainModel(QtCore.QObject):
             self.emit_updated()
 
     def update_files(self, update_index: bool = False, emit: bool = False) -> None:
+        self.refresh_scheduler.satisfied((FILES,), update_index=update_index)
         self._update_files(update_index=update_index)
         if emit:
             self.emit_updated()
 
     def _update_files(self, update_index: bool = False) -> None:
-        context = self.context
-        display_untracked = prefs.display_untracked(context)
-        state = gitcmds.worktree_state(
-            context,
-            head=self.head,
-            update_index=update_index,
-            display_untracked=display_untracked,
-            paths=self.filter_paths,
+        queries = self.status_queries((FILES,), update_index=update_index)
+        self._set_worktree_state(gitcmds.run_queries(queries))
+
+    def _set_worktree_state(self, results: dict[str, Any]) -> None:
+        """Apply the results of the worktree status queries"""
+        state = gitcmds.worktree_state_from_results(results)
+        self.worktree_state = state
+        self._apply_worktree_state(
+            gitcmds.filter_worktree_state(state, self.status_filter)
         )
+
+    def _apply_worktree_state(self, state: dict[str, Any]) -> None:
+        """Set the status lists from a worktree state"""
         self.staged = state.get('staged', [])  # type: ignore[assignment]
         self.modified = state.get('modified', [])  # type: ignore[assignment]
         self.unmerged = state.get('unmerged', [])  # type: ignore[assignment]
@@ -397,20 +506,16 @@ class MainModel(QtCore.QObject):
         self.remotes = sorted(gitcfg.get_remotes(self.cfg))
 
     def _update_branches_and_tags(self) -> None:
-        context = self.context
-        sort_types = (
-            'version:refname',
-            '-committerdate',
-        )
-        sort_key = sort_types[self.ref_sort]
-        local_branches, remote_branches, tags = gitcmds.all_refs(
-            context, split=True, sort_key=sort_key
-        )
+        queries = self.status_queries((REFS,))
+        self._set_branches_and_tags(gitcmds.run_queries(queries))
+
+    def _set_branches_and_tags(self, results: dict[str, Any]) -> None:
+        """Apply the results of the branch and tag queries"""
+        local_branches, remote_branches, tags = results['refs']
         self.local_branches = local_branches
         self.remote_branches = remote_branches
         self.tags = tags
-        # Set these early since they are used to calculate 'upstream_changed'.
-        self.currentbranch = gitcmds.current_branch(self.context)
+        self.currentbranch = results['current_branch']
         self.refs_updated.emit()
 
     def _update_merge_rebase_status(self) -> None:
@@ -449,7 +554,12 @@ class MainModel(QtCore.QObject):
             self.set_commitmsg(self._prev_commitmsg)
 
     def update_submodules_list(self) -> None:
-        self.submodules_list = gitcmds.list_submodule(self.context)
+        self.refresh_scheduler.satisfied((SUBMODULES,))
+        queries = self.status_queries((SUBMODULES,))
+        self._set_submodules_list(gitcmds.run_queries(queries))
+
+    def _set_submodules_list(self, results: dict[str, Any]) -> None:
+        self.submodules_list = results['submodules_list']
         self.submodules_changed.emit()
 
     def update_remotes(self) -> None:
@@ -458,6 +568,7 @@ class MainModel(QtCore.QObject):
 
     def update_refs(self) -> None:
         """Update tag and branch names"""
+        self.refresh_scheduler.satisfied((REFS,))
         self.emit_about_to_update()
         self._update_branches_and_tags()
         self.emit_updated()
@@ -537,6 +648,232 @@ class Types:
     TEXT = 'text'
 
 
+class ImageSource(NamedTuple):
+    """An image to display in the image diff viewer
+
+    Images with an "oid" are read from the git object database. Otherwise
+    "path" is read from disk.
+    """
+
+    path: str
+    oid: str | None = None
+
+
+class RefreshScheduler(QtCore.QObject):
+    """Merge refresh requests by kind and run them on a worker thread
+
+    Requests that arrive while a refresh is queued are merged into it.
+    Requests that arrive while a refresh is running are absorbed by the
+    running refresh when their kind has not been queried yet. Direct updates
+    through MainModel, e.g. from commands, cancel queued work and prevent
+    the running refresh from applying results for the kinds that they update.
+    """
+
+    finished = Signal(object)
+    _scheduled = Signal()
+
+    def __init__(self, model: MainModel) -> None:
+        super().__init__(model)
+        self.model = model
+        self.runtask = qtutils.RunTask(parent=self)
+        self.requested = 0
+        self.runs = 0
+        self.saved = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._pending_requests = 0
+        self._update_index = False
+        self._reset = False
+        # The (kinds, update_index, reset) of the refresh that is running.
+        self._running: tuple[frozenset[str], bool, bool] | None = None
+        self._started: set[str] = set()
+        self._applied: set[str] = set()
+        self._cancelled: set[str] = set()
+        self._current: str | None = None
+        self._stale: set[str] = set()
+        # Requests made during the same pass through the event loop are
+        # collapsed into a single refresh.
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.start)
+        self._scheduled.connect(self._start_timer, type=Qt.QueuedConnection)
+
+    def _start_timer(self) -> None:
+        self._timer.start()
+
+    def request(
+        self, kinds: Any = STATUS, update_index: bool = False, reset: bool = False
+    ) -> None:
+        """Request a refresh of the specified kinds. Thread-safe."""
+        kinds = {kinds} if isinstance(kinds, str) else set(kinds)
+        with self._lock:
+            self.requested += 1
+            if self._running is not None:
+                run_kinds, run_update_index, run_reset = self._running
+                if (run_update_index or not update_index) and (run_reset or not reset):
+                    absorbed = (kinds & run_kinds) - self._started
+                    self._cancelled.difference_update(absorbed)
+                    kinds -= absorbed
+                if not kinds:
+                    self.saved += 1
+                    return
+            self._pending.update(kinds)
+            self._pending_requests += 1
+            self._update_index = self._update_index or update_index
+            self._reset = self._reset or reset
+        self._scheduled.emit()
+
+    def satisfied(self, kinds: Any, update_index: bool = False) -> None:
+        """Drop work that was made redundant by a direct update of the model"""
+        with self._lock:
+            if self._update_index and not update_index:
+                kinds = set(kinds) - {FILES}
+            if self._pending:
+                self._pending.difference_update(kinds)
+                if not self._pending:
+                    self.saved += self._pending_requests
+                    self._pending_requests = 0
+                    self._update_index = self._reset = False
+            if self._running is None:
+                return
+            for kind in kinds:
+                if kind == self._current:
+                    # The running step may overwrite the direct update with
+                    # older results so it is refreshed again when it finishes.
+                    self._stale.add(kind)
+                elif kind not in self._applied:
+                    self._cancelled.add(kind)
+
+    def start(self) -> None:
+        """Start a background refresh for the pending requests"""
+        args = self._take_pending()
+        if args is None:
+            return
+        task = qtutils.SimpleTask(self.run, *args)
+        self.runtask.start(task, result=self._finished)
+
+    def run_pending(self) -> frozenset[str]:
+        """Run the pending requests on the current thread"""
+        args = self._take_pending()
+        if args is None:
+            return frozenset()
+        return self._finished(self.run(*args))
+
+    def _take_pending(self) -> tuple[frozenset[str], bool, bool] | None:
+        with self._lock:
+            if self._running is not None or not self._pending:
+                return None
+            args = (frozenset(self._pending), self._update_index, self._reset)
+            self.runs += 1
+            self.saved += self._pending_requests - 1
+            self._pending.clear()
+            self._pending_requests = 0
+            self._update_index = self._reset = False
+            self._running = args
+            self._started.clear()
+            self._applied.clear()
+            self._cancelled.clear()
+            self._stale.clear()
+        return args
+
+    def run(
+        self, kinds: frozenset[str], update_index: bool, reset: bool
+    ) -> frozenset[str]:
+        """Refresh the model and return the kinds that were refreshed"""
+        model = self.model
+        with self._lock:
+            # Configuration is applied by _finished() on the main thread.
+            kinds -= {CONFIG}
+            cancelled = kinds & self._cancelled
+            self.cancelled += len(cancelled)
+            kinds -= cancelled
+            self._started.update(kinds)
+        if FILES in kinds:
+            # Leaving amend mode changes the head that the staged queries diff against.
+            model._update_merge_rebase_status()
+        results = gitcmds.run_queries(
+            model.status_queries(kinds, update_index=update_index)
+        )
+        refreshed = set()
+        for kind in (REFS, FILES, SUBMODULES):
+            if kind not in kinds or not self._begin_step(kind):
+                continue
+            if not refreshed:
+                model.emit_about_to_update()
+            refreshed.add(kind)
+            if kind == REFS:
+                model._update_remotes()
+                model._set_branches_and_tags(results)
+            elif kind == FILES:
+                model._set_worktree_state(results)
+                model._update_commitmsg()
+                model.initialized = True
+            elif kind == SUBMODULES:
+                model._set_submodules_list(results)
+        with self._lock:
+            self._current = None
+        if refreshed:
+            model.emit_updated()
+        return frozenset(refreshed)
+
+    def _begin_step(self, kind: str) -> bool:
+        """Return False when a step was cancelled by a direct update"""
+        with self._lock:
+            if kind in self._cancelled:
+                self.cancelled += 1
+                return False
+            self._started.add(kind)
+            self._applied.add(kind)
+            self._current = kind
+        return True
+
+    def _apply_config(self, reset: bool) -> bool:
+        """Re-read the configuration and return False when it was cancelled
+
+        GitConfig is not thread-safe so it is only updated on the main thread.
+        """
+        if not self._begin_step(CONFIG):
+            return False
+        model = self.model
+        model.emit_about_to_update()
+        if not reset:
+            model.cfg.update()
+        model.update_config(reset=reset)
+        with self._lock:
+            self._current = None
+        model.emit_updated()
+        return True
+
+    def _finished(self, kinds: frozenset[str]) -> frozenset[str]:
+        """Apply the configuration and return the kinds that were refreshed"""
+        with self._lock:
+            run_kinds, _, reset = self._running or (frozenset(), False, False)
+        if CONFIG in run_kinds and self._apply_config(reset):
+            kinds = kinds | {CONFIG}
+        with self._lock:
+            self._running = None
+            stale = set(self._stale)
+            pending = bool(self._pending)
+        self.finished.emit(kinds)
+        if stale:
+            self.request(stale)
+        elif pending:
+            self._scheduled.emit()
+        return kinds
+
+    def report(self) -> dict[str, int]:
+        """Return the number of refreshes that were requested, run and saved"""
+        with self._lock:
+            return {
+                'requested': self.requested,
+                'runs': self.runs,
+                'saved': self.saved,
+                'cancelled': self.cancelled,
+            }
+
+
 def remote_args(
     context,
     remote,
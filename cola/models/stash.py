@@ -1,4 +1,7 @@
+from __future__ import annotations
+import collections
 import re
+import threading
 
 from .. import cmds
 from .. import core
@@ -8,11 +11,37 @@ from ..i18n import N_
 from ..git import STDOUT
 from ..interaction import Interaction
 
+# The number of stash diffs that are kept in memory.
+DIFF_CACHE_SIZE = 64
+
+# Stash diffs keyed by the stash commit's oid. Stash commits never change.
+_diff_cache: collections.OrderedDict[str, str] = collections.OrderedDict()
+_diff_cache_lock = threading.Lock()
+
+
+def cached_diff(oid: str) -> str | None:
+    """Return the cached diff for a stash commit"""
+    with _diff_cache_lock:
+        diff = _diff_cache.get(oid)
+        if diff is not None:
+            _diff_cache.move_to_end(oid)
+        return diff
+
+
+def cache_diff(oid: str, diff: str) -> None:
+    """Store the diff for a stash commit"""
+    with _diff_cache_lock:
+        _diff_cache[oid] = diff
+        _diff_cache.move_to_end(oid)
+        while len(_diff_cache) > DIFF_CACHE_SIZE:
+            _diff_cache.popitem(last=False)
+
 
 class StashModel:
     def __init__(self, context) -> None:
         self.context = context
         self.git = context.git
+        self.oids: dict[str, str] = {}  # Stash ref (stash@{N}) to commit oid.
         self.model = model = context.model
         if not model.initialized:
             model.update_status()
@@ -31,20 +60,40 @@ class StashModel:
         self, revids=False, names=False
     ) -> tuple[list[str], list[str], list[str], list[str]]:
         """Parses "git stash list" and returns a list of stashes."""
-        stashes = self.stash_list(r'--format=%gd/%aD/%gs')
-        split_stashes = [s.split('/', 2) for s in stashes if s]
-        stashes = [f'{s[0]}: {s[2]}' for s in split_stashes]
-        revids = [s[0] for s in split_stashes]
-        author_dates = [s[1] for s in split_stashes]
-        names = [s[2] for s in split_stashes]
+        stashes = self.stash_list(r'--format=%H/%gd/%aD/%gs')
+        split_stashes = [s.split('/', 3) for s in stashes if s]
+        split_stashes = [s for s in split_stashes if len(s) == 4]
+        stashes = [f'{s[1]}: {s[3]}' for s in split_stashes]
+        revids = [s[1] for s in split_stashes]
+        author_dates = [s[2] for s in split_stashes]
+        names = [s[3] for s in split_stashes]
+        self.oids = {s[1]: s[0] for s in split_stashes}
 
         return stashes, revids, author_dates, names
 
+    def cached_stash_diff(self, rev: str) -> str | None:
+        """Return the diff for a stash if it has already been loaded"""
+        oid = self.oids.get(rev)
+        if not oid:
+            return None
+        return cached_diff(oid)
+
     def stash_diff(self, rev: str) -> str:
-        git = self.git
-        diffstat = git.stash('show', rev)[STDOUT]
-        diff = git.stash('show', '-p', '--no-ext-diff', rev)[STDOUT]
-        return diffstat + '\n\n' + diff
+        """Return the diffstat and patch for a stash"""
+        oid = self.oids.get(rev)
+        if oid:
+            diff = cached_diff(oid)
+            if diff is not None:
+                return diff
+        # The stat and the patch are generated by a single "git diff", which is
+        # equivalent to "git stash show" followed by "git stash show -p".
+        commit = oid or rev
+        status, out, _ = self.git.diff(
+            commit + '^1', commit, '--', stat=True, patch=True, no_ext_diff=True
+        )
+        if status == 0 and oid:
+            cache_diff(oid, out)
+        return out
 
 
 class ApplyStash(cmds.ContextCommand):
@@ -0,0 +1,214 @@
+"""An application-wide cache of the paths tracked in the Git index"""
+from __future__ import annotations
+import bisect
+import fnmatch
+import re
+import threading
+from typing import Iterable, Iterator
+
+from qtpy import QtCore
+from qtpy.QtCore import Qt
+from qtpy.QtCore import Signal
+
+from .. import core
+from .. import gitcmds
+from .. import qtutils
+from .. import searchindex
+
+# Paths are front-coded in blocks. Each block stores its first path in full and
+# the remaining paths as a shared-prefix length followed by the unshared suffix.
+BLOCK_SIZE = 16
+# The trailing checksum of the index is 20 bytes for SHA-1 and 32 for SHA-256.
+INDEX_CHECKSUM_SIZE = 32
+
+
+def create(context) -> TrackedPaths:
+    """Create a TrackedPaths cache"""
+    return TrackedPaths(context)
+
+
+def index_stamp(context) -> tuple | None:
+    """Return a key that changes whenever .git/index is rewritten"""
+    path = context.git.git_path('index')
+    if not path:
+        return None
+    try:
+        stat = core.stat(path)
+        with core.xopen(path, 'rb') as index_file:
+            if stat.st_size > INDEX_CHECKSUM_SIZE:
+                index_file.seek(-INDEX_CHECKSUM_SIZE, 2)
+            checksum = index_file.read(INDEX_CHECKSUM_SIZE)
+    except OSError:
+        return (path, None)
+    return (path, stat.st_mtime_ns, stat.st_size, checksum)
+
+
+class PathSnapshot:
+    """A compact, immutable list of sorted paths with a directory-children index"""
+
+    def __init__(self, paths: Iterable[str] = (), stamp: tuple | None = None) -> None:
+        self.stamp = stamp
+        self._size = 0
+        self._heads: list[str] = []  # The first path in each block.
+        self._blocks: list[str] = []  # Front-coded paths joined by "\0".
+        self._trie = searchindex.PathTrie()
+        self._file_dirs: set[str] = set()
+        self._path_index: searchindex.PathIndex | None = None
+        self._lock = threading.Lock()
+
+        block: list[str] = []
+        previous = ''
+        trie = self._trie
+        for path in paths:
+            if self._size % BLOCK_SIZE == 0:
+                self._add_block(block)
+                block = [path]
+                self._heads.append(path)
+            else:
+                prefix_len = _common_prefix_len(previous, path)
+                # Offset by one so that "\0" is never used as a length.
+                block.append(chr(prefix_len + 1) + path[prefix_len:])
+            previous = path
+            self._size += 1
+
+            trie.insert(path)
+            self._file_dirs.add(searchindex.split_path(path)[0])
+        self._add_block(block)
+
+    def _add_block(self, block: list[str]) -> None:
+        if block:
+            self._blocks.append('\0'.join(block))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for block in self._blocks:
+            yield from _decode_block(block)
+
+    def __contains__(self, path: str) -> bool:
+        idx = bisect.bisect_right(self._heads, path) - 1
+        if idx < 0:
+            return False
+        return path in _decode_block(self._blocks[idx])
+
+    def paths(self) -> list[str]:
+        """Return all of the tracked paths in sorted order"""
+        return list(self)
+
+    def filter(self, patterns: list[str]) -> list[str]:
+        """Return the paths matching any of the "git ls-files" style glob patterns"""
+        if not patterns:
+            return self.paths()
+        # Pathspec globs are matched without FNM_PATHNAME so "*" matches "/".
+        regexes = [fnmatch.translate(pattern) for pattern in patterns]
+        match = re.compile('|'.join(regexes)).match
+        return [path for path in self if match(path)]
+
+    def is_dir(self, path: str) -> bool:
+        """Is the path a directory containing tracked paths?"""
+        return self._trie.is_dir(path)
+
+    def dirs(self) -> list[str]:
+        """Return all of the directories containing tracked paths"""
+        return list(self._trie.dirs)
+
+    def file_dirs(self) -> set[str]:
+        """Return the directories that directly contain tracked files"""
+        return self._file_dirs
+
+    def children(self, dirname: str = '') -> list[str]:
+        """Return the names of the entries directly inside of a directory"""
+        return self._trie.children(_normalize_dirname(dirname))
+
+    def listdir(self, dirname: str) -> tuple[list[str], list[str]]:
+        """Return the (dirs, files) inside of a directory as repository paths"""
+        return self._trie.listdir(_normalize_dirname(dirname))
+
+    def trie(self) -> searchindex.PathTrie:
+        """Return the tree of tracked paths"""
+        return self._trie
+
+    def path_index(self) -> searchindex.PathIndex:
+        """Return a completion index that is shared by all consumers"""
+        with self._lock:
+            if self._path_index is None:
+                self._path_index = searchindex.PathIndex(self._trie)
+            return self._path_index
+
+
+class TrackedPaths(QtCore.QObject):
+    """Share a single snapshot of "git ls-files" across the application
+
+    The snapshot is keyed on the size, modification time and trailing checksum
+    of .git/index. It is refreshed in the background when the main model is
+    updated and synchronously when a stale snapshot is requested.
+    """
+
+    updated = Signal()
+
+    def __init__(self, context) -> None:
+        super().__init__()
+        self.context = context
+        self._snapshot = PathSnapshot()
+        self._lock = threading.Lock()
+        self._pending = False
+        self._task = None
+        context.model.updated.connect(self.refresh, type=Qt.QueuedConnection)
+
+    def snapshot(self) -> PathSnapshot:
+        """Return the current snapshot, reloading it when the index has changed"""
+        stamp = index_stamp(self.context)
+        snapshot = self._snapshot
+        if snapshot.stamp is not None and snapshot.stamp == stamp:
+            return snapshot
+        with self._lock:
+            # Another thread may have loaded the snapshot while we waited.
+            snapshot = self._snapshot
+            if snapshot.stamp is None or snapshot.stamp != stamp:
+                snapshot = PathSnapshot(gitcmds.tracked_files(self.context), stamp)
+                self._snapshot = snapshot
+                self.updated.emit()
+        return snapshot
+
+    def refresh(self) -> None:
+        """Reload the snapshot in the background when the index has changed"""
+        if self._pending or self._snapshot.stamp == index_stamp(self.context):
+            return
+        self._pending = True
+        # Hold a reference so that the task is not garbage collected while running.
+        self._task = qtutils.SimpleTask(self._refresh)
+        QtCore.QThreadPool.globalInstance().start(self._task)
+
+    def _refresh(self) -> None:
+        try:
+            self.snapshot()
+        finally:
+            self._pending = False
+
+
+def _common_prefix_len(first: str, second: str) -> int:
+    """Return the length of the common prefix shared by two strings"""
+    size = min(len(first), len(second))
+    idx = 0
+    while idx < size and first[idx] == second[idx]:
+        idx += 1
+    return idx
+
+
+def _decode_block(block: str) -> list[str]:
+    """Expand a front-coded block into its paths"""
+    entries = block.split('\0')
+    previous = entries[0]
+    paths = [previous]
+    for entry in entries[1:]:
+        previous = previous[: ord(entry[0]) - 1] + entry[1:]
+        paths.append(previous)
+    return paths
+
+
+def _normalize_dirname(dirname: str) -> str:
+    """Normalize "./", "dir/" and "dir" into repository-relative directory names"""
+    if dirname.startswith('./'):
+        dirname = dirname[2:]
+    return dirname.strip('/')
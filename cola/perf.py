@@ -0,0 +1,552 @@
+"""Startup timings, git command traces and import-time measurements
+
+This module only depends on the standard library so that it can be imported
+before everything else and measure the cost of importing the rest of cola.
+"""
+from __future__ import annotations
+import builtins
+from collections import deque
+from contextlib import contextmanager
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterator, NamedTuple
+
+# Startup phases are measured relative to the time that this module was imported.
+ORIGIN = time.perf_counter()
+
+# The number of git commands with individual timings kept in a report.
+MAX_COMMANDS = 256
+
+# The number of git commands kept by the git activity trace.
+TRACE_SIZE = 4096
+
+# The maximum number of cola stack frames recorded for each git command.
+MAX_STACK_DEPTH = 32
+
+# Frames from these modules are not reported as the caller of a git command.
+TRACE_SKIP_MODULES = ('cola.git', 'cola.perf')
+
+# git options that take a separate value before the subcommand.
+GIT_OPTIONS_WITH_VALUES = ('-c', '-C', '--git-dir', '--work-tree', '--namespace')
+
+
+class Timer:
+    """Record named phases along with their start offsets and durations"""
+
+    def __init__(self) -> None:
+        self._data: dict[str, list[float]] = {}
+
+    def start(self, key: str) -> None:
+        """Start a timer"""
+        now = time.perf_counter()
+        self._data[key] = [now, now]
+
+    def stop(self, key: str) -> float:
+        """Stop a timer and return its elapsed time"""
+        entry = self._data[key]
+        entry[1] = time.perf_counter()
+        return self.elapsed(key)
+
+    def elapsed(self, key: str) -> float:
+        """Return the elapsed time for a timer"""
+        entry = self._data[key]
+        return entry[1] - entry[0]
+
+    def display(self, key: str) -> None:
+        """Display a timer"""
+        elapsed = self.elapsed(key)
+        sys.stdout.write(f'{key}: {elapsed:.5f}s\n')
+
+    def is_stopped(self, key: str) -> bool:
+        """Has the timer been started and then stopped?"""
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > entry[0]
+
+    @contextmanager
+    def phase(self, key: str) -> Iterator[None]:
+        """Time the first run of a phase. Subsequent runs are not recorded"""
+        if key in self._data:
+            yield
+            return
+        self.start(key)
+        try:
+            yield
+        finally:
+            self.stop(key)
+
+    def phases(self) -> list[dict[str, Any]]:
+        """Return the recorded phases in the order that they were started"""
+        return [
+            {
+                'name': key,
+                'start': round(start - ORIGIN, 6),
+                'duration': round(end - start, 6),
+            }
+            for key, (start, end) in self._data.items()
+        ]
+
+
+class CommandStats:
+    """Count the git commands that are run until recording is stopped"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.commands: list[dict[str, Any]] = []
+        self._active = True
+        self._lock = threading.Lock()
+
+    def record(self, command: list, start: float, elapsed: float) -> None:
+        """Record a command that started at a perf_counter() value"""
+        if not self._active:
+            return
+        with self._lock:
+            self.count += 1
+            self.duration += elapsed
+            if len(self.commands) < MAX_COMMANDS:
+                self.commands.append({
+                    'command': ' '.join(str(arg) for arg in command[:3]),
+                    'start': round(start - ORIGIN, 6),
+                    'duration': round(elapsed, 6),
+                })
+
+    def stop(self) -> None:
+        """Stop recording commands"""
+        self._active = False
+
+    def report(self) -> dict[str, Any]:
+        """Return the command statistics as a dict"""
+        with self._lock:
+            return {
+                'count': self.count,
+                'duration': round(self.duration, 6),
+                'commands': list(self.commands),
+            }
+
+
+class ImportTimer:
+    """Measure the cost of importing modules, similar to "python -X importtime"
+
+    builtins.__import__ is wrapped so that each import statement that loads new
+    modules records its cumulative time and its self time, which excludes the
+    time spent in nested imports.
+    """
+
+    def __init__(self) -> None:
+        self.entries: list[dict[str, Any]] = []
+        self._import = builtins.__import__
+        self._children: list[float] = []
+        self._lock = threading.RLock()
+
+    def install(self) -> None:
+        """Start measuring imports"""
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        """Stop measuring imports"""
+        if builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Import a module and record the time spent when new modules are loaded"""
+        # Imports are serialized so that nested timings are attributed correctly.
+        with self._lock:
+            target = _resolve_name(name, globals, level)
+            new_target = target is not None and target not in sys.modules
+            submodules = [
+                f'{target}.{item}'
+                for item in (fromlist or ())
+                if target and f'{target}.{item}' not in sys.modules and item != '*'
+            ]
+            if not new_target and not submodules:
+                return self._import(name, globals, locals, fromlist, level)
+
+            self._children.append(0.0)
+            start = time.perf_counter()
+            try:
+                return self._import(name, globals, locals, fromlist, level)
+            finally:
+                cumulative = time.perf_counter() - start
+                children = self._children.pop()
+                if self._children:
+                    self._children[-1] += cumulative
+                loaded = [target] if new_target else []
+                loaded.extend(path for path in submodules if path in sys.modules)
+                if loaded:
+                    self.entries.append({
+                        'module': ', '.join(loaded),
+                        'self': round(cumulative - children, 6),
+                        'cumulative': round(cumulative, 6),
+                    })
+
+    def report(self) -> list[dict[str, Any]]:
+        """Return the import timings in the order that the imports completed"""
+        return list(self.entries)
+
+
+class StartupProfile:
+    """Aggregate the startup measurements into a single report"""
+
+    def __init__(self) -> None:
+        self.timer = Timer()
+        self.git_commands = CommandStats()
+        self.imports: ImportTimer | None = None
+        self._callbacks: list[Callable[[StartupProfile], None]] = []
+        self._completed = False
+        self._lock = threading.Lock()
+
+    def window_shown(self) -> None:
+        """Stop counting git commands once the main window has been painted"""
+        self.git_commands.stop()
+
+    def on_complete(self, callback: Callable[[StartupProfile], None]) -> None:
+        """Register a callback to run once startup has completed"""
+        self._callbacks.append(callback)
+
+    def complete(self) -> None:
+        """Mark startup as completed and run the callbacks once"""
+        with self._lock:
+            if self._completed:
+                return
+            self._completed = True
+        self.git_commands.stop()
+        if self.imports is not None:
+            self.imports.uninstall()
+        for callback in self._callbacks:
+            callback(self)
+
+    def report(self) -> dict[str, Any]:
+        """Return a JSON-serializable report"""
+        result = {
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'modules': len(sys.modules),
+            'phases': self.timer.phases(),
+            'git': self.git_commands.report(),
+        }
+        if self.imports is not None:
+            result['imports'] = self.imports.report()
+        return result
+
+    def display(self) -> None:
+        """Print a summary of the startup phases"""
+        for phase in self.timer.phases():
+            name = phase['name']
+            start = phase['start']
+            duration = phase['duration']
+            sys.stdout.write(f'{name}: {duration:.5f}s (at {start:.5f}s)\n')
+        git_report = self.git_commands.report()
+        count = git_report['count']
+        duration = git_report['duration']
+        sys.stdout.write(f'git commands: {count} in {duration:.5f}s\n')
+
+    def write(self, path: str) -> None:
+        """Write the report to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(self.report(), report_file, indent=2)
+            report_file.write('\n')
+
+
+class Frame(NamedTuple):
+    """A stack frame that led to a git command"""
+
+    module: str
+    function: str
+    line: int
+
+    def __str__(self) -> str:
+        return f'{self.module}.{self.function}:{self.line}'
+
+
+class GitTraceRecord(NamedTuple):
+    """A git command recorded by GitTrace"""
+
+    command: tuple[str, ...]
+    subcommand: str
+    stack: tuple[Frame, ...]  # Innermost frame first.
+    thread: str
+    thread_id: int
+    start: float  # Seconds relative to ORIGIN.
+    duration: float
+    stdout_bytes: int
+    status: int
+
+    @property
+    def caller(self) -> str:
+        """Return the innermost cola frame that ran the command"""
+        if self.stack:
+            return str(self.stack[0])
+        return '<unknown>'
+
+
+class GitTrace:
+    """Keep the most recent git commands in a ring buffer
+
+    The innermost cola frame that ran each command is always recorded. The full
+    stack is only captured while "capture_stacks" is enabled by the Git Activity
+    panel.
+    """
+
+    def __init__(self, size: int = TRACE_SIZE) -> None:
+        self.records: deque[GitTraceRecord] = deque(maxlen=size)
+        self.capture_stacks = False
+        self.count = 0  # The number of commands recorded since the last clear().
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        command: list,
+        start: float,
+        elapsed: float,
+        status: int = 0,
+        stdout_bytes: int = 0,
+        stack: tuple[Frame, ...] = (),
+    ) -> None:
+        """Record a command that started at a perf_counter() value"""
+        thread = threading.current_thread()
+        record = GitTraceRecord(
+            command=tuple(str(arg) for arg in command),
+            subcommand=git_subcommand(command),
+            stack=stack,
+            thread=thread.name,
+            thread_id=thread.ident or 0,
+            start=start - ORIGIN,
+            duration=elapsed,
+            stdout_bytes=stdout_bytes,
+            status=status,
+        )
+        with self._lock:
+            self.records.append(record)
+            self.count += 1
+
+    def clear(self) -> None:
+        """Forget the recorded commands"""
+        with self._lock:
+            self.records.clear()
+            self.count = 0
+
+    def snapshot(self) -> list[GitTraceRecord]:
+        """Return the recorded commands, oldest first"""
+        with self._lock:
+            return list(self.records)
+
+    def records_since(self, count: int) -> tuple[int, list[GitTraceRecord]]:
+        """Return the current count and the commands recorded after "count"
+
+        Commands that were dropped from the ring buffer are not returned.
+        """
+        with self._lock:
+            new_count = self.count
+            if count > new_count:
+                count = 0
+            added = min(new_count - count, len(self.records))
+            records = list(self.records)[len(self.records) - added :]
+        return new_count, records
+
+    def by_command(self) -> list[dict[str, Any]]:
+        """Aggregate the recorded commands by git subcommand"""
+        return _aggregate(self.snapshot(), lambda record: record.subcommand)
+
+    def by_caller(self) -> list[dict[str, Any]]:
+        """Aggregate the recorded commands by the code that ran them"""
+        return _aggregate(self.snapshot(), lambda record: record.caller)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Return the commands in the Chrome trace event format
+
+        Each command is a complete ("X") event on the thread that ran it.
+        """
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for record in self.snapshot():
+            threads[record.thread_id] = record.thread
+            events.append({
+                'name': record.subcommand,
+                'cat': 'git',
+                'ph': 'X',
+                'ts': round(record.start * 1e6, 3),
+                'dur': round(record.duration * 1e6, 3),
+                'pid': pid,
+                'tid': record.thread_id,
+                'args': {
+                    'command': ' '.join(record.command),
+                    'caller': record.caller,
+                    'stack': [str(frame) for frame in record.stack],
+                    'status': record.status,
+                    'stdout_bytes': record.stdout_bytes,
+                },
+            })
+        for thread_id, name in threads.items():
+            events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': thread_id,
+                'args': {'name': name},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def speedscope(self) -> dict[str, Any]:
+        """Return the commands as an evented speedscope profile for each thread
+
+        The cola stack frames that ran each command are included so that the
+        UI actions that run many git commands stand out in the flame graph.
+        """
+        frames: list[dict[str, str]] = []
+        frame_ids: dict[str, int] = {}
+
+        def frame_id(name: str) -> int:
+            if name not in frame_ids:
+                frame_ids[name] = len(frames)
+                frames.append({'name': name})
+            return frame_ids[name]
+
+        threads: dict[int, list[GitTraceRecord]] = {}
+        for record in self.snapshot():
+            threads.setdefault(record.thread_id, []).append(record)
+
+        profiles = []
+        for records in threads.values():
+            records.sort(key=lambda record: record.start)
+            events = []
+            end = 0.0
+            for record in records:
+                # Commands on the same thread run one at a time. Clamp the start
+                # so that events stay ordered despite clock rounding.
+                start = max(record.start, end)
+                end = start + record.duration
+                stack = [
+                    frame_id(f'{frame.module}.{frame.function}')
+                    for frame in reversed(record.stack)
+                ]
+                stack.append(frame_id('git ' + record.subcommand))
+                for frame in stack:
+                    events.append({'type': 'O', 'frame': frame, 'at': start * 1e3})
+                for frame in reversed(stack):
+                    events.append({'type': 'C', 'frame': frame, 'at': end * 1e3})
+            profiles.append({
+                'type': 'evented',
+                'name': records[0].thread,
+                'unit': 'milliseconds',
+                'startValue': records[0].start * 1e3,
+                'endValue': end * 1e3,
+                'events': events,
+            })
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': 'git-cola git activity',
+            'exporter': 'git-cola',
+            'shared': {'frames': frames},
+            'profiles': profiles,
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the commands to a Chrome trace JSON file"""
+        _write_json(path, self.chrome_trace())
+
+    def write_speedscope(self, path: str) -> None:
+        """Write the commands to a speedscope JSON file"""
+        _write_json(path, self.speedscope())
+
+
+def _aggregate(
+    records: list[GitTraceRecord], key: Callable[[GitTraceRecord], str]
+) -> list[dict[str, Any]]:
+    """Aggregate trace records by key, sorted by the total time spent"""
+    groups: dict[str, dict[str, Any]] = {}
+    for record in records:
+        name = key(record)
+        group = groups.get(name)
+        if group is None:
+            group = groups[name] = {
+                'name': name,
+                'count': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'stdout_bytes': 0,
+            }
+        group['count'] += 1
+        group['total'] += record.duration
+        group['max'] = max(group['max'], record.duration)
+        group['stdout_bytes'] += record.stdout_bytes
+    return sorted(groups.values(), key=lambda group: group['total'], reverse=True)
+
+
+def _write_json(path: str, data: dict[str, Any]) -> None:
+    """Write a JSON file"""
+    with open(path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file)
+        json_file.write('\n')
+
+
+def git_subcommand(command: list) -> str:
+    """Return the subcommand from a git command line
+
+    >>> git_subcommand(['git', '-c', 'log.showSignature=false', 'log', '-1'])
+    'log'
+    """
+    args = iter(command[1:])
+    for arg in args:
+        arg = str(arg)
+        if arg in GIT_OPTIONS_WITH_VALUES:
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return str(command[0]) if command else ''
+
+
+def call_stack(depth: int = 2, limit: int = MAX_STACK_DEPTH) -> tuple[Frame, ...]:
+    """Return up to "limit" cola frames that led to the caller, innermost first"""
+    frames = []
+    frame = sys._getframe(depth)
+    while frame is not None and len(frames) < limit:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('cola') and module not in TRACE_SKIP_MODULES:
+            code = frame.f_code
+            function = getattr(code, 'co_qualname', code.co_name)
+            frames.append(Frame(module, function, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(frames)
+
+
+def _resolve_name(name: str, globals_dict: dict | None, level: int) -> str | None:
+    """Resolve a possibly-relative module name into an absolute name"""
+    if not level:
+        return name
+    package = (globals_dict or {}).get('__package__')
+    if not package:
+        return None
+    try:
+        return importlib.util.resolve_name('.' * level + name, package)
+    except (ImportError, ValueError):
+        return None
+
+
+def record_git_command(
+    command: list, start: float, elapsed: float, status: int = 0, stdout_bytes: int = 0
+) -> None:
+    """Record a git command in the startup profile and the git activity trace"""
+    startup.git_commands.record(command, start, elapsed)
+    # The innermost caller is always recorded; full stacks are only walked
+    # while the git activity panel is visible.
+    stack = call_stack(limit=MAX_STACK_DEPTH if git_trace.capture_stacks else 1)
+    git_trace.record(
+        command,
+        start,
+        elapsed,
+        status=status,
+        stdout_bytes=stdout_bytes,
+        stack=stack,
+    )
+
+
+startup = StartupProfile()
+git_trace = GitTrace()
+if os.environ.get('GIT_COLA_PERF_IMPORTS'):
+    startup.imports = ImportTimer()
+    startup.imports.install()
@@ -183,6 +183,12 @@ def xdg_data_home(*args) -> TextType:
     return os.path.join(config, *args)
 
 
+def xdg_cache_home(*args) -> TextType:
+    """Return the XDG_CACHE_HOME cache directory, e.g. ~/.cache"""
+    cache = core.getenv('XDG_CACHE_HOME', os.path.join(core.expanduser('~'), '.cache'))
+    return os.path.join(cache, *args)
+
+
 def xdg_data_dirs() -> list[TextType]:
     """Return the current set of XDG data directories
 
@@ -219,3 +225,8 @@ def find_first(
 def config_home(*args) -> str:
     """Return git-cola's configuration directory, e.g. ~/.config/git-cola"""
     return xdg_config_home('git-cola', *args)
+
+
+def cache_home(*args) -> TextType:
+    """Return git-cola's cache directory, e.g. ~/.cache/git-cola"""
+    return xdg_cache_home('git-cola', *args)
@@ -0,0 +1,317 @@
+"""Indexes for fast substring and path completion lookups"""
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterable, Iterator
+import sys
+
+
+# Postings are cached per n-gram. Short n-grams match many entries so the cache
+# is bounded to keep memory usage in check for very large candidate lists.
+NGRAM_SIZE = 3
+MAX_CACHED_POSTINGS = 4096
+
+
+class SubstringIndex:
+    """Match a fixed set of candidates by substring and return them in sorted order
+
+    Candidates are stored once, in their case-insensitive sort order, so that
+    matching a query produces candidate ids that are already sorted.
+    Posting lists for each n-gram are built on demand by narrowing the
+    posting list of the n-gram's prefix, so typing a longer query only rescans
+    the candidates that matched the shorter one.
+
+    >>> index = SubstringIndex(['foo/bar', 'Foo', 'baz'])
+    >>> index.filter('foo', False)
+    ['Foo', 'foo/bar']
+    >>> index.filter('foo', True)
+    ['foo/bar']
+    >>> index.filter('', True)
+    ['Foo', 'baz', 'foo/bar']
+
+    """
+
+    def __init__(
+        self, candidates: Iterable[str], sort_key: Callable | None = None
+    ) -> None:
+        values = list(dict.fromkeys(candidates))
+        if sort_key is None:
+            values.sort(key=str.lower)
+        else:
+            values.sort(key=lambda value: sort_key(value.lower()))
+        self.values = values
+        self._lower = [value.lower() for value in values]
+        # Case-sensitive queries are ordered by the case-sensitive sort key.
+        order = sorted(
+            range(len(values)), key=lambda idx: (sort_key or _identity)(values[idx])
+        )
+        self._case_sensitive_order = order
+        self._case_sensitive_rank = array('I', bytes(4 * len(values)))
+        for rank, idx in enumerate(order):
+            self._case_sensitive_rank[idx] = rank
+        self._postings: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def filter(self, match_text: str, case_sensitive: bool) -> list[str]:
+        """Return the candidates containing "match_text" in sorted order"""
+        values = self.values
+        if not match_text:
+            if case_sensitive:
+                return [values[idx] for idx in self._case_sensitive_order]
+            return list(values)
+
+        ids = self.match_ids(match_text, case_sensitive)
+        if case_sensitive:
+            rank = self._case_sensitive_rank
+            ids = sorted(ids, key=rank.__getitem__)
+        return [values[idx] for idx in ids]
+
+    def match_ids(self, match_text: str, case_sensitive: bool) -> list[int]:
+        """Return the ids of matching candidates in case-insensitive order"""
+        lower_text = match_text.lower()
+        if len(lower_text) <= NGRAM_SIZE:
+            ids = self._posting(lower_text)
+        else:
+            # Scan the rarest n-gram's posting list instead of every candidate.
+            ngrams = {
+                lower_text[idx : idx + NGRAM_SIZE]
+                for idx in range(len(lower_text) - NGRAM_SIZE + 1)
+            }
+            ids = min((self._posting(ngram) for ngram in ngrams), key=len)
+            lower = self._lower
+            ids = [idx for idx in ids if lower_text in lower[idx]]
+
+        if case_sensitive:
+            values = self.values
+            return [idx for idx in ids if match_text in values[idx]]
+        return list(ids)
+
+    def _posting(self, ngram: str) -> array:
+        """Return the ids of all candidates containing "ngram" (lowercase)"""
+        try:
+            return self._postings[ngram]
+        except KeyError:
+            pass
+        lower = self._lower
+        if len(ngram) > 1:
+            parent = self._posting(ngram[:-1])
+            posting = array('I', [idx for idx in parent if ngram in lower[idx]])
+        else:
+            posting = array(
+                'I', [idx for idx, value in enumerate(lower) if ngram in value]
+            )
+        if len(self._postings) >= MAX_CACHED_POSTINGS:
+            self._postings.clear()
+        self._postings[ngram] = posting
+        return posting
+
+
+class PathNode:
+    """A directory in a PathTrie"""
+
+    __slots__ = ('name', 'parent', 'dirs', 'files')
+
+    def __init__(self, name: str, parent: PathNode | None) -> None:
+        self.name = name
+        self.parent = parent
+        self.dirs: dict[str, PathNode] = {}
+        self.files: set[str] = set()
+
+    def path(self) -> str:
+        """Return the full path by following the parent links"""
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return '/'.join(reversed(names))
+
+
+class PathTrie:
+    """A tree of paths used for directory membership, listing and prefix queries
+
+    Directories are nodes with parent links and file names are stored in their
+    directory. All names are interned so that common names such as
+    "__init__.py" are stored once. Inserting a path looks up its parent
+    directory and only walks upwards when the parent is new, so parent
+    directories are never expanded more than once.
+
+    >>> trie = PathTrie(['a/b/c.txt', 'a/b/d.txt', 'e.txt'])
+    >>> sorted(trie.dirs)
+    ['a', 'a/b']
+    >>> trie.children('a/b')
+    ['c.txt', 'd.txt']
+    >>> trie.is_dir('a')
+    True
+    >>> 'a/b' in trie, 'a/b/c.txt' in trie, 'a/c' in trie
+    (True, True, False)
+    >>> trie.startswith('a/b/c')
+    ['a/b/c.txt']
+
+    """
+
+    def __init__(self, paths: Iterable[str] = ()) -> None:
+        self.root = PathNode('', None)
+        self._dirs: dict[str, PathNode] = {'': self.root}
+        self._num_files = 0
+        for path in paths:
+            self.insert(path)
+
+    def insert(self, path: str) -> str:
+        """Insert a path and its parent directories. Returns the normalized path"""
+        if '//' in path or path.startswith('/') or path.endswith('/'):
+            path = normalize_path(path)
+            if not path:
+                return path
+        dirname, name = split_path(path)
+        node = self._dirs.get(dirname)
+        if node is None:
+            node = self._dir_node(dirname)
+        files = node.files
+        if name not in files:
+            files.add(sys.intern(name))
+            self._num_files += 1
+        return path
+
+    def _dir_node(self, dirname: str) -> PathNode:
+        """Return the node for a directory, creating it and its parents as needed"""
+        node = self._dirs.get(dirname)
+        if node is None:
+            parent_dir, name = split_path(dirname)
+            parent = self._dir_node(parent_dir)
+            name = sys.intern(name)
+            node = parent.dirs[name] = PathNode(name, parent)
+            self._dirs[dirname] = node
+        return node
+
+    def __len__(self) -> int:
+        """Return the number of files and directories"""
+        return self._num_files + len(self._dirs) - 1
+
+    def __contains__(self, path: str) -> bool:
+        """Is the path a file or a directory containing files?"""
+        return self.is_dir(path) or self.is_file(path)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over all of the files and directories"""
+        return self._walk(self.root, '')
+
+    def _walk(self, node: PathNode, prefix: str) -> Iterator[str]:
+        for name in node.files:
+            if name not in node.dirs:
+                yield prefix + name
+        for name, child in node.dirs.items():
+            path = prefix + name
+            yield path
+            yield from self._walk(child, path + '/')
+
+    def is_dir(self, path: str) -> bool:
+        """Is the path a directory containing other paths?"""
+        path = normalize_path(path)
+        return bool(path) and path in self._dirs
+
+    def is_file(self, path: str) -> bool:
+        """Was the path inserted into the trie?"""
+        dirname, name = split_path(normalize_path(path))
+        node = self._dirs.get(dirname)
+        return node is not None and name in node.files
+
+    @property
+    def dirs(self) -> set[str]:
+        """Return the directories that contain paths"""
+        dirs = set(self._dirs)
+        dirs.discard('')
+        return dirs
+
+    @property
+    def files(self) -> set[str]:
+        """Return the paths that were inserted"""
+        files = set()
+        for dirname, node in self._dirs.items():
+            prefix = dirname + '/' if dirname else ''
+            files.update(prefix + name for name in node.files)
+        return files
+
+    def children(self, path: str = '') -> list[str]:
+        """Return the sorted names of the entries directly below "path" """
+        node = self._dirs.get(normalize_path(path))
+        if node is None:
+            return []
+        return sorted(node.files.union(node.dirs))
+
+    def listdir(self, path: str = '') -> tuple[list[str], list[str]]:
+        """Return the sorted (dirs, files) directly below "path" as full paths"""
+        node = self._dirs.get(normalize_path(path))
+        if node is None:
+            return ([], [])
+        base = node.path()
+        base = base + '/' if base else ''
+        dirs = [base + name for name in sorted(node.dirs)]
+        files = [base + name for name in sorted(node.files) if name not in node.dirs]
+        return (dirs, files)
+
+    def startswith(self, prefix: str) -> list[str]:
+        """Return the sorted files and directories that start with "prefix" """
+        dirname, partial = split_path(prefix)
+        node = self._dirs.get(normalize_path(dirname))
+        if node is None:
+            return []
+        base = node.path()
+        base = base + '/' if base else ''
+        result = [
+            base + name
+            for name in node.files
+            if name.startswith(partial) and name not in node.dirs
+        ]
+        for name, child in node.dirs.items():
+            if name.startswith(partial):
+                path = base + name
+                result.append(path)
+                result.extend(self._walk(child, path + '/'))
+        result.sort()
+        return result
+
+    def paths(self) -> set[str]:
+        """Return all of the files and directories in the trie"""
+        return set(self)
+
+
+class PathIndex:
+    """Substring index over a list of files and their parent directories"""
+
+    def __init__(self, paths: Iterable[str] | PathTrie) -> None:
+        if isinstance(paths, PathTrie):
+            trie = paths
+        else:
+            trie = PathTrie(paths)
+        self.trie = trie
+        # Directories can also be tracked as paths, eg. submodules.
+        self.dirs = trie.dirs.difference(trie.files)
+        self.index = SubstringIndex(trie.paths())
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def filter(self, match_text: str, case_sensitive: bool) -> list[str]:
+        """Return the matching files and directories in sorted order"""
+        return self.index.filter(match_text, case_sensitive)
+
+
+def normalize_path(path: str) -> str:
+    """Collapse repeated slashes and strip leading and trailing slashes"""
+    if '//' in path:
+        path = '/'.join(part for part in path.split('/') if part)
+    return path.strip('/')
+
+
+def split_path(path: str) -> tuple[str, str]:
+    """Split a path into its directory and basename"""
+    if '/' in path:
+        dirname, name = path.rsplit('/', 1)
+        return (dirname, name)
+    return ('', path)
+
+
+def _identity(value):
+    return value
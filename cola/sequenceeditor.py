@@ -232,6 +232,10 @@ class Editor(QtWidgets.QWidget):
         # selected paths the GUI freezes for a while on a big enough sequence. This
         # cache is used (commit ID to paths tuple) to minimize calls to git.
         self.oid_to_paths = {}
+        # Inverted index of the cache (path to commit IDs) used to find the commits
+        # touching a set of paths without scanning the paths of every commit.
+        self.path_to_oids = {}
+        self.paths_indexed = False  # Is the index complete for every commit?
         self.task: SimpleTask | None = None  # A task fills the cache in the background.
         self.running = False  # This flag stops it.
 
@@ -245,8 +249,9 @@ class Editor(QtWidgets.QWidget):
         self.parse_sequencer_instructions(insns)
 
         # Assume that the tree is filled at this point.
+        oids = [item.oid for item in self.tree.items() if item.is_commit()]
         self.running = True
-        self.task = qtutils.SimpleTask(self.calculate_oid_to_paths)
+        self.task = qtutils.SimpleTask(self.calculate_oid_to_paths, oids)
         self.context.runtask.start(self.task)
 
     def stop(self) -> None:
@@ -262,13 +267,22 @@ class Editor(QtWidgets.QWidget):
         items = self.tree.items()
         touching_items = []
 
-        for item in items:
-            if not item.is_commit():
-                continue
-            oid = item.oid
-            paths = self.paths_touched_by_oid(oid)
-            if filenames.intersection(paths):
-                touching_items.append(item)
+        if self.paths_indexed:
+            path_to_oids = self.path_to_oids
+            oids = set()
+            for filename in filenames:
+                oids.update(path_to_oids.get(filename, ()))
+            touching_items = [
+                item for item in items if item.is_commit() and item.oid in oids
+            ]
+        else:
+            for item in items:
+                if not item.is_commit():
+                    continue
+                oid = item.oid
+                paths = self.paths_touched_by_oid(oid)
+                if filenames.intersection(paths):
+                    touching_items.append(item)
 
         self.tree.toggle_remark_of_items(remark, touching_items)
 
@@ -289,15 +303,30 @@ class Editor(QtWidgets.QWidget):
 
         paths = gitcmds.changed_files(self.context, oid)
         self.oid_to_paths[oid] = paths
+        for path in paths:
+            self.path_to_oids.setdefault(path, set()).add(oid)
 
         return paths
 
-    def calculate_oid_to_paths(self) -> None:
+    def calculate_oid_to_paths(self, oids: list[str] | None = None) -> None:
         """Fills the oid_to_paths cache in the background"""
-        for item in self.tree.items():
-            if not self.running:
-                return
-            self.paths_touched_by_oid(item.oid)
+        if oids is None:
+            oids = [item.oid for item in self.tree.items() if item.is_commit()]
+        # Query all of the commits using a single "git diff-tree --stdin".
+        oid_to_paths = gitcmds.changed_files_for_oids(self.context, oids)
+        if oid_to_paths is None:
+            for oid in oids:
+                if not self.running:
+                    return
+                self.paths_touched_by_oid(oid)
+        else:
+            path_to_oids = {}
+            for oid, paths in oid_to_paths.items():
+                for path in paths:
+                    path_to_oids.setdefault(path, set()).add(oid)
+            self.oid_to_paths = oid_to_paths
+            self.path_to_oids = path_to_oids
+        self.paths_indexed = self.running
 
     def parse_sequencer_instructions(self, insns: str) -> None:
         idx = 1
@@ -1,8 +1,11 @@
 """Save settings, bookmarks, etc."""
 from __future__ import annotations
+from collections import deque
 import json
 import os
 import sys
+import threading
+import time
 from typing import Any, Callable, TYPE_CHECKING
 
 from . import core
@@ -13,6 +16,13 @@ from . import resources
 if TYPE_CHECKING:
     from .types import ConfigValue
 
+# Repository validation results are cached in the settings for this many seconds.
+VALIDATE_TTL = 60 * 60
+# Paths that take longer than this many seconds to verify are reported as unknown.
+VALIDATE_TIMEOUT = 2.0
+# The maximum number of paths that are verified concurrently.
+VALIDATE_WORKERS = 8
+
 
 def mkdict(obj: dict[str, Any]) -> dict[str, Any]:
     """Transform None and non-dicts into dicts"""
@@ -74,6 +84,51 @@ def rename_path(old: str, new: str) -> bool:
     return True
 
 
+def validate_paths(
+    paths: list[str],
+    verify: Callable = git.is_git_worktree,
+    timeout: float = VALIDATE_TIMEOUT,
+    max_workers: int = VALIDATE_WORKERS,
+) -> dict[str, bool | None]:
+    """Verify paths concurrently and return a dict mapping paths to their validity
+
+    Paths that could not be verified within "timeout" seconds, eg. paths on stale
+    network mounts, map to None. Their threads are daemon threads that are left
+    behind so that a hung filesystem call cannot stall the caller or shutdown.
+    """
+    pending = deque(dict.fromkeys(paths))
+    running: dict[str, float] = {}  # Path to deadline.
+    results: dict[str, bool | None] = {}
+    condition = threading.Condition()
+
+    def check(path: str) -> None:
+        try:
+            valid = bool(verify(path))
+        except (OSError, ValueError):
+            valid = False
+        with condition:
+            if path in running:
+                del running[path]
+                results[path] = valid
+                condition.notify()
+
+    with condition:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                path = pending.popleft()
+                running[path] = time.monotonic() + timeout
+                thread = threading.Thread(target=check, args=(path,), daemon=True)
+                thread.start()
+            now = time.monotonic()
+            for path, deadline in list(running.items()):
+                if deadline <= now:
+                    del running[path]
+                    results[path] = None
+            if running:
+                condition.wait(min(running.values()) - now)
+    return results
+
+
 def remove_path(path: str) -> None:
     """Remove a filename. Report errors to stderr."""
     try:
@@ -88,6 +143,7 @@ class Settings:
     gui_state = property(lambda self: mkdict(self.values['gui_state']))
     recent = property(lambda self: mklist(self.values['recent']))
     copy_formats = property(lambda self: mklist(self.values['copy_formats']))
+    repo_status = property(lambda self: mkdict(self.values['repo_status']))
 
     def __init__(self, verify: Callable = git.is_git_worktree) -> None:
         """Load existing settings if they exist"""
@@ -96,14 +152,63 @@ class Settings:
             'gui_state': {},
             'recent': [],
             'copy_formats': [],
+            'repo_status': {},
         }
         self.verify = verify
 
+    def cached_repo_status(self, path: str, ttl: float = VALIDATE_TTL) -> bool | None:
+        """Return the cached validity of a repository or None when it is unknown"""
+        entry = self.repo_status.get(path)
+        if not isinstance(entry, dict):
+            return None
+        checked = entry.get('time', 0)
+        if not isinstance(checked, (int, float)) or time.time() - checked > ttl:
+            return None
+        return bool(entry.get('valid'))
+
+    def update_repo_status(self, results: dict[str, bool | None]) -> None:
+        """Cache validation results. Unknown results are not cached"""
+        now = time.time()
+        status = self.repo_status
+        for path, valid in results.items():
+            if valid is not None:
+                status[path] = {'valid': valid, 'time': now}
+        # Forget the paths that are no longer bookmarked or recent.
+        paths = {entry['path'] for entry in self.bookmarks + self.recent}
+        for path in list(status):
+            if path not in paths:
+                del status[path]
+        self.values['repo_status'] = status
+
+    def validate_repos(
+        self,
+        paths: list[str],
+        ttl: float = VALIDATE_TTL,
+        timeout: float = VALIDATE_TIMEOUT,
+    ) -> dict[str, bool | None]:
+        """Return the validity of repositories, verifying stale entries concurrently"""
+        results: dict[str, bool | None] = {}
+        stale = []
+        for path in paths:
+            valid = self.cached_repo_status(path, ttl=ttl)
+            if valid is None:
+                stale.append(path)
+            else:
+                results[path] = valid
+        if stale:
+            verified = validate_paths(stale, verify=self.verify, timeout=timeout)
+            self.update_repo_status(verified)
+            results.update(verified)
+        return results
+
     def remove_missing_bookmarks(self) -> None:
         """Remove "favorites" bookmarks that no longer exist"""
+        paths = [bookmark['path'] for bookmark in self.bookmarks]
+        status = self.validate_repos(paths, ttl=0)
+        # Entries that could not be verified in time are kept.
         missing_bookmarks = []
         for bookmark in self.bookmarks:
-            if not self.verify(bookmark['path']):
+            if status.get(bookmark['path']) is False:
                 missing_bookmarks.append(bookmark)
 
         for bookmark in missing_bookmarks:
@@ -114,9 +219,11 @@ class Settings:
 
     def remove_missing_recent(self) -> None:
         """Remove "recent" repositories that no longer exist"""
+        paths = [recent['path'] for recent in self.recent]
+        status = self.validate_repos(paths, ttl=0)
         missing_recent = []
         for recent in self.recent:
-            if not self.verify(recent['path']):
+            if status.get(recent['path']) is False:
                 missing_recent.append(recent)
 
         for recent in missing_recent:
@@ -3,6 +3,8 @@ import collections
 from collections.abc import Iterator
 import glob
 import os
+import re
+import threading
 from typing import Any
 
 from . import core
@@ -13,6 +15,37 @@ __copyright__ = """
 2013-2026 David Aguilar <davvid@gmail.com>
 """
 
+# The number of word verdicts remembered by NorvigSpellCheck.check().
+VERDICT_CACHE_SIZE = 8192
+
+# Text that is skipped by the tokenizer: `code spans`, URLs, paths and hex oids.
+SKIP_PATTERN = (
+    # `code spans`, including an unterminated span at the end of the text.
+    r'`[^`]*`?'
+    # URLs with a scheme, eg. https://example.com/path.
+    r'|\b[a-zA-Z][\w+.-]*://\S*'
+    # URLs without a scheme, eg. www.example.com.
+    r'|\bwww\.\S+'
+    # Paths that contain a "/" or "\" separator.
+    r'|[\w.~-]*(?:[/\\][\w.~-]*)+'
+    # Abbreviated and full hex object IDs that contain at least one digit.
+    r'|\b(?=[0-9a-fA-F]*[0-9])[0-9a-fA-F]{7,64}\b'
+)
+TOKENS = re.compile(rf"(?P<skip>{SKIP_PATTERN})|(?P<word>[\w']+)", re.UNICODE)
+
+
+def words(text: str) -> Iterator[tuple[int, str]]:
+    """Yield (offset, word) tuples for the words in text that should be checked
+
+    >>> list(words('Fix `foo_bar` in cola/app.py, see 1a2b3c4d'))
+    [(0, 'Fix'), (14, 'in'), (30, 'see')]
+    >>> list(words('Visit https://git-cola.github.io today'))
+    [(0, 'Visit'), (33, 'today')]
+    """
+    for match in TOKENS.finditer(text):
+        if match.lastgroup == 'word':
+            yield (match.start(), match.group())
+
 
 class GlobalState:
     ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
@@ -86,6 +119,12 @@ class NorvigSpellCheck:
         self.aspell_enabled = False
         self.aspell_langs = set()
         self.aspell_ok = False
+        # Verdicts are shared by all of the editors that use this instance.
+        # The generation is incremented whenever cached verdicts become stale.
+        self.generation = 0
+        self._verdicts: collections.OrderedDict[str, bool] = collections.OrderedDict()
+        self._ready = False
+        self._lock = threading.Lock()
 
     def add_dictionaries(self, dictionaries: list[Any]) -> None:
         """Add additional dictionaries to the spellcheck engine"""
@@ -104,6 +143,14 @@ class NorvigSpellCheck:
         GlobalState.train(self.extra_words, self.words, all_train_words)
 
         GlobalState.update()
+        self._ready = True
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Forget the cached verdicts"""
+        with self._lock:
+            self._verdicts.clear()
+            self.generation += 1
 
     def set_aspell_enabled(self, enabled: bool) -> None:
         """Enable aspell support"""
@@ -115,6 +162,9 @@ class NorvigSpellCheck:
 
     def add_word(self, word: str) -> None:
         self.extra_words.add(word)
+        if self._ready:
+            self.words[word] += 1
+            self.clear_cache()
 
     def suggest(self, word: str) -> list[str] | set[str]:
         self.init()
@@ -122,8 +172,21 @@ class NorvigSpellCheck:
 
     def check(self, word: str) -> bool:
         self.init()
-        word = word.replace('.', '')
-        return word in self.words or word.lower() in self.words
+        verdicts = self._verdicts
+        with self._lock:
+            verdict = verdicts.get(word)
+            if verdict is not None:
+                verdicts.move_to_end(word)
+                return verdict
+        stripped = word.replace('.', '')
+        verdict = stripped in self.words or stripped.lower() in self.words
+        # Verdicts are not cached while the dictionaries are still being loaded.
+        if self._ready:
+            with self._lock:
+                verdicts[word] = verdict
+                if len(verdicts) > VERDICT_CACHE_SIZE:
+                    verdicts.popitem(last=False)
+        return verdict
 
     def read(self, use_common_files: bool = True) -> Iterator[str]:
         """Read dictionary words"""
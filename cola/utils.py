@@ -1,7 +1,8 @@
 """Miscellaneous utility functions"""
 from __future__ import annotations
-import copy
+import fnmatch
 import hashlib
+import importlib
 import os
 import re
 import shlex
@@ -11,10 +12,11 @@ import tempfile
 import time
 import traceback
 import urllib.parse
-from typing import Any, Callable, TypeVar, TYPE_CHECKING
+from typing import Any, Callable, Iterable, TypeVar, TYPE_CHECKING
 
 from . import core
 from . import compat
+from . import searchindex
 
 if TYPE_CHECKING:
     from .types import TextType
@@ -25,6 +27,22 @@ _SSH_REGEX = re.compile(r'^(?P<user>[^@]+)@(?P<hostname>[^:]+):(?P<path>.+)')
 NumberT = TypeVar('NumberT', int, float)
 
 
+def lazy_callable(
+    module_name: str, name: str, package: str | None = None
+) -> Callable[..., Any]:
+    """Return a function that imports a module when called and calls module.name()
+
+    This defers the cost of importing dialogs and tool windows until their
+    actions are first triggered.
+    """
+
+    def call(*args, **kwargs):
+        module = importlib.import_module(module_name, package)
+        return getattr(module, name)(*args, **kwargs)
+
+    return call
+
+
 def asint(obj: int, default: int = 0) -> int:
     """Make any value into an int, even if the cast fails"""
     try:
@@ -53,19 +71,9 @@ def epoch_millis() -> int:
     return int(time.time() * 1000)
 
 
-def add_parents(paths: set[str]) -> set[str]:
-    """Iterate over each item in the set and add its parent directories."""
-    all_paths = set()
-    for path in paths:
-        while '//' in path:
-            path = path.replace('//', '/')
-        all_paths.add(path)
-        if '/' in path:
-            parent_dir = dirname(path)
-            while parent_dir:
-                all_paths.add(parent_dir)
-                parent_dir = dirname(parent_dir)
-    return all_paths
+def add_parents(paths: Iterable[str]) -> set[str]:
+    """Return the normalized paths and all of their parent directories."""
+    return searchindex.PathTrie(paths).paths()
 
 
 def format_exception(exc) -> tuple[TextType | None, str]:
@@ -134,6 +142,36 @@ def grep(pattern, items: list[Any], squash: bool = True):
     return result
 
 
+def compile_path_filter(patterns: list[str]) -> re.Pattern[str] | None:
+    """Compile filter patterns into a regex whose search() matches paths
+
+    Patterns containing glob characters must match the whole path, with "*"
+    matching "/" as in pathspecs. Other patterns match anywhere in a path.
+    Patterns are case-insensitive unless they contain uppercase characters.
+    Returns None when there are no patterns.
+
+    >>> search = compile_path_filter(['*.py', 'Doc']).search
+    >>> [bool(search(path)) for path in ('cola/app.py', 'README.md', 'Doc/x')]
+    [True, False, True]
+    """
+    regexes = []
+    for pattern in patterns:
+        if not pattern:
+            continue
+        if any(char in pattern for char in '*?['):
+            regex = '^' + fnmatch.translate(pattern)
+        else:
+            regex = re.escape(pattern)
+        if pattern == pattern.lower():
+            regex = f'(?i:{regex})'
+        else:
+            regex = f'(?:{regex})'
+        regexes.append(regex)
+    if not regexes:
+        return None
+    return re.compile('|'.join(regexes))
+
+
 def basename(path: str) -> str:
     """
     An os.path.basename() implementation that always uses '/'
@@ -553,16 +591,14 @@ def slice_func(input_items: list[str], map_func: Callable) -> tuple[int, str, st
     outs = []
     errs = []
 
-    items = copy.copy(input_items)
-    while items:
-        stat, out, err = map_func(items[:size])
+    for offset in range(0, len(input_items), size):
+        stat, out, err = map_func(input_items[offset : offset + size])
         if stat < 0:
             status = min(stat, status)
         else:
             status = max(stat, status)
         outs.append(out)
         errs.append(err)
-        items = items[size:]
 
     return (status, '\n'.join(outs), '\n'.join(errs))
 
@@ -51,6 +51,8 @@ _versions = {
     'rebase-update-refs': '2.38.0',
     # git rev-parse --show-superproject-working-tree was added in 2.13.0
     'show-superproject-working-tree': '2.13.0',
+    # git add/reset --pathspec-from-file and --pathspec-file-nul were added in 2.25.0
+    'pathspec-from-file': '2.25.0',
 }
 
 
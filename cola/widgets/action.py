@@ -6,13 +6,15 @@ from qtpy import QtWidgets
 
 from .. import cmds
 from .. import qtutils
+from .. import utils
 from ..i18n import N_
 from ..widgets import defs
-from ..widgets import remote
-from ..widgets import stash
 from ..qtutils import create_button
 from ..qtutils import connect_button
 
+# Dialogs are imported when their buttons are first clicked.
+lazy = partial(utils.lazy_callable, package=__package__)
+
 
 class QFlowLayoutWidget(QtWidgets.QFrame):
     _horizontal = QtWidgets.QBoxLayout.LeftToRight
@@ -97,12 +99,12 @@ class ActionButtons(QFlowLayoutWidget):
 
         # Add callbacks
         connect_button(self.refresh_button, cmds.run(cmds.Refresh, context))
-        connect_button(self.fetch_button, partial(remote.fetch, context))
-        connect_button(self.push_button, partial(remote.push, context))
-        connect_button(self.pull_button, partial(remote.pull, context))
+        connect_button(self.fetch_button, partial(lazy('.remote', 'fetch'), context))
+        connect_button(self.push_button, partial(lazy('.remote', 'push'), context))
+        connect_button(self.pull_button, partial(lazy('.remote', 'pull'), context))
         connect_button(self.sync_button, cmds.run(cmds.Sync, context))
         connect_button(self.sync_out_button, cmds.run(cmds.SyncOut, context))
-        connect_button(self.stash_button, partial(stash.view, context))
+        connect_button(self.stash_button, partial(lazy('.stash', 'view'), context))
         connect_button(self.stage_button, cmds.run(cmds.StageSelected, context))
         connect_button(self.exit_diff_mode_button, cmds.run(cmds.ResetMode, context))
         connect_button(self.unstage_button, self.unstage)
@@ -18,6 +18,7 @@ from .. import gitcmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
+from .. import searchindex
 from . import log
 from . import text
 
@@ -142,14 +143,14 @@ class BranchesTreeWidget(standard.TreeWidget):
         self.setExpandsOnDoubleClick(False)
 
         self.current_branch = None
-        self.tree_helper = BranchesTreeHelper(self)
+        self._current_item = None
+        self._trees = None
         self.git_helper = GitHelper(context)
         self.runtask = qtutils.RunTask(parent=self)
 
         self._visible = False
         self._needs_refresh = False
         self._branch_details_in_progress = False
-        self._tree_states = None
         self._name_filter = ''
 
         self.updated.connect(self.refresh, type=Qt.QueuedConnection)
@@ -162,9 +163,13 @@ class BranchesTreeWidget(standard.TreeWidget):
         self.doubleClicked.connect(self.checkout_action)
 
     def set_name_filter(self, value):
-        """Update the name filter and rebuild the tree to include only matching refs"""
+        """Update the name filter and hide the refs that do not match"""
         self._name_filter = value
-        self.refresh()
+        if self._trees is None or not self._visible:
+            self._needs_refresh = True
+            return
+        for tree in self._trees:
+            tree.set_name_filter(value)
 
     def refresh(self):
         """Refresh the UI widgets to match the current state"""
@@ -176,32 +181,26 @@ class BranchesTreeWidget(standard.TreeWidget):
         # There is no need to refresh the UI when this widget is inactive.
         if not self._visible:
             return
+        self._needs_refresh = False
         model = self.context.model
         self.current_branch = model.currentbranch
 
-        self._tree_states = self._save_tree_state()
-        ellipsis = icons.ellipsis()
-
-        local_tree = create_tree_entries(model.local_branches, self._name_filter)
-        local_tree.basename = N_('Local')
-        local = create_toplevel_item(local_tree, icon=icons.branch(), ellipsis=ellipsis)
-
-        remote_tree = create_tree_entries(model.remote_branches, self._name_filter)
-        remote_tree.basename = N_('Remote')
-        remote = create_toplevel_item(
-            remote_tree, icon=icons.branch(), ellipsis=ellipsis
-        )
-
-        tags_tree = create_tree_entries(model.tags, self._name_filter)
-        tags_tree.basename = N_('Tags')
-        tags = create_toplevel_item(tags_tree, icon=icons.tag(), ellipsis=ellipsis)
-
-        self.clear()
-        self.addTopLevelItems([local, remote, tags])
+        # Items are created once and updated in place so that the expanded and
+        # selected state of the tree is retained across refreshes.
+        if self._trees is None:
+            ellipsis = icons.ellipsis()
+            branch_icon = icons.branch()
+            self._trees = (
+                RefTree(N_('Local'), branch_icon, ellipsis),
+                RefTree(N_('Remote'), branch_icon, ellipsis),
+                RefTree(N_('Tags'), icons.tag(), ellipsis),
+            )
+            self.addTopLevelItems([tree.root for tree in self._trees])
 
-        if self._tree_states:
-            self._load_tree_state(self._tree_states)
-            self._tree_states = None
+        local, remote, tags = self._trees
+        local.set_refs(model.local_branches, self._name_filter)
+        remote.set_refs(model.remote_branches, self._name_filter)
+        tags.set_refs(model.tags, self._name_filter)
 
         self._update_branches()
 
@@ -321,33 +320,21 @@ class BranchesTreeWidget(standard.TreeWidget):
 
         menu.exec_(self.mapToGlobal(event.pos()))
 
-    def _save_tree_state(self):
-        """Save the tree state into a dictionary"""
-        states = {}
-        for item in self.items():
-            states.update(self.tree_helper.save_state(item))
-        return states
-
-    def _load_tree_state(self, states):
-        """Restore expanded items after rebuilding UI widgets"""
-        # Disable animations to eliminate redraw flicker.
-        animated = self.isAnimated()
-        self.setAnimated(False)
-
-        for item in self.items():
-            self.tree_helper.load_state(item, states.get(item.name, {}))
-        self.tree_helper.set_current_item()
-
-        self.setAnimated(animated)
-
     def _update_branches(self):
         """Query branch details using a background task"""
         context = self.context
         current_branch = self.current_branch
-        top_item = self.topLevelItem(0)
-        item = find_by_refname(top_item, current_branch)
+        local = self._trees[0]
+        item = local.find(current_branch)
+
+        # Reset the decorations on the previous current branch.
+        previous_item = self._current_item
+        if previous_item is not None and previous_item is not item:
+            local.reset_item(previous_item)
+        self._current_item = item
 
         if item is not None:
+            local.reset_item(item)
             expand_item_parents(item)
             item.setIcon(0, icons.star())
             if self._branch_details_in_progress:
@@ -363,8 +350,7 @@ class BranchesTreeWidget(standard.TreeWidget):
     def _update_branches_finished(self, task):
         """Update the UI with the branch details once the background task completes"""
         current_branch, tracked_branch, ahead, behind = task.result
-        top_item = self.topLevelItem(0)
-        item = find_by_refname(top_item, current_branch)
+        item = self._trees[0].find(current_branch)
         if current_branch and tracked_branch and item is not None:
             status_str = ''
             if ahead > 0:
@@ -565,127 +551,208 @@ class BranchTreeWidgetItem(QtWidgets.QTreeWidgetItem):
         if icon is not None:
             self.setIcon(0, icon)
         self.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        # The position of the item in the order provided by the model.
+        self.rank = 0
 
+    def __lt__(self, other):
+        """Sort items by their rank"""
+        return self.rank < other.rank
 
-class TreeEntry:
-    """Tree representation for the branches widget
-
-    The branch widget UI displays the basename.  For intermediate names, e.g.
-    "xxx" in the "xxx/abc" and "xxx/def" branches, the 'refname' will be None.
-    'children' contains a list of TreeEntry, and is empty when refname is
-    defined.
-
-    """
 
-    def __init__(self, basename, refname, children):
-        self.basename = basename
-        self.refname = refname
-        self.children = children
-
-
-def create_tree_entries(names, name_filter):
-    """Create a nested tree structure with a single root TreeEntry.
-
-    When names == ['xxx/abc', 'xxx/def'] the result will be::
-
-        TreeEntry(
-            basename=None,
-            refname=None,
-            children=[
-                TreeEntry(
-                    basename='xxx',
-                    refname=None,
-                    children=[
-                        TreeEntry(
-                            basename='abc',
-                            refname='xxx/abc',
-                            children=[]
-                        ),
-                        TreeEntry(
-                            basename='def',
-                            refname='xxx/def',
-                            children=[]
-                        )
-                    ]
-                )
-            ]
-        )
+class RefTree:
+    """Apply changes to a list of refs onto the items below a top-level item
 
+    Refs that were added or removed are inserted or deleted individually so
+    that the remaining items are kept. Items are found in constant time using
+    the refname and filtering hides the items that do not match the filter.
     """
-    # Phase 1: build a nested dictionary representing the intermediate
-    # names in the branches, e.g. {'xxx': {'abc': {}, 'def': {}}}
-    filtered_names = [name for name in names if name_filter in name]
-    tree_names = create_name_dict(filtered_names)
-
-    # Loop over the names again, this time we'll create tree entries
-    entries = {}
-    root = TreeEntry(None, None, [])
-    for item in filtered_names:
-        cur_names = tree_names
-        cur_entries = entries
-        tree = root
-        children = root.children
-        for part in item.split('/'):
-            if cur_names[part]:
-                # This has children
-                try:
-                    tree, _ = cur_entries[part]
-                except KeyError:
-                    # New entry
-                    tree = TreeEntry(part, None, [])
-                    cur_entries[part] = (tree, {})
-                    # Append onto the parent children list only once
-                    children.append(tree)
-            else:
-                # This is the actual branch
-                tree = TreeEntry(part, item, [])
-                children.append(tree)
-                cur_entries[part] = (tree, {})
-
-            # Advance into the nested child list
-            children = tree.children
-            # Advance into the inner dict
-            cur_names = cur_names[part]
-            _, cur_entries = cur_entries[part]
-
-    return root
-
-
-def create_name_dict(names):
-    # Phase 1: build a nested dictionary representing the intermediate
-    # names in the branches, e.g. {'xxx': {'abc': {}, 'def': {}}}
-    tree_names = {}
-    for item in names:
-        part_names = tree_names
-        for part in item.split('/'):
-            # Descend into the inner names dict.
-            part_names = part_names.setdefault(part, {})
-    return tree_names
 
+    def __init__(self, name, icon, ellipsis):
+        self.icon = icon
+        self.ellipsis = ellipsis
+        self.root = BranchTreeWidgetItem(name, icon=ellipsis)
+        self.names = []
+        self._refs = {}  # refname -> leaf item
+        self._dirs = {}  # intermediate "xxx/yyy" name -> item
+        self._ranks = {}  # refname or intermediate name -> rank
+        self._hidden = set()  # refnames and intermediate names that are hidden
+        self._index = None
+        self._name_filter = ''
 
-def create_toplevel_item(tree, icon=None, ellipsis=None):
-    """Create a top-level BranchTreeWidgetItem and its children"""
+    def find(self, refname):
+        """Return the item for a refname, or None when not present"""
+        if not refname:
+            return None
+        return self._refs.get(refname)
+
+    def is_hidden(self, name):
+        """Is the refname or intermediate "xxx/yyy" name hidden by the filter?"""
+        return name in self._hidden
+
+    def reset_item(self, item):
+        """Restore the default text and icon for an item"""
+        item.setText(0, item.name)
+        item.setIcon(0, self.icon)
+
+    def set_refs(self, names, name_filter=''):
+        """Update the tree to display the specified refs in the specified order"""
+        if names != self.names:
+            self._apply_refs(list(names))
+        self.set_name_filter(name_filter, force=self._index is None)
+
+    def _apply_refs(self, names):
+        refs = self._refs
+        new_names = set(names)
+        removed = [name for name in self.names if name not in new_names]
+        retained_old_order = [name for name in self.names if name in new_names]
+        retained_new_order = [name for name in names if name in refs]
+
+        for name in removed:
+            self._remove(name)
+
+        self._ranks = ranks = _tree_ranks(names)
+        for name, item in refs.items():
+            item.rank = ranks[name]
+        for name, item in self._dirs.items():
+            item.rank = ranks[name]
+
+        for name in names:
+            if name not in refs:
+                self._add(name)
+
+        # The sort order changed, eg. from version-sorted to date-sorted.
+        if retained_old_order != retained_new_order:
+            self._sort_by_rank()
+
+        self.names = names
+        self._index = None
+
+    def _sort_by_rank(self):
+        """Reorder the items at every level and restore their expanded state"""
+        items = list(self._dirs.values()) + list(self._refs.values())
+        expanded = [item for item in self._dirs.values() if item.isExpanded()]
+        selected = [item for item in items if item.isSelected()]
+        tree = self.root.treeWidget()
+        current = tree.currentItem() if tree is not None else None
+
+        _sort_children_by_rank(self.root)
+
+        if current is not None and current.treeWidget() is tree:
+            tree.setCurrentItem(current)
+        for item in expanded:
+            item.setExpanded(True)
+        for item in selected:
+            item.setSelected(True)
 
-    item = BranchTreeWidgetItem(tree.basename, icon=ellipsis)
-    children = create_tree_items(tree.children, icon=icon, ellipsis=ellipsis)
-    if children:
-        item.addChildren(children)
-    return item
+    def _add(self, name):
+        """Add a leaf item for a refname along with its intermediate items"""
+        parent = self.root
+        if '/' in name:
+            parent = self._add_dir(name.rsplit('/', 1)[0])
+        item = BranchTreeWidgetItem(
+            name.rsplit('/', 1)[-1], refname=name, icon=self.icon
+        )
+        item.rank = self._ranks[name]
+        _insert_by_rank(parent, item)
+        self._refs[name] = item
 
+    def _add_dir(self, dirname):
+        """Return the intermediate item for "dirname", creating it when missing"""
+        try:
+            return self._dirs[dirname]
+        except KeyError:
+            pass
+        parent = self.root
+        if '/' in dirname:
+            parent = self._add_dir(dirname.rsplit('/', 1)[0])
+        item = BranchTreeWidgetItem(dirname.rsplit('/', 1)[-1], icon=self.ellipsis)
+        item.rank = self._ranks[dirname]
+        _insert_by_rank(parent, item)
+        self._dirs[dirname] = item
+        return item
+
+    def _remove(self, name):
+        """Remove a leaf item and any intermediate items that become empty"""
+        item = self._refs.pop(name)
+        self._hidden.discard(name)
+        parent = item.parent()
+        parent.removeChild(item)
+        dirname = name
+        while parent is not self.root and parent.childCount() == 0:
+            dirname = dirname.rsplit('/', 1)[0]
+            del self._dirs[dirname]
+            self._hidden.discard(dirname)
+            item = parent
+            parent = item.parent()
+            parent.removeChild(item)
+
+    def set_name_filter(self, name_filter, force=False):
+        """Hide the refs that do not contain the filter text"""
+        if name_filter == self._name_filter and not force:
+            return
+        self._name_filter = name_filter
+        hidden = set()
+        if name_filter:
+            if self._index is None:
+                self._index = searchindex.SubstringIndex(self.names)
+            values = self._index.values
+            matched = {values[idx] for idx in self._index.match_ids(name_filter, True)}
+            visible_dirs = set()
+            for name in matched:
+                dirname = name
+                while '/' in dirname:
+                    dirname = dirname.rsplit('/', 1)[0]
+                    if dirname in visible_dirs:
+                        break
+                    visible_dirs.add(dirname)
+            hidden.update(name for name in self._refs if name not in matched)
+            hidden.update(name for name in self._dirs if name not in visible_dirs)
+
+        # Only touch the items whose visibility changed.
+        for name in hidden.symmetric_difference(self._hidden):
+            item = self._refs.get(name) or self._dirs.get(name)
+            if item is not None:
+                item.setHidden(name in hidden)
+        self._hidden = hidden
+
+
+def _tree_ranks(names):
+    """Rank refnames and intermediate names by their first appearance in names"""
+    ranks = {}
+    for rank, name in enumerate(names):
+        ranks[name] = rank
+        dirname = name
+        while '/' in dirname:
+            dirname = dirname.rsplit('/', 1)[0]
+            if dirname in ranks:
+                break
+            ranks[dirname] = rank
+    return ranks
+
+
+def _insert_by_rank(parent, item):
+    """Insert an item into its parent at the position given by its rank"""
+    low = 0
+    high = parent.childCount()
+    while low < high:
+        mid = (low + high) // 2
+        if parent.child(mid).rank < item.rank:
+            low = mid + 1
+        else:
+            high = mid
+    parent.insertChild(low, item)
 
-def create_tree_items(entries, icon=None, ellipsis=None):
-    """Create children items for a tree item"""
-    result = []
-    for tree in entries:
-        item = BranchTreeWidgetItem(tree.basename, refname=tree.refname, icon=icon)
-        children = create_tree_items(tree.children, icon=icon, ellipsis=ellipsis)
-        if children:
-            item.addChildren(children)
-            if ellipsis is not None:
-                item.setIcon(0, ellipsis)
-        result.append(item)
 
-    return result
+def _sort_children_by_rank(parent):
+    """Reorder the children of an item and of its descendants by rank"""
+    children = [parent.child(idx) for idx in range(parent.childCount())]
+    ordered = sorted(children)
+    if ordered != children:
+        parent.takeChildren()
+        parent.addChildren(ordered)
+    for item in ordered:
+        if item.childCount():
+            _sort_children_by_rank(item)
 
 
 def expand_item_parents(item):
@@ -697,22 +764,6 @@ def expand_item_parents(item):
         parent = parent.parent()
 
 
-def find_by_refname(item, refname):
-    """Find child by full name recursive"""
-    result = None
-
-    for i in range(item.childCount()):
-        child = item.child(i)
-        if child.refname and child.refname == refname:
-            return child
-
-        result = find_by_refname(child, refname)
-        if result is not None:
-            return result
-
-    return result
-
-
 def get_toplevel_item(item):
     """Returns top-most item found by traversing up the specified item"""
     parents = [item]
@@ -725,54 +776,6 @@ def get_toplevel_item(item):
     return parents[-1]
 
 
-class BranchesTreeHelper:
-    """Save and restore the tree state"""
-
-    def __init__(self, tree):
-        self.tree = tree
-        self.current_item = None
-
-    def set_current_item(self):
-        """Reset the current item"""
-        if self.current_item is not None:
-            self.tree.setCurrentItem(self.current_item)
-        self.current_item = None
-
-    def load_state(self, item, state):
-        """Load expanded items from a dict"""
-        if not state:
-            return
-        if state.get('expanded', False) and not item.isExpanded():
-            item.setExpanded(True)
-        if state.get('selected', False) and not item.isSelected():
-            item.setSelected(True)
-            self.current_item = item
-
-        children_state = state.get('children', {})
-        if not children_state:
-            return
-        for i in range(item.childCount()):
-            child = item.child(i)
-            self.load_state(child, children_state.get(child.name, {}))
-
-    def save_state(self, item):
-        """Save the selected and expanded item state into a dict"""
-        expanded = item.isExpanded()
-        selected = item.isSelected()
-        children = {}
-        entry = {
-            'children': children,
-            'expanded': expanded,
-            'selected': selected,
-        }
-        result = {item.name: entry}
-        for i in range(item.childCount()):
-            child = item.child(i)
-            children.update(self.save_state(child))
-
-        return result
-
-
 class GitHelper:
     def __init__(self, context):
         self.context = context
@@ -21,7 +21,7 @@ from .. import hotkeys
 from .. import icons
 from .. import utils
 from .. import qtutils
-from .selectcommits import select_commits
+from .selectcommits import select_commits_from_log
 from . import common
 from . import defs
 from . import standard
@@ -425,10 +425,10 @@ class RepoTreeView(standard.TreeView):
 
         paths = self.selected_paths()
         model = self.context.model
-        model_staged = utils.add_parents(model.staged)
-        model_modified = utils.add_parents(model.modified)
-        model_unmerged = utils.add_parents(model.unmerged)
-        model_untracked = utils.add_parents(model.untracked)
+        model_staged = model.path_trie('staged')
+        model_modified = model.path_trie('modified')
+        model_unmerged = model.path_trie('unmerged')
+        model_untracked = model.path_trie('untracked')
 
         for path in paths:
             if path in model_unmerged:
@@ -485,7 +485,7 @@ class RepoTreeView(standard.TreeView):
         if selection is None:
             selection = self.selected_paths()
         model = self.context.model
-        staged = utils.add_parents(model.staged)
+        staged = model.path_trie('staged')
         return [p for p in selection if p in staged]
 
     def selected_modified_paths(self, selection=None):
@@ -493,7 +493,7 @@ class RepoTreeView(standard.TreeView):
         if selection is None:
             selection = self.selected_paths()
         model = self.context.model
-        modified = utils.add_parents(model.modified)
+        modified = model.path_trie('modified')
         return [p for p in selection if p in modified]
 
     def selected_unstaged_paths(self, selection=None):
@@ -501,10 +501,9 @@ class RepoTreeView(standard.TreeView):
         if selection is None:
             selection = self.selected_paths()
         model = self.context.model
-        modified = utils.add_parents(model.modified)
-        untracked = utils.add_parents(model.untracked)
-        unstaged = modified.union(untracked)
-        return [p for p in selection if p in unstaged]
+        modified = model.path_trie('modified')
+        untracked = model.path_trie('untracked')
+        return [p for p in selection if p in modified or p in untracked]
 
     def selected_tracked_paths(self, selection=None):
         """Return selected tracked paths."""
@@ -513,7 +512,7 @@ class RepoTreeView(standard.TreeView):
         model = self.context.model
         staged = set(self.selected_staged_paths(selection=selection))
         modified = set(self.selected_modified_paths(selection=selection))
-        untracked = utils.add_parents(model.untracked)
+        untracked = model.path_trie('untracked')
         tracked = staged.union(modified)
         return [p for p in selection if p not in untracked or p in tracked]
 
@@ -537,9 +536,9 @@ class RepoTreeView(standard.TreeView):
         context = self.context
         paths = self.selected_tracked_paths()
         args = ['--'] + paths
-        revs, summaries = gitcmds.log_helper(context, all=False, extra_args=args)
-        commits = select_commits(
-            context, N_('Select Previous Version'), revs, summaries, multiselect=False
+        pages = gitcmds.LogPages(context, extra_args=args)
+        commits = select_commits_from_log(
+            context, N_('Select Previous Version'), pages, multiselect=False
         )
         if not commits:
             return
@@ -26,7 +26,7 @@ from ..models import prefs
 from ..qtutils import get
 from . import defs
 from . import standard
-from .selectcommits import select_commits
+from .selectcommits import select_commits_from_log
 from .spellcheck import SpellCheckLineEdit, SpellCheckTextEdit
 from .text import event_anchor_mode, is_shift_pressed
 
@@ -683,9 +683,9 @@ class CommitMessageEditor(QtWidgets.QFrame):
 
     def choose_commit(self, cmd):
         context = self.context
-        revs, summaries = gitcmds.log_helper(context)
-        oids = select_commits(
-            context, N_('Select Commit'), revs, summaries, multiselect=False
+        pages = gitcmds.LogPages(context)
+        oids = select_commits_from_log(
+            context, N_('Select Commit'), pages, multiselect=False
         )
         if not oids:
             return
@@ -1,5 +1,4 @@
 import re
-import time
 
 from qtpy import QtCore
 from qtpy import QtGui
@@ -12,6 +11,7 @@ from .. import core
 from .. import gitcmds
 from .. import icons
 from .. import qtutils
+from .. import searchindex
 from .. import utils
 from . import defs
 from .text import HintedLineEdit
@@ -233,11 +233,7 @@ class CompletionLineEdit(HintedLineEdit):
         indexes = model.selectedIndexes()
         if not indexes:
             return None
-        idx = indexes[0]
-        item = self._completion_model.itemFromIndex(idx)
-        if not item:
-            return None
-        return item.text()
+        return indexes[0].data() or None
 
     def select_completion(self):
         """Choose the selected completion option from the completion popup"""
@@ -425,22 +421,38 @@ def ref_sort_key(ref):
     return len(ref), ref
 
 
-class CompletionModel(QtGui.QStandardItemModel):
+class CompletionModel(QtCore.QAbstractListModel):
+    """A virtual list model that creates rows and icons as they are displayed
+
+    Matching is performed against search indexes that are built once and reused
+    until "model_updated" is emitted.
+    """
+
     updated = Signal()
     items_gathered = Signal(object)
     model_updated = Signal()
 
     def __init__(self, context, parent):
-        QtGui.QStandardItemModel.__init__(self, parent)
+        QtCore.QAbstractListModel.__init__(self, parent)
         self.context = context
         self.match_text = ''
         self.full_text = ''
         self.case_sensitive = False
 
+        self._items = []
+        self._dirs = set()
+        self._num_refs = 0
+        self._icons = {}
+
+        self._generation = 0
+        self._ref_index = None
+        self._path_index = None
+
         self.update_thread = GatherCompletionsThread(self)
         self.update_thread.items_gathered.connect(
             self.apply_matches, type=Qt.QueuedConnection
         )
+        self.model_updated.connect(self.invalidate, type=Qt.QueuedConnection)
 
     def update(self):
         case_sensitive = self.update_thread.case_sensitive
@@ -457,94 +469,101 @@ class CompletionModel(QtGui.QStandardItemModel):
         if not self.update_thread.isRunning():
             self.update_thread.start()
 
+    def invalidate(self):
+        """Discard the search indexes so that they are rebuilt on the next query"""
+        self._generation += 1
+        self._ref_index = None
+        self._path_index = None
+
+    def matches(self):
+        """Return the candidate refs and options for completion"""
+        return []
+
+    def candidate_paths(self):
+        """Return the candidate paths for completion"""
+        return []
+
+    def ref_index(self):
+        """Return the search index for the candidates from matches()"""
+        index = self._ref_index
+        if index is None:
+            generation = self._generation
+            index = searchindex.SubstringIndex(self.matches(), sort_key=ref_sort_key)
+            if generation == self._generation:
+                self._ref_index = index
+        return index
+
+    def path_index(self):
+        """Return the search index for the candidates from candidate_paths()"""
+        index = self._path_index
+        if index is None:
+            generation = self._generation
+            index = searchindex.PathIndex(self.candidate_paths())
+            if generation == self._generation:
+                self._path_index = index
+        return index
+
     def gather_matches(self, case_sensitive):
         return ((), (), set())
 
     def apply_matches(self, match_tuple):
-        """Build widgets for all of the matching items"""
+        """Replace the model's rows with the matching items"""
         if not match_tuple:
             # Results from background tasks may arrive after the widget
             # has been destroyed.
-            utils.catch_runtime_error(self.set_items, [])
+            utils.catch_runtime_error(self.set_matches, (), (), set())
             return
         matched_refs, matched_paths, dirs = match_tuple
-        QStandardItem = QtGui.QStandardItem
-
-        dir_icon = icons.directory()
-        git_icon = icons.cola()
-
-        items = []
-        for ref in matched_refs:
-            item = QStandardItem()
-            item.setText(ref)
-            item.setIcon(git_icon)
-            items.append(item)
-
-        from_filename = icons.from_filename
-        for match in matched_paths:
-            item = QStandardItem()
-            item.setText(match)
-            if match in dirs:
-                item.setIcon(dir_icon)
-            else:
-                item.setIcon(from_filename(match))
-            items.append(item)
-
         # Results from background tasks can arrive after the widget has been destroyed.
-        utils.catch_runtime_error(self.set_items, items)
-
-    def set_items(self, items):
-        """Clear the widget and add items to the model"""
-        self.clear()
-        self.invisibleRootItem().appendRows(items)
+        utils.catch_runtime_error(self.set_matches, matched_refs, matched_paths, dirs)
+
+    def set_matches(self, refs, paths, dirs):
+        """Reset the model to display the specified refs and paths"""
+        self.beginResetModel()
+        self._items = list(refs) + list(paths)
+        self._dirs = dirs
+        self._num_refs = len(refs)
+        self._icons = {}
+        self.endResetModel()
         self.updated.emit()
 
-    def dispose(self):
-        self.update_thread.dispose()
-
-
-def _identity(value):
-    return value
-
-
-def _lower(value):
-    return value.lower()
-
-
-def filter_matches(match_text, candidates, case_sensitive, sort_key=None):
-    """Filter candidates and return the matches"""
-    if case_sensitive:
-        case_transform = _identity
-    else:
-        case_transform = _lower
-
-    if match_text:
-        match_text = case_transform(match_text)
-        matches = [r for r in candidates if match_text in case_transform(r)]
-    else:
-        matches = list(candidates)
-
-    if case_sensitive:
-        if sort_key is None:
-            matches.sort()
+    def _icon(self, row):
+        """Return the icon for a row, creating it on first use"""
+        try:
+            return self._icons[row]
+        except KeyError:
+            pass
+        if row < self._num_refs:
+            icon = icons.cola()
         else:
-            matches.sort(key=sort_key)
-    else:
-        if sort_key is None:
-            matches.sort(key=_lower)
-        else:
-            matches.sort(key=lambda x: sort_key(_lower(x)))
-    return matches
+            text = self._items[row]
+            if text in self._dirs:
+                icon = icons.directory()
+            else:
+                icon = icons.from_filename(text)
+        self._icons[row] = icon
+        return icon
 
+    # Qt overrides
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._items)
 
-def filter_path_matches(match_text, file_list, case_sensitive):
-    """Return matching completions from a list of candidate files"""
-    files = set(file_list)
-    files_and_dirs = utils.add_parents(files)
-    dirs = files_and_dirs.difference(files)
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if row < 0 or row >= len(self._items):
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._items[row]
+        if role == Qt.DecorationRole:
+            return self._icon(row)
+        return None
 
-    paths = filter_matches(match_text, files_and_dirs, case_sensitive)
-    return (paths, dirs)
+    def dispose(self):
+        self.update_thread.dispose()
 
 
 class Completer(QtWidgets.QCompleter):
@@ -554,6 +573,10 @@ class Completer(QtWidgets.QCompleter):
         self.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
         self.setCaseSensitivity(Qt.CaseInsensitive)
         self.setFilterMode(QtCore.Qt.MatchContains)
+        # Rows have a uniform height so views do not need to measure every row.
+        popup = self.popup()
+        if hasattr(popup, 'setUniformItemSizes'):
+            popup.setUniformItemSizes(True)
 
         model.model_updated.connect(self.update, type=Qt.QueuedConnection)
         self.setModel(model)
@@ -575,14 +598,9 @@ class GitCompletionModel(CompletionModel):
         context.model.updated.connect(self.model_updated, type=Qt.QueuedConnection)
 
     def gather_matches(self, case_sensitive):
-        refs = filter_matches(
-            self.match_text, self.matches(), case_sensitive, sort_key=ref_sort_key
-        )
+        refs = self.ref_index().filter(self.match_text, case_sensitive)
         return (refs, (), set())
 
-    def matches(self):
-        return []
-
 
 class GitRefCompletionModel(GitCompletionModel):
     """Completer for branches and tags"""
@@ -667,14 +685,10 @@ class GitPathCompletionModel(GitCompletionModel):
     def __init__(self, context, parent):
         GitCompletionModel.__init__(self, context, parent)
 
-    def candidate_paths(self):
-        return []
-
     def gather_matches(self, case_sensitive):
-        paths, dirs = filter_path_matches(
-            self.match_text, self.candidate_paths(), case_sensitive
-        )
-        return ((), paths, dirs)
+        index = self.path_index()
+        paths = index.filter(self.match_text, case_sensitive)
+        return ((), paths, index.dirs)
 
 
 class GitStatusFilterCompletionModel(GitPathCompletionModel):
@@ -693,32 +707,30 @@ class GitTrackedCompletionModel(GitPathCompletionModel):
 
     def __init__(self, context, parent):
         GitPathCompletionModel.__init__(self, context, parent)
-        self.model_updated.connect(self.gather_paths, type=Qt.QueuedConnection)
-        self._paths = []
 
-    def gather_paths(self):
-        context = self.context
-        self._paths = gitcmds.tracked_files(context)
+    def path_index(self):
+        """Use the index shared through the application-wide tracked paths cache"""
+        return self.context.tracked_paths.snapshot().path_index()
 
-    def gather_matches(self, case_sensitive):
-        if not self._paths:
-            self.gather_paths()
 
-        refs = []
-        paths, dirs = filter_path_matches(self.match_text, self._paths, case_sensitive)
-        return (refs, paths, dirs)
-
-
-class GitPathsFromRefCompletionModel(GitTrackedCompletionModel):
+class GitPathsFromRefCompletionModel(GitPathCompletionModel):
     """Completer for tracked files and folders"""
 
     def __init__(self, context, ref, parent):
         super().__init__(context, parent)
         self.ref = ref
+        self.model_updated.connect(self.gather_paths, type=Qt.QueuedConnection)
+        self._paths = []
+
+    def candidate_paths(self):
+        if not self._paths:
+            self.gather_paths()
+        return self._paths
 
     def gather_paths(self):
         context = self.context
         self._paths = gitcmds.ls_tree_paths(context, self.ref)
+        self._path_index = None
 
 
 class GitLogCompletionModel(GitRefCompletionModel):
@@ -726,13 +738,8 @@ class GitLogCompletionModel(GitRefCompletionModel):
 
     def __init__(self, context, parent):
         GitRefCompletionModel.__init__(self, context, parent)
-        self._paths = []
         self._model = context.model
-        self._runtask = qtutils.RunTask(parent=self)
-        self._time = 0.0  # ensure that the first event runs a task.
-        self.model_updated.connect(
-            self._start_gathering_paths, type=Qt.QueuedConnection
-        )
+        self._empty_path_index = searchindex.PathIndex([])
 
     def matches(self):
         """Return candidate values for completion"""
@@ -772,30 +779,18 @@ class GitLogCompletionModel(GitRefCompletionModel):
             '@{upstream}',
         ] + matches
 
-    def _start_gathering_paths(self):
-        """Gather paths when the model changes"""
-        # Debounce updates that land within 1 second of each other.
-        if time.time() - self._time > 1.0:
-            self._runtask.start(qtutils.SimpleTask(self.gather_paths))
-        self._time = time.time()
-
-    def gather_paths(self):
-        """Gather paths and store them in the model"""
-        self._time = time.time()
-        if self._model.cfg.get(prefs.AUTOCOMPLETE_PATHS, True):
-            self._paths = gitcmds.tracked_files(self.context)
-        else:
-            self._paths = []
-        self._time = time.time()
+    def path_index(self):
+        """Use the index shared through the application-wide tracked paths cache"""
+        if not self._model.cfg.get(prefs.AUTOCOMPLETE_PATHS, True):
+            return self._empty_path_index
+        return self.context.tracked_paths.snapshot().path_index()
 
     def gather_matches(self, case_sensitive):
         """Filter paths and refs to find matching entries"""
-        if not self._paths:
-            self.gather_paths()
-        refs = filter_matches(
-            self.match_text, self.matches(), case_sensitive, sort_key=ref_sort_key
-        )
-        paths, dirs = filter_path_matches(self.match_text, self._paths, case_sensitive)
+        refs = self.ref_index().filter(self.match_text, case_sensitive)
+        path_index = self.path_index()
+        paths = path_index.filter(self.match_text, case_sensitive)
+        dirs = path_index.dirs
         has_doubledash = (
             self.match_text == '--'
             or self.full_text.startswith('-- ')
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from functools import partial
 import os
 import re
@@ -35,9 +36,17 @@ from .text import label_selection_timer
 from . import defs
 from . import diff_intraline
 from . import standard
+from . import imagediff
 from . import imageview
 
 ENABLE_INTRALINE_DIFF = True
+# The memory used by decoded blob images that are kept for reuse, in bytes.
+IMAGE_CACHE_BYTES = 256 * 1024 * 1024
+
+# (value, size) entries for decoded blob images keyed by main.ImageSource and for
+# image diffs keyed by tuples of sources. Only accessed from the main thread.
+_image_cache = OrderedDict()
+_image_cache_bytes = 0
 
 
 class DiffSyntaxHighlighter(QtGui.QSyntaxHighlighter):
@@ -680,7 +689,11 @@ class Viewer(QtWidgets.QFrame):
         self.context = context
         self.model = model = context.model
         self.images = []
-        self.pixmaps = []
+        self.images_generation = 0
+        self.decoded_images = []
+        self.image_diff = None
+        self.rendered = {}
+        self.runtask = qtutils.RunTask(parent=self)
         italic_font = self.font()
         italic_font.setItalic(True)
 
@@ -853,6 +866,8 @@ class Viewer(QtWidgets.QFrame):
             removals = self.text.diff_lines.removals.count
             additions = self.text.diff_lines.additions.count
             diffstat = f'-{removals}  +{additions}'
+            if self.stack.currentWidget() is self.image:
+                diffstat = self.image_diffstat() or diffstat
         else:
             diffstat = ''
         self.diffstat.set_text(diffstat)
@@ -907,48 +922,76 @@ class Viewer(QtWidgets.QFrame):
         self.text.set_word_wrapping(enabled, update=update)
 
     def reset(self):
-        self.image.pixmap = QtGui.QPixmap()
-        self.cleanup()
-
-    def cleanup(self):
-        for image, unlink in self.images:
-            if unlink and core.exists(image):
-                os.unlink(image)
         self.images = []
+        self.decoded_images = []
+        self.image_diff = None
+        self.rendered = {}
+        self.image.pixmap = QtGui.QPixmap()
 
     def set_images(self, images):
-        self.images = images
-        self.pixmaps = []
+        """Load images on a worker thread and render them when ready"""
+        self.images_generation += 1
         if not images:
             self.reset()
             return False
+        self.images = images
+        cached = [get_cached(source) for source in images]
+        image_diff = get_cached(tuple(images))
+        needs_diff = imagediff.have_numpy and len(images) > 1 and image_diff is None
+        if all(image is not None for image in cached) and not (
+            needs_diff and can_compare(cached)
+        ):
+            self._images_loaded(self.images_generation, images, (cached, image_diff))
+            return True
+        task = qtutils.SimpleTask(load_images, self.context, images, cached, image_diff)
+        self.runtask.start(
+            task, result=partial(self._images_loaded, self.images_generation, images)
+        )
+        return True
 
-        # In order to comp, we first have to load all the images
-        all_pixmaps = [QtGui.QPixmap(image[0]) for image in images]
-        pixmaps = [pixmap for pixmap in all_pixmaps if not pixmap.isNull()]
-        if not pixmaps:
+    def _images_loaded(self, generation, sources, result):
+        """Display the decoded images unless a newer request has replaced them"""
+        if generation != self.images_generation:
+            return
+        images, image_diff = result
+        for source, image in zip(sources, images):
+            if image is not None and not image.isNull():
+                cache_value(source, image, image_size(image))
+        if image_diff is not None:
+            cache_value(tuple(sources), image_diff, image_diff.size_in_bytes())
+        # Images are kept as QImages; the image view only creates pixmaps for
+        # the parts that it displays.
+        images = [image for image in images if image is not None and not image.isNull()]
+        if not images:
             self.reset()
-            return False
-
-        self.pixmaps = pixmaps
+            return
+        self.decoded_images = images
+        self.image_diff = image_diff
+        self.rendered = {}
+        diffstat = self.image_diffstat()
+        if diffstat:
+            self.diffstat.set_text(diffstat)
         self.render()
-        self.cleanup()
-        return True
+
+    def image_diffstat(self):
+        """Return the diffstat for the displayed images, or None"""
+        if self.image_diff is not None:
+            return self.image_diff.summary()
+        if len(self.decoded_images) > 1 and not can_compare(self.decoded_images):
+            return N_('Too large to compare')
+        return None
 
     def render(self):
         # Update images
-        if self.pixmaps:
+        if self.decoded_images:
             mode = self.options.image_mode.currentIndex()
-            if mode == self.options.SIDE_BY_SIDE:
-                image = self.render_side_by_side()
-            elif mode == self.options.DIFF:
-                image = self.render_diff()
-            elif mode == self.options.XOR:
-                image = self.render_xor()
-            elif mode == self.options.PIXEL_XOR:
-                image = self.render_pixel_xor()
-            else:
-                image = self.render_side_by_side()
+            image = self.rendered.get(mode)
+            if image is None:
+                image = self.render_mode(mode)
+                if any(imageview.is_huge(source) for source in self.decoded_images):
+                    # Only keep the current render of huge images.
+                    self.rendered = {}
+                self.rendered[mode] = image
         else:
             image = QtGui.QPixmap()
         self.image.pixmap = image
@@ -962,44 +1005,63 @@ class Viewer(QtWidgets.QFrame):
             poly = self.image.mapToScene(self.image.viewport().rect())
             self.image.last_scene_roi = poly.boundingRect()
 
+    def render_mode(self, mode):
+        """Render the images for the specified image mode"""
+        if mode == self.options.DIFF:
+            image = self.render_diff()
+        elif mode == self.options.XOR:
+            image = self.render_xor()
+        elif mode == self.options.PIXEL_XOR:
+            image = self.render_pixel_xor()
+        else:
+            image = self.render_side_by_side()
+        return image
+
     def render_side_by_side(self):
         # Side-by-side lineup comp
-        pixmaps = self.pixmaps
-        width = sum(pixmap.width() for pixmap in pixmaps)
-        height = max(pixmap.height() for pixmap in pixmaps)
-        image = create_image(width, height)
-
-        # Paint each pixmap
+        images = self.decoded_images
+        width = sum(image.width() for image in images)
+        height = max(image.height() for image in images)
+        # Huge composites are rendered at the pyramid level that fits in memory.
+        factor = imageview.downscale_factor(width, height)
+        image = create_image(max(1, width // factor), max(1, height // factor))
+
+        # Paint each image
         painter = create_painter(image)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, factor > 1)
         x = 0
-        for pixmap in pixmaps:
-            painter.drawPixmap(x, 0, pixmap)
-            x += pixmap.width()
+        for source in images:
+            painter.drawImage(scaled_rect(x, 0, source, factor), source)
+            x += source.width()
         painter.end()
 
         return image
 
     def render_comp(self, comp_mode):
         # Get the max size to use as the render canvas
-        pixmaps = self.pixmaps
-        if len(pixmaps) == 1:
-            return pixmaps[0]
+        images = self.decoded_images
+        if len(images) == 1:
+            return images[0]
 
-        width = max(pixmap.width() for pixmap in pixmaps)
-        height = max(pixmap.height() for pixmap in pixmaps)
-        image = create_image(width, height)
+        width = max(source.width() for source in images)
+        height = max(source.height() for source in images)
+        factor = imageview.downscale_factor(width, height)
+        image = create_image(max(1, width // factor), max(1, height // factor))
 
         painter = create_painter(image)
-        for pixmap in (pixmaps[0], pixmaps[-1]):
-            x = (width - pixmap.width()) // 2
-            y = (height - pixmap.height()) // 2
-            painter.drawPixmap(x, y, pixmap)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, factor > 1)
+        for source in (images[0], images[-1]):
+            x = (width - source.width()) // 2
+            y = (height - source.height()) // 2
+            painter.drawImage(scaled_rect(x, y, source, factor), source)
             painter.setCompositionMode(comp_mode)
         painter.end()
 
         return image
 
     def render_diff(self):
+        if self.image_diff is not None:
+            return self.image_diff.heatmap
         comp_mode = QtGui.QPainter.CompositionMode_Difference
         return self.render_comp(comp_mode)
 
@@ -1012,6 +1074,85 @@ class Viewer(QtWidgets.QFrame):
         return self.render_comp(comp_mode)
 
 
+def load_images(context, sources, images, image_diff):
+    """Decode images and compare them; runs on a worker thread
+
+    `images` contains the images that were already cached, or None for each image
+    that must be loaded. Blobs are decoded from memory without temporary files.
+    Returns the images and an imagediff.ImageDiff of the first and last images,
+    which is None when the images are too large to compare.
+    """
+    result = []
+    for source, image in zip(sources, images):
+        if image is None:
+            image = load_image(context, source)
+        result.append(image)
+    valid = [image for image in result if image is not None and not image.isNull()]
+    if image_diff is None and can_compare(valid):
+        image_diff = imagediff.compare(valid[0], valid[-1])
+    return result, image_diff
+
+
+def can_compare(images):
+    """Return True when the first and last images are small enough to compare"""
+    if len(images) < 2:
+        return False
+    return not imageview.is_huge(images[0]) and not imageview.is_huge(images[-1])
+
+
+def load_image(context, source):
+    """Decode a single image described by a main.ImageSource"""
+    if source.oid is None:
+        return QtGui.QImage(source.path)
+    data = gitcmds.read_blob(context, source.oid, source.path)
+    if data is None:
+        return None
+    image = QtGui.QImage.fromData(data)
+    if image.isNull():
+        # Formats that cannot be sniffed from their content need a hint.
+        suffix = os.path.splitext(source.path)[1][1:]
+        if suffix:
+            image = QtGui.QImage.fromData(data, suffix.upper())
+    return image
+
+
+def image_size(image):
+    """Return the memory used by a QImage in bytes"""
+    if hasattr(image, 'sizeInBytes'):
+        return image.sizeInBytes()
+    return image.byteCount()
+
+
+def is_cacheable(key):
+    """Only blobs are immutable; worktree files can change at any time"""
+    if isinstance(key, main.ImageSource):
+        return key.oid is not None
+    return all(source.oid is not None for source in key)
+
+
+def get_cached(key):
+    """Return a cached image or image diff, or None"""
+    if not is_cacheable(key):
+        return None
+    entry = _image_cache.get(key)
+    if entry is None:
+        return None
+    _image_cache.move_to_end(key)
+    return entry[0]
+
+
+def cache_value(key, value, size):
+    """Cache a decoded image or image diff, evicting the least recently used"""
+    global _image_cache_bytes
+    if not is_cacheable(key) or key in _image_cache or size > IMAGE_CACHE_BYTES:
+        return
+    _image_cache[key] = (value, size)
+    _image_cache_bytes += size
+    while _image_cache_bytes > IMAGE_CACHE_BYTES:
+        _, (_, evicted_size) = _image_cache.popitem(last=False)
+        _image_cache_bytes -= evicted_size
+
+
 def create_image(width, height):
     size = QtCore.QSize(width, height)
     image = QtGui.QImage(size, QtGui.QImage.Format_ARGB32_Premultiplied)
@@ -1019,6 +1160,13 @@ def create_image(width, height):
     return image
 
 
+def scaled_rect(x, y, image, factor):
+    """Return the rect for drawing an image at (x, y) shrunk by factor"""
+    return QtCore.QRectF(
+        x / factor, y / factor, image.width() / factor, image.height() / factor
+    )
+
+
 def create_painter(image):
     painter = QtGui.QPainter(image)
     painter.fillRect(image.rect(), Qt.transparent)
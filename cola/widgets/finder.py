@@ -98,13 +98,13 @@ class FindFilesThread(QtCore.QThread):
             self.run()
 
     def get_filenames(self):
-        """Query filenames from git"""
+        """Query filenames from the tracked paths cache"""
         query = self.query
         if query is None:
             args = []
         else:
             args = [add_wildcards(arg) for arg in utils.shell_split(query)]
-        return gitcmds.tracked_files(self.context, *args)
+        return self.context.tracked_paths.snapshot().filter(args)
 
 
 class FindFilesFromRefThread(FindFilesThread):
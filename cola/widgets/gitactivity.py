@@ -0,0 +1,257 @@
+"""A panel that shows the git commands that have been run"""
+import time
+
+from qtpy import QtCore
+from qtpy import QtWidgets
+from qtpy.QtCore import Qt
+
+from ..i18n import N_
+from .. import hotkeys
+from .. import icons
+from .. import perf
+from .. import qtutils
+from . import defs
+from . import standard
+
+
+# The number of individual commands shown in the "Recent" tab.
+MAX_RECENT = 500
+# How often the panel is refreshed while it is visible, in milliseconds.
+REFRESH_INTERVAL = 1000
+
+
+def show(context):
+    """Show the git activity panel"""
+    view = GitActivity(context, parent=qtutils.active_window())
+    view.show()
+    view.raise_()
+    return view
+
+
+class GitActivity(standard.Dialog):
+    """Show aggregates of the git commands recorded by perf.git_trace"""
+
+    def __init__(self, context, parent=None, trace=None):
+        standard.Dialog.__init__(self, parent=parent)
+        self.context = context
+        self.trace = trace or perf.git_trace
+        self.setWindowTitle(N_('Git Activity'))
+
+        self.summary = QtWidgets.QLabel()
+
+        aggregate_columns = [
+            N_('Count'),
+            N_('Total (ms)'),
+            N_('Max (ms)'),
+            N_('Output'),
+        ]
+        self.commands = create_tree([N_('Command')] + aggregate_columns)
+        self.callers = create_tree([N_('Call Site')] + aggregate_columns)
+        self.recent = create_tree([
+            N_('Time (s)'),
+            N_('Duration (ms)'),
+            N_('Command'),
+            N_('Call Site'),
+            N_('Thread'),
+            N_('Status'),
+            N_('Output'),
+        ])
+
+        self.tabs = QtWidgets.QTabWidget()
+        self.tabs.addTab(self.commands, N_('Commands'))
+        self.tabs.addTab(self.callers, N_('Call Sites'))
+        self.tabs.addTab(self.recent, N_('Recent'))
+
+        self.refresh_button = qtutils.refresh_button()
+        self.clear_button = qtutils.create_button(
+            text=N_('Clear'), tooltip=N_('Forget the recorded commands')
+        )
+        self.export_chrome_button = qtutils.create_button(
+            text=N_('Export Chrome Trace...'),
+            tooltip=N_('Save the commands for chrome://tracing or Perfetto'),
+            icon=icons.save(),
+        )
+        self.export_speedscope_button = qtutils.create_button(
+            text=N_('Export Speedscope...'),
+            tooltip=N_('Save the commands and their callers for speedscope.app'),
+            icon=icons.save(),
+        )
+        self.close_button = qtutils.close_button()
+
+        self.button_layout = qtutils.hbox(
+            defs.no_margin,
+            defs.button_spacing,
+            self.refresh_button,
+            self.clear_button,
+            qtutils.STRETCH,
+            self.export_chrome_button,
+            self.export_speedscope_button,
+            self.close_button,
+        )
+        self.main_layout = qtutils.vbox(
+            defs.margin, defs.spacing, self.summary, self.tabs, self.button_layout
+        )
+        self.setLayout(self.main_layout)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+        qtutils.connect_button(self.refresh_button, self.refresh)
+        qtutils.connect_button(self.clear_button, self.clear)
+        qtutils.connect_button(self.export_chrome_button, self.export_chrome_trace)
+        qtutils.connect_button(self.export_speedscope_button, self.export_speedscope)
+        qtutils.connect_button(self.close_button, self.accept)
+        qtutils.add_action(self, N_('Refresh'), self.refresh, hotkeys.REFRESH)
+
+        # The number of recorded commands that are shown in the "Recent" tab.
+        self.count = 0
+
+        self.init_size(parent=parent, width=900, height=500)
+        self.refresh()
+
+    def showEvent(self, event):
+        """Refresh periodically and record call stacks while the panel is visible"""
+        self.trace.capture_stacks = True
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        """Stop refreshing when the panel is hidden"""
+        self.trace.capture_stacks = False
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Update the panel from the recorded commands"""
+        commands = self.trace.by_command()
+        count = sum(group['count'] for group in commands)
+        total = sum(group['total'] for group in commands)
+        refreshes = self.context.model.refresh_scheduler.report()
+        self.summary.setText(
+            N_(
+                '%(count)d git commands in %(total).3fs, '
+                '%(runs)d of %(requested)d refreshes run, %(saved)d saved'
+            )
+            % dict(refreshes, count=count, total=total)
+        )
+        update_aggregate_items(self.commands, commands)
+        update_aggregate_items(self.callers, self.trace.by_caller())
+
+        # Only the new commands are added so that the selection is retained.
+        self.count, records = self.trace.records_since(self.count)
+        add_recent_items(self.recent, records[-MAX_RECENT:])
+
+    def clear(self):
+        """Forget the recorded commands"""
+        self.trace.clear()
+        self.count = 0
+        self.recent.clear()
+        self.refresh()
+
+    def export_chrome_trace(self):
+        """Save the recorded commands as a Chrome trace"""
+        path = qtutils.save_as(export_filename('trace'), N_('Export Chrome Trace'))
+        if path:
+            self.trace.write_chrome_trace(path)
+
+    def export_speedscope(self):
+        """Save the recorded commands as a speedscope profile"""
+        path = qtutils.save_as(export_filename('speedscope'), N_('Export Speedscope'))
+        if path:
+            self.trace.write_speedscope(path)
+
+
+def create_tree(columns):
+    """Create a read-only tree widget with the specified columns"""
+    tree = standard.TreeWidget()
+    tree.setRootIsDecorated(False)
+    tree.setUniformRowHeights(True)
+    tree.setAlternatingRowColors(True)
+    tree.setHeaderLabels(columns)
+    return tree
+
+
+class AggregateItem(QtWidgets.QTreeWidgetItem):
+    """An item for a group returned by GitTrace.by_command()/by_caller()"""
+
+    def __init__(self, name):
+        QtWidgets.QTreeWidgetItem.__init__(self, [name])
+        self.name = name
+        self.total = 0.0
+        for column in range(1, 5):
+            self.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+
+    def set_group(self, group):
+        """Display the totals for a group"""
+        self.total = group['total']
+        self.setText(1, str(group['count']))
+        self.setText(2, f"{group['total'] * 1e3:.1f}")
+        self.setText(3, f"{group['max'] * 1e3:.1f}")
+        self.setText(4, format_size(group['stdout_bytes']))
+
+    def __lt__(self, other):
+        """Sort items by their total time"""
+        return self.total < other.total
+
+
+def update_aggregate_items(tree, groups):
+    """Update the items for the groups in place, ordered by their total time"""
+    items = {}
+    for idx in range(tree.topLevelItemCount()):
+        item = tree.topLevelItem(idx)
+        items[item.name] = item
+    names = set()
+    new_items = []
+    for group in groups:
+        name = group['name']
+        names.add(name)
+        item = items.get(name)
+        if item is None:
+            item = AggregateItem(name)
+            new_items.append(item)
+        item.set_group(group)
+    for name, item in items.items():
+        if name not in names:
+            tree.takeTopLevelItem(tree.indexOfTopLevelItem(item))
+    tree.addTopLevelItems(new_items)
+    tree.sortItems(2, Qt.DescendingOrder)
+
+
+def add_recent_items(tree, records):
+    """Add items for new records above the existing items"""
+    if not records:
+        return
+    items = []
+    for record in reversed(records):
+        item = QtWidgets.QTreeWidgetItem([
+            f'{record.start:.3f}',
+            f'{record.duration * 1e3:.1f}',
+            ' '.join(record.command),
+            record.caller,
+            record.thread,
+            str(record.status),
+            format_size(record.stdout_bytes),
+        ])
+        item.setToolTip(3, '\n'.join(str(frame) for frame in record.stack))
+        items.append(item)
+    tree.insertTopLevelItems(0, items)
+    for idx in reversed(range(MAX_RECENT, tree.topLevelItemCount())):
+        tree.takeTopLevelItem(idx)
+
+
+def format_size(size):
+    """Format a size in bytes for display"""
+    if size < 1024:
+        return f'{size} B'
+    for unit in ('KiB', 'MiB', 'GiB'):
+        size /= 1024
+        if size < 1024 or unit == 'GiB':
+            break
+    return f'{size:.1f} {unit}'
+
+
+def export_filename(kind):
+    """Return a default filename for an export"""
+    timestamp = time.strftime('%Y%m%d-%H%M%S')
+    return f'git-cola-{kind}-{timestamp}.json'
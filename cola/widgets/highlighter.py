@@ -1,7 +1,12 @@
+import collections
+import hashlib
+
 from qtpy import QtCore
 from qtpy import QtGui
 from qtpy import QtWidgets
 
+from .. import qtutils
+
 have_pygments = True
 try:
     from pygments.styles import get_style_by_name
@@ -11,88 +16,219 @@ try:
 except ImportError:
     have_pygments = False
 
+# The number of lexed documents that are kept in memory.
+CACHE_SIZE = 32
+# The number of blocks that are formatted per iteration of the event loop.
+CHUNK_SIZE = 200
+
+# Token ranges keyed by (blob oid or content hash, lexer name). Only used from
+# the GUI thread.
+_cache = collections.OrderedDict()
+
 
-def highlight_document(edit, filename):
+def highlight_document(edit, filename, oid=None):
+    """Syntax highlight a text widget in the background
+
+    The document is lexed on a worker thread. The resulting formats are applied
+    to the visible blocks first and then to the remaining blocks in chunks.
+    When "oid" is specified it is used as the cache key instead of a hash of
+    the document's content.
+    """
     if not have_pygments:
         return
-    doc = edit.document()
     try:
         lexer = get_lexer_for_filename(filename, stripnl=False)
     except ClassNotFound:
         return
-
-    style = get_style_by_name('default')
-
-    font = doc.defaultFont()
-    base_format = QtGui.QTextCharFormat()
-    base_format.setFont(font)
-    token_formats = {}
-
-    window = edit.window()
-    if hasattr(window, 'processEvents'):
-        processEvents = window.processEvents
-    else:
-        processEvents = QtCore.QCoreApplication.processEvents
-
-    def get_token_format(token):
-        if token in token_formats:
-            return token_formats[token]
-
+    highlighter = edit.findChild(BackgroundHighlighter)
+    if highlighter is None:
+        highlighter = BackgroundHighlighter(edit)
+    highlighter.highlight(lexer, oid=oid)
+
+
+def lex_blocks(text, lexer):
+    """Lex text into a list of (start, length, token) ranges for each line"""
+    blocks = []
+    ranges = []
+    pos = 0
+    for token, token_text in lex(text, lexer):
+        lines = token_text.split('\n')
+        for idx, line in enumerate(lines):
+            if idx:
+                blocks.append(ranges)
+                ranges = []
+                pos = 0
+            if line:
+                ranges.append((pos, len(line), token))
+                pos += len(line)
+    blocks.append(ranges)
+    return blocks
+
+
+def cache_key(text, lexer, oid=None):
+    """Return the cache key for lexing text"""
+    content_key = oid or hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return (content_key, lexer.name)
+
+
+def cached_blocks(key):
+    """Return the cached token ranges for a key"""
+    blocks = _cache.get(key)
+    if blocks is not None:
+        _cache.move_to_end(key)
+    return blocks
+
+
+def cache_blocks(key, blocks):
+    """Store token ranges in the cache"""
+    _cache[key] = blocks
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+class LexTask(qtutils.Task):
+    """Lex a document on a worker thread"""
+
+    def __init__(self, generation, key, text, lexer):
+        qtutils.Task.__init__(self)
+        self.generation = generation
+        self.key = key
+        self.text = text
+        self.lexer = lexer
+
+    def task(self):
+        return (self.generation, self.key, lex_blocks(self.text, self.lexer))
+
+
+class BackgroundHighlighter(QtCore.QObject):
+    """Apply lexed token formats to a text widget's document"""
+
+    def __init__(self, edit):
+        QtCore.QObject.__init__(self, edit)
+        self.edit = edit
+        self.generation = 0
+        self.runtask = qtutils.RunTask(parent=self)
+        self._blocks = []
+        self._pending = collections.deque()
+        self._character_count = 0
+        self._token_formats = {}
+        self._style = get_style_by_name('default')
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._apply_chunk)
+
+    def highlight(self, lexer, oid=None):
+        """Highlight the current document using the specified lexer"""
+        self.generation += 1
+        self._timer.stop()
+        self._pending.clear()
+        self._token_formats = {}
+
+        text = self.edit.document().toPlainText()
+        key = cache_key(text, lexer, oid=oid)
+        blocks = cached_blocks(key)
+        if blocks is not None:
+            self._start(blocks)
+            return
+        task = LexTask(self.generation, key, text, lexer)
+        self.runtask.start(task, result=self._lexed)
+
+    def _lexed(self, result):
+        """Receive token ranges from the worker thread"""
+        generation, key, blocks = result
+        cache_blocks(key, blocks)
+        # Discard results for documents that have since been replaced.
+        if generation == self.generation:
+            self._start(blocks)
+
+    def _start(self, blocks):
+        """Apply formats to the visible blocks and schedule the rest"""
+        doc = self.edit.document()
+        self._blocks = blocks
+        self._character_count = doc.characterCount()
+        count = min(len(blocks), doc.blockCount())
+
+        first, last = self._visible_block_range(count)
+        self._pending.extend(range(first, last + 1))
+        self._apply_chunk()
+        self._pending.extend(range(last + 1, count))
+        self._pending.extend(range(0, first))
+        if self._pending:
+            self._timer.start()
+
+    def _visible_block_range(self, count):
+        """Return the first and last block numbers visible in the viewport"""
+        if count == 0:
+            return (0, -1)
+        edit = self.edit
+        viewport = edit.viewport()
+        first = edit.cursorForPosition(QtCore.QPoint(0, 0)).blockNumber()
+        bottom = QtCore.QPoint(viewport.width() - 1, viewport.height() - 1)
+        last = edit.cursorForPosition(bottom).blockNumber()
+        first = max(0, min(first, count - 1))
+        last = max(first, min(last, count - 1))
+        return (first, last)
+
+    def _apply_chunk(self):
+        """Apply formats to the next chunk of pending blocks"""
+        doc = self.edit.document()
+        # Stop when the document was edited or replaced after it was lexed.
+        if doc.characterCount() != self._character_count:
+            self._pending.clear()
+        pending = self._pending
+        blocks = self._blocks
+        for _ in range(min(CHUNK_SIZE, len(pending))):
+            number = pending.popleft()
+            block = doc.findBlockByNumber(number)
+            if not block.isValid():
+                continue
+            block.layout().setAdditionalFormats(self._format_ranges(blocks[number]))
+            doc.markContentsDirty(block.position(), block.length())
+        if not pending:
+            self._timer.stop()
+
+    def _format_ranges(self, ranges):
+        """Convert (start, length, token) ranges into QTextLayout format ranges"""
+        format_ranges = []
+        for start, length, token in ranges:
+            format_range = QtGui.QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = self._token_format(token)
+            format_ranges.append(format_range)
+        return format_ranges
+
+    def _token_format(self, token):
+        """Return the QTextCharFormat for a token"""
+        try:
+            return self._token_formats[token]
+        except KeyError:
+            pass
         if token.parent:
-            parent_format = get_token_format(token.parent)
+            fmt = QtGui.QTextCharFormat(self._token_format(token.parent))
         else:
-            parent_format = base_format
+            fmt = QtGui.QTextCharFormat()
+            fmt.setFont(self.edit.document().defaultFont())
 
-        fmt = QtGui.QTextCharFormat(parent_format)
-        font = fmt.font()
+        style = self._style
         if style.styles_token(token):
             tstyle = style.style_for_token(token)
+            font = fmt.font()
             if tstyle['color']:
                 fmt.setForeground(QtGui.QColor('#' + tstyle['color']))
             if tstyle['bold']:
                 font.setWeight(QtGui.QFont.Bold)
             if tstyle['italic']:
                 font.setItalic(True)
+            fmt.setFont(font)
             if tstyle['underline']:
                 fmt.setFontUnderline(True)
             if tstyle['bgcolor']:
                 fmt.setBackground(QtGui.QColor('#' + tstyle['bgcolor']))
-        token_formats[token] = fmt
+        self._token_formats[token] = fmt
         return fmt
 
-    text = doc.toPlainText()
-
-    block_count = 0
-    block = doc.firstBlock()
-    assert isinstance(block, QtGui.QTextBlock)
-    block_pos = 0
-    block_len = block.length()
-    block_formats = []
-
-    for token, ttext in lex(text, lexer):
-        format_len = len(ttext)
-        fmt = get_token_format(token)
-        while format_len > 0:
-            format_range = QtGui.QTextLayout.FormatRange()
-            format_range.start = block_pos
-            format_range.length = min(format_len, block_len)
-            format_range.format = fmt
-            block_formats.append(format_range)
-            block_len -= format_range.length
-            format_len -= format_range.length
-            block_pos += format_range.length
-            if block_len == 0:
-                block.layout().setAdditionalFormats(block_formats)
-                doc.markContentsDirty(block.position(), block.length())
-                block = block.next()
-                block_pos = 0
-                block_len = block.length()
-                block_formats = []
-
-                block_count += 1
-                if block_count % 100 == 0:
-                    processEvents()
-
 
 if __name__ == '__main__':
     app = QtWidgets.QApplication([])
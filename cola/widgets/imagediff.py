@@ -0,0 +1,236 @@
+"""Pixel-level image comparison used by the image diff viewer
+
+The comparison is vectorized with NumPy when it is installed. When NumPy is not
+available compare() returns None and the viewer falls back to compositing the
+images with QPainter.
+"""
+from qtpy import QtCore
+from qtpy import QtGui
+from qtpy.QtCore import Qt
+
+try:
+    import numpy as np
+
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+from ..i18n import N_
+
+
+# Channel differences at or below this value are not counted as changes.
+THRESHOLD = 16
+# Changed pixels are grouped into regions using blocks of this many pixels.
+REGION_BLOCK_SIZE = 16
+# The maximum number of changed regions that are outlined in the heatmap.
+MAX_REGIONS = 64
+
+
+class ImageDiff:
+    """The result of comparing two images"""
+
+    def __init__(self, heatmap, changed, total, regions):
+        self.heatmap = heatmap
+        self.changed = changed
+        self.total = total
+        self.regions = regions
+
+    @property
+    def percent(self):
+        """Return the percentage of pixels that changed"""
+        if not self.total:
+            return 0.0
+        return 100.0 * self.changed / self.total
+
+    def size_in_bytes(self):
+        """Return the memory used by the heatmap"""
+        return self.heatmap.bytesPerLine() * self.heatmap.height()
+
+    def summary(self):
+        """Return a short description of the changes for display"""
+        return N_('%(changed)d pixels (%(percent).2f%%) in %(regions)d regions') % {
+            'changed': self.changed,
+            'percent': self.percent,
+            'regions': len(self.regions),
+        }
+
+
+def compare(old_image, new_image, threshold=THRESHOLD):
+    """Compare two QImages and return an ImageDiff, or None without NumPy
+
+    Images of different sizes are centered on a common canvas, the same way
+    that the QPainter-based comps align them.
+    """
+    if not have_numpy:
+        return None
+    width = max(old_image.width(), new_image.width())
+    height = max(old_image.height(), new_image.height())
+    old = canvas_array(old_image, width, height).ravel()
+    new = canvas_array(new_image, width, height)
+
+    # Only pixels that differ at all need their channels compared.
+    candidates = np.flatnonzero(old != new.ravel())
+    delta = channel_delta(old[candidates], new.ravel()[candidates])
+    changed = delta > threshold
+    indexes = candidates[changed]
+    mask = np.zeros(width * height, dtype=bool)
+    mask[indexes] = True
+    regions = changed_regions(mask.reshape(height, width))
+
+    heatmap = heatmap_image(new, indexes, delta[changed])
+    draw_regions(heatmap, regions)
+    return ImageDiff(heatmap, len(indexes), width * height, regions)
+
+
+def image_array(image):
+    """Return a (height, width) uint32 copy of a QImage's ARGB32 pixels"""
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32)
+    height = image.height()
+    bytes_per_line = image.bytesPerLine()
+    bits = image.constBits()
+    if hasattr(bits, 'setsize'):
+        bits.setsize(bytes_per_line * height)
+    array = np.frombuffer(bits, dtype=np.uint32).reshape(height, bytes_per_line // 4)
+    return array[:, : image.width()].copy()
+
+
+def canvas_array(image, width, height):
+    """Return the pixels of a QImage centered on a transparent canvas"""
+    array = image_array(image)
+    if array.shape == (height, width):
+        return array
+    canvas = np.zeros((height, width), dtype=np.uint32)
+    y = (height - image.height()) // 2
+    x = (width - image.width()) // 2
+    canvas[y : y + image.height(), x : x + image.width()] = array
+    return canvas
+
+
+def channel_delta(old, new):
+    """Return the largest per-channel difference between ARGB32 pixels"""
+    old = old.view(np.uint8).reshape(-1, 4)
+    new = new.view(np.uint8).reshape(-1, 4)
+    difference = np.maximum(old, new)
+    difference -= np.minimum(old, new)
+    # Pairwise maximums are much faster than reducing over the short axis.
+    return np.maximum(
+        np.maximum(difference[:, 0], difference[:, 1]),
+        np.maximum(difference[:, 2], difference[:, 3]),
+    )
+
+
+def heatmap_image(pixels, indexes, delta):
+    """Render changed pixels over a faded copy of the image
+
+    Small differences are drawn in yellow and large differences in red.
+    """
+    # Scale each channel into 0xA0-0xDF and make every pixel opaque.
+    values = (pixels >> 2) & np.uint32(0x003F3F3F)
+    values += np.uint32(0xFFA0A0A0)
+    heat = np.uint32(0xFF) - delta.astype(np.uint32)
+    values.ravel()[indexes] = np.uint32(0xFFFF0000) | (heat << 8)
+    return array_image(values)
+
+
+def array_image(values):
+    """Return a QImage that owns a copy of a (height, width) uint32 ARGB array"""
+    height, width = values.shape
+    values = np.ascontiguousarray(values)
+    image = QtGui.QImage(
+        values.data, width, height, width * 4, QtGui.QImage.Format_ARGB32
+    )
+    return image.copy()
+
+
+def changed_regions(mask, block_size=REGION_BLOCK_SIZE, max_regions=MAX_REGIONS):
+    """Return QRects bounding the connected groups of changed pixels
+
+    Changes are grouped over a coarse grid of blocks so that nearby pixels are
+    merged into a single region and the search stays fast on large images.
+    The largest `max_regions` regions are returned, tightened to their pixels.
+    """
+    height, width = mask.shape
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=bool)
+    padded[:height, :width] = mask
+    blocks = padded.reshape(rows, block_size, cols, block_size).any(axis=(1, 3))
+
+    bounds = block_groups(blocks)
+    bounds.sort(key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+    regions = []
+    for top, left, bottom, right in bounds[:max_regions]:
+        y0 = top * block_size
+        x0 = left * block_size
+        region = mask[y0 : bottom * block_size, x0 : right * block_size]
+        changed_rows = np.flatnonzero(region.any(axis=1))
+        changed_cols = np.flatnonzero(region.any(axis=0))
+        y = y0 + int(changed_rows[0])
+        x = x0 + int(changed_cols[0])
+        region_height = int(changed_rows[-1] - changed_rows[0]) + 1
+        region_width = int(changed_cols[-1] - changed_cols[0]) + 1
+        regions.append(QtCore.QRect(x, y, region_width, region_height))
+    return regions
+
+
+def block_groups(blocks):
+    """Return the (top, left, bottom, right) bounds of 8-connected groups of blocks
+
+    Each row of blocks is split into runs, and runs that touch a run in the
+    previous row are merged with a union-find.
+    """
+    rows, cols = blocks.shape
+    edges = np.zeros((rows, cols + 2), dtype=np.int8)
+    edges[:, 1:-1] = blocks
+    edges = np.diff(edges, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    run_ends = np.nonzero(edges == -1)[1]
+    runs = list(zip(run_rows.tolist(), run_starts.tolist(), run_ends.tolist()))
+
+    parents = list(range(len(runs)))
+
+    def find(index):
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    previous = []  # Indexes of the runs in the previous row, sorted by column.
+    current = []
+    current_row = -1
+    first = 0
+    for index, (row, start, end) in enumerate(runs):
+        if row != current_row:
+            previous = current if row == current_row + 1 else []
+            current = []
+            current_row = row
+            first = 0
+        # Diagonal neighbors are connected, so runs may touch at the corners.
+        while first < len(previous) and runs[previous[first]][2] < start:
+            first += 1
+        for other in previous[first:]:
+            if runs[other][1] > end:
+                break
+            parents[find(index)] = find(other)
+        current.append(index)
+
+    bounds = {}
+    for index, (row, start, end) in enumerate(runs):
+        root = find(index)
+        top, left, _, right = bounds.get(root, (row, start, row + 1, end))
+        bounds[root] = (top, min(left, start), row + 1, max(right, end))
+    return list(bounds.values())
+
+
+def draw_regions(image, regions):
+    """Outline the changed regions on the heatmap"""
+    if not regions:
+        return
+    painter = QtGui.QPainter(image)
+    pen = QtGui.QPen(QtGui.QColor(Qt.blue))
+    pen.setCosmetic(True)
+    painter.setPen(pen)
+    painter.setBrush(Qt.NoBrush)
+    for region in regions:
+        painter.drawRect(region.adjusted(-1, -1, 0, 0))
+    painter.end()
@@ -26,7 +26,10 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+from collections import OrderedDict
+from functools import partial
 import argparse
+import math
 import os
 import sys
 
@@ -44,9 +47,19 @@ except ImportError:
     have_numpy = False
 
 from .. import qtcompat
+from .. import qtutils
 
 main_loop_type = 'qt'
 
+# Images with more pixels than this are drawn from tiles instead of one pixmap.
+TILED_IMAGE_PIXELS = 4096 * 4096
+# The width and height of a tile in pixels.
+TILE_SIZE = 512
+# The memory used by the pixmaps of cached tiles, in bytes.
+TILE_CACHE_BYTES = 128 * 1024 * 1024
+# The most full-resolution tiles painted while the downsampled levels are built.
+MAX_UNSCALED_TILES = 16
+
 
 def clamp(x, lo, hi):
     return max(min(x, hi), lo)
@@ -61,7 +74,10 @@ class ImageView(QtWidgets.QGraphicsView):
         scene = QtWidgets.QGraphicsScene(self)
         self.graphics_pixmap = QtWidgets.QGraphicsPixmapItem()
         scene.addItem(self.graphics_pixmap)
+        self.graphics_tiles = TiledImageItem()
+        scene.addItem(self.graphics_tiles)
         self.setScene(scene)
+        self.image_size = QtCore.QSize()
 
         self.zoom_factor = 1.125
         self.rubberband = None
@@ -88,6 +104,7 @@ class ImageView(QtWidgets.QGraphicsView):
         painter.fillRect(CHECK_MEDIUM, 0, CHECK_MEDIUM, CHECK_MEDIUM, color_light)
         self.check_pattern = check_pattern
         self.check_brush = QtGui.QBrush(check_pattern)
+        self.graphics_tiles.check_brush = self.check_brush
 
     def load(self, filename):
         image = QtGui.QImage()
@@ -133,8 +150,14 @@ class ImageView(QtWidgets.QGraphicsView):
                 raise ValueError(image)
 
         elif isinstance(image, QtGui.QImage):
+            if is_huge(image):
+                self.set_tiled_image(image)
+                return
             pixmap = QtGui.QPixmap.fromImage(image)
         elif isinstance(image, QtGui.QPixmap):
+            if is_huge(image):
+                self.set_tiled_image(image.toImage())
+                return
             pixmap = image
         else:
             raise TypeError(image)
@@ -149,7 +172,20 @@ class ImageView(QtWidgets.QGraphicsView):
             painter.drawPixmap(0, 0, pixmap)
             pixmap = QtGui.QPixmap.fromImage(checkerboard)
 
+        self.graphics_tiles.set_image(None)
         self.graphics_pixmap.setPixmap(pixmap)
+        self.image_size = pixmap.size()
+        self.image_updated()
+
+    def set_tiled_image(self, image):
+        """Display a huge image from tiles of a lazily built image pyramid"""
+        self.checkerboard = None
+        self.graphics_pixmap.setPixmap(QtGui.QPixmap())
+        self.graphics_tiles.set_image(image)
+        self.image_size = image.size()
+        self.image_updated()
+
+    def image_updated(self):
         self.update_scene_rect()
         self.fitInView(self.image_scene_rect, flags=Qt.KeepAspectRatio)
         self.graphics_pixmap.update()
@@ -165,18 +201,16 @@ class ImageView(QtWidgets.QGraphicsView):
         self.pixmap = image
 
     def update_scene_rect(self):
-        pixmap = self.pixmap
+        size = self.image_size
         self.setSceneRect(
             QtCore.QRectF(
-                QtCore.QPointF(0, 0), QtCore.QPointF(pixmap.width(), pixmap.height())
+                QtCore.QPointF(0, 0), QtCore.QPointF(size.width(), size.height())
             )
         )
 
     @property
     def image_scene_rect(self):
-        return QtCore.QRectF(
-            self.graphics_pixmap.pos(), QtCore.QSizeF(self.pixmap.size())
-        )
+        return QtCore.QRectF(self.graphics_pixmap.pos(), QtCore.QSizeF(self.image_size))
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -357,6 +391,160 @@ class ImageView(QtWidgets.QGraphicsView):
         self.centerOn(rect.center())
 
 
+def is_huge(image):
+    """Return True when an image should be drawn from tiles"""
+    return image.width() * image.height() > TILED_IMAGE_PIXELS
+
+
+class TiledImageItem(QtWidgets.QGraphicsObject):
+    """Draw a huge image from tiles at the resolution needed by the view
+
+    Level 0 is the image itself and each following level halves its size.
+    The downsampled levels are built on a worker thread the first time that the
+    view is zoomed out, and only the pixmaps of recently painted tiles are kept.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.image = None
+        self.levels = []
+        self.building = False
+        self.generation = 0
+        self.check_brush = None
+        self.tiles = OrderedDict()
+        self.tiles_bytes = 0
+        self.runtask = qtutils.RunTask(parent=self)
+
+    def set_image(self, image):
+        """Replace the image. Tiles and levels are built when they are painted"""
+        if image is self.image:
+            return
+        self.prepareGeometryChange()
+        self.generation += 1
+        self.image = image
+        self.levels = [] if image is None else [image]
+        self.building = False
+        self.tiles.clear()
+        self.tiles_bytes = 0
+        self.setVisible(image is not None)
+
+    def boundingRect(self):
+        if self.image is None:
+            return QtCore.QRectF()
+        return QtCore.QRectF(0.0, 0.0, self.image.width(), self.image.height())
+
+    def paint(self, painter, option, widget=None):
+        if self.image is None:
+            return
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        scale = option.levelOfDetailFromTransform(painter.worldTransform())
+        wanted = pyramid_level(scale)
+        if wanted >= len(self.levels):
+            self.build_levels()
+        level = min(wanted, len(self.levels) - 1)
+        tiles = list(self.visible_tiles(level, exposed))
+        if level < wanted and len(tiles) > MAX_UNSCALED_TILES:
+            # Painting the full-resolution image while zoomed out is too slow.
+            # Paint a placeholder until the downsampled levels are ready.
+            painter.fillRect(exposed, Qt.gray)
+            return
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, scale < 1.0)
+        for key, source, target in tiles:
+            if self.check_brush is not None and self.image.hasAlphaChannel():
+                painter.fillRect(target, self.check_brush)
+            pixmap = self.tile_pixmap(key, source)
+            painter.drawPixmap(target, pixmap, QtCore.QRectF(pixmap.rect()))
+
+    def visible_tiles(self, level, rect):
+        """Yield (key, level rect, item rect) for the tiles that intersect rect"""
+        image = self.levels[level]
+        scale_x = self.image.width() / image.width()
+        scale_y = self.image.height() / image.height()
+        first_col = max(0, int(rect.left() / scale_x) // TILE_SIZE)
+        first_row = max(0, int(rect.top() / scale_y) // TILE_SIZE)
+        last_col = min(image.width() - 1, int(rect.right() / scale_x)) // TILE_SIZE
+        last_row = min(image.height() - 1, int(rect.bottom() / scale_y)) // TILE_SIZE
+        bounds = image.rect()
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                source = QtCore.QRect(
+                    col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE
+                ).intersected(bounds)
+                target = QtCore.QRectF(
+                    source.x() * scale_x,
+                    source.y() * scale_y,
+                    source.width() * scale_x,
+                    source.height() * scale_y,
+                )
+                yield (level, col, row), source, target
+
+    def tile_pixmap(self, key, source):
+        """Return the pixmap for a tile, evicting the least recently used tiles"""
+        pixmap = self.tiles.get(key)
+        if pixmap is not None:
+            self.tiles.move_to_end(key)
+            return pixmap
+        level = key[0]
+        pixmap = QtGui.QPixmap.fromImage(self.levels[level].copy(source))
+        self.tiles[key] = pixmap
+        self.tiles_bytes += tile_size_in_bytes(pixmap)
+        while self.tiles_bytes > TILE_CACHE_BYTES and len(self.tiles) > 1:
+            _, evicted = self.tiles.popitem(last=False)
+            self.tiles_bytes -= tile_size_in_bytes(evicted)
+        return pixmap
+
+    def build_levels(self):
+        """Build the downsampled levels on a worker thread"""
+        if self.building or len(self.levels) > 1:
+            return
+        self.building = True
+        task = qtutils.SimpleTask(build_pyramid, self.image)
+        self.runtask.start(task, result=partial(self.levels_built, self.generation))
+
+    def levels_built(self, generation, levels):
+        """Start painting from the downsampled levels"""
+        if generation != self.generation:
+            return
+        self.building = False
+        self.levels = [self.image] + levels
+        self.update()
+
+
+def pyramid_level(scale):
+    """Return the pyramid level for a view scale where 1.0 shows every pixel"""
+    if scale <= 0.0 or scale >= 1.0:
+        return 0
+    return int(math.floor(math.log2(1.0 / scale)))
+
+
+def build_pyramid(image):
+    """Return images that halve in size until they fit into a single tile"""
+    levels = []
+    while max(image.width(), image.height()) > TILE_SIZE:
+        image = image.scaled(
+            max(1, (image.width() + 1) // 2),
+            max(1, (image.height() + 1) // 2),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation,
+        )
+        levels.append(image)
+    return levels
+
+
+def downscale_factor(width, height):
+    """Return the power of two that shrinks an image to TILED_IMAGE_PIXELS or less"""
+    factor = 1
+    while (width // factor) * (height // factor) > TILED_IMAGE_PIXELS:
+        factor *= 2
+    return factor
+
+
+def tile_size_in_bytes(pixmap):
+    """Return the approximate memory used by a tile's pixmap"""
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+
 class AppImageView(ImageView):
     def __init__(self, parent=None):
         ImageView.__init__(self, parent=parent)
@@ -24,36 +24,22 @@ from .. import qtutils
 from .. import resources
 from .. import utils
 from .. import version
-from . import about
 from . import action
-from . import archive
 from . import bookmarks
 from . import branch
 from . import submodules
-from . import browse
 from . import cfgactions
-from . import clone
 from . import commitmsg
 from . import common
-from . import compare
-from . import createbranch
-from . import createtag
-from . import dag
 from . import diff
-from . import finder
-from . import editremotes
-from . import grep
 from . import log
-from . import merge
-from . import prefs as prefs_widget
-from . import recent
-from . import remote
-from . import search
 from . import standard
 from . import status
-from . import stash
 from . import toolbar
 
+# Dialogs and tool windows are imported when their actions are first triggered.
+lazy = partial(utils.lazy_callable, package=__package__)
+
 
 class MainView(standard.MainWindow):
     config_actions_changed = Signal(object)
@@ -77,6 +63,8 @@ class MainView(standard.MainWindow):
         cfg = context.cfg
         self.browser_dockable = cfg.get('cola.browserdockable')
         if self.browser_dockable:
+            from . import browse
+
             browser = browse.worktree_browser(
                 context, parent=self, show=False, update=False
             )
@@ -266,7 +254,7 @@ class MainView(standard.MainWindow):
         self.new_bare_repository_action.setIcon(icons.new())
 
         prefs_func = partial(
-            prefs_widget.preferences, context, parent=self, model=prefs_model
+            lazy('.prefs', 'preferences'), context, parent=self, model=prefs_model
         )
         self.preferences_action = qtutils.add_action(
             self, N_('Preferences'), prefs_func, QtGui.QKeySequence.Preferences
@@ -274,7 +262,9 @@ class MainView(standard.MainWindow):
         self.preferences_action.setIcon(icons.configure())
 
         self.edit_remotes_action = qtutils.add_action(
-            self, N_('Edit Remotes...'), partial(editremotes.editor, context)
+            self,
+            N_('Edit Remotes...'),
+            partial(lazy('.editremotes', 'editor'), context),
         )
         self.edit_remotes_action.setIcon(icons.edit())
 
@@ -289,7 +279,7 @@ class MainView(standard.MainWindow):
         self.find_files_action = qtutils.add_action(
             self,
             N_('Find Files'),
-            partial(finder.finder, context),
+            partial(lazy('.finder', 'finder'), context),
             hotkeys.FINDER,
         )
         self.find_files_action.setIcon(icons.search())
@@ -297,7 +287,7 @@ class MainView(standard.MainWindow):
         self.browse_recently_modified_action = qtutils.add_action(
             self,
             N_('Recently Modified Files...'),
-            partial(recent.browse_recent_files, context),
+            partial(lazy('.recent', 'browse_recent_files'), context),
             hotkeys.EDIT_SECONDARY,
         )
         self.browse_recently_modified_action.setIcon(icons.directory())
@@ -327,7 +317,9 @@ class MainView(standard.MainWindow):
         )
 
         self.save_tarball_action = qtutils.add_action(
-            self, N_('Save As Tarball/Zip...'), partial(archive.save_archive, context)
+            self,
+            N_('Save As Tarball/Zip...'),
+            partial(lazy('.archive', 'save_archive'), context),
         )
         self.save_tarball_action.setIcon(icons.file_zip())
 
@@ -336,12 +328,15 @@ class MainView(standard.MainWindow):
         )
 
         self.grep_action = qtutils.add_action(
-            self, N_('Grep'), partial(grep.grep, context), hotkeys.GREP
+            self, N_('Grep'), partial(lazy('.grep', 'grep'), context), hotkeys.GREP
         )
         self.grep_action.setIcon(icons.search())
 
         self.merge_local_action = qtutils.add_action(
-            self, N_('Merge...'), partial(merge.local_merge, context), hotkeys.MERGE
+            self,
+            N_('Merge...'),
+            partial(lazy('.merge', 'local_merge'), context),
+            hotkeys.MERGE,
         )
         self.merge_local_action.setIcon(icons.merge())
 
@@ -368,7 +363,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Fetch...'),
             N_('Fetch from one or more remotes using "git fetch"'),
-            partial(remote.fetch, context),
+            partial(lazy('.remote', 'fetch'), context),
             hotkeys.FETCH,
         )
         self.fetch_action.setIcon(icons.download())
@@ -377,7 +372,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Push...'),
             N_('Push to one or more remotes using "git push"'),
-            partial(remote.push, context),
+            partial(lazy('.remote', 'push'), context),
             hotkeys.PUSH,
         )
         self.push_action.setIcon(icons.push())
@@ -386,7 +381,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Pull...'),
             N_('Integrate changes using "git pull"'),
-            partial(remote.pull, context),
+            partial(lazy('.remote', 'pull'), context),
             hotkeys.PULL,
         )
         self.pull_action.setIcon(icons.pull())
@@ -407,7 +402,7 @@ class MainView(standard.MainWindow):
             self,
             N_('Stash...'),
             N_('Temporarily stash away uncommitted changes using "git stash"'),
-            partial(stash.view, context),
+            partial(lazy('.stash', 'view'), context),
             hotkeys.STASH,
         )
         self.stash_action.setIcon(icons.commit())
@@ -461,7 +456,7 @@ class MainView(standard.MainWindow):
         self.restore_worktree_action.setIcon(icons.edit())
 
         self.clone_repo_action = qtutils.add_action(
-            self, N_('Clone...'), partial(clone.clone, context)
+            self, N_('Clone...'), partial(lazy('.clone', 'clone'), context)
         )
         self.clone_repo_action.setIcon(icons.repo())
 
@@ -473,7 +468,10 @@ class MainView(standard.MainWindow):
         )
 
         self.help_shortcuts_action = qtutils.add_action(
-            self, N_('Keyboard Shortcuts'), about.show_shortcuts, hotkeys.QUESTION
+            self,
+            N_('Keyboard Shortcuts'),
+            lazy('.about', 'show_shortcuts'),
+            hotkeys.QUESTION,
         )
 
         self.visualize_current_action = qtutils.add_action(
@@ -489,7 +487,7 @@ class MainView(standard.MainWindow):
         self.visualize_all_action.setIcon(icons.visualize())
 
         self.search_commits_action = qtutils.add_action(
-            self, N_('Search...'), partial(search.search, context)
+            self, N_('Search...'), partial(lazy('.search', 'search'), context)
         )
         self.search_commits_action.setIcon(icons.search())
 
@@ -513,7 +511,11 @@ class MainView(standard.MainWindow):
         self.load_commitmsg_template_action.setIcon(icons.style_dialog_apply())
 
         self.help_about_action = qtutils.add_action(
-            self, N_('About'), partial(about.about_dialog, context)
+            self, N_('About'), partial(lazy('.about', 'about_dialog'), context)
+        )
+
+        self.git_activity_action = qtutils.add_action(
+            self, N_('Git Activity...'), partial(lazy('.gitactivity', 'show'), context)
         )
 
         self.diff_against_commit_action = qtutils.add_action(
@@ -534,21 +536,23 @@ class MainView(standard.MainWindow):
         self.diff_expression_action.setIcon(icons.compare())
 
         self.branch_compare_action = qtutils.add_action(
-            self, N_('Branches...'), partial(compare.compare_branches, context)
+            self,
+            N_('Branches...'),
+            partial(lazy('.compare', 'compare_branches'), context),
         )
         self.branch_compare_action.setIcon(icons.compare())
 
         self.create_tag_action = qtutils.add_action(
             self,
             N_('Create Tag...'),
-            partial(createtag.create_tag, context),
+            partial(lazy('.createtag', 'create_tag'), context),
         )
         self.create_tag_action.setIcon(icons.tag())
 
         self.create_branch_action = qtutils.add_action(
             self,
             N_('Create...'),
-            partial(createbranch.create_new_branch, context),
+            partial(lazy('.createbranch', 'create_new_branch'), context),
             hotkeys.BRANCH,
         )
         self.create_branch_action.setIcon(icons.branch())
@@ -584,7 +588,9 @@ class MainView(standard.MainWindow):
         self.branch_review_action.setIcon(icons.compare())
 
         self.browse_action = qtutils.add_action(
-            self, N_('File Browser...'), partial(browse.worktree_browser, context)
+            self,
+            N_('File Browser...'),
+            partial(lazy('.browse', 'worktree_browser'), context),
         )
         self.browse_action.setIcon(icons.cola())
 
@@ -871,6 +877,8 @@ class MainView(standard.MainWindow):
         self.help_menu = add_menu(N_('Help'), self.menubar)
         self.help_menu.addAction(self.help_docs_action)
         self.help_menu.addAction(self.help_shortcuts_action)
+        self.help_menu.addAction(self.git_activity_action)
+        self.help_menu.addSeparator()
         self.help_menu.addAction(self.help_about_action)
 
         # Arrange dock widgets
@@ -1328,6 +1336,8 @@ class MainView(standard.MainWindow):
         )
 
     def git_dag(self):
+        from . import dag
+
         self.dag = dag.git_dag(self.context, existing_view=self.dag)
 
     # Qt overrides
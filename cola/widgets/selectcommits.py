@@ -23,9 +23,27 @@ def select_commits(context, title, revs, summaries, multiselect=True):
     return dialog.select_commits()
 
 
+def select_commits_from_log(context, title, pages, multiselect=True):
+    """Select commits from gitcmds.LogPages. Pages are loaded on demand."""
+    model = Model([], [], pages=pages)
+    parent = qtutils.active_window()
+    dialog = SelectCommits(context, model, parent, title, multiselect=multiselect)
+    return dialog.select_commits()
+
+
 def select_commits_and_output(context, title, revs, summaries, multiselect=True):
     """Select commits from a list and output path"""
     model = Model(revs, summaries)
+    return _select_commits_and_output(context, model, title, multiselect)
+
+
+def select_commits_and_output_from_log(context, title, pages, multiselect=True):
+    """Select commits from gitcmds.LogPages and output path"""
+    model = Model([], [], pages=pages)
+    return _select_commits_and_output(context, model, title, multiselect)
+
+
+def _select_commits_and_output(context, model, title, multiselect):
     parent = qtutils.active_window()
     dialog = SelectCommitsAndOutput(
         context, model, parent, title, multiselect=multiselect
@@ -34,9 +52,29 @@ def select_commits_and_output(context, title, revs, summaries, multiselect=True)
 
 
 class Model:
-    def __init__(self, revs, summaries):
+    def __init__(self, revs, summaries, pages=None):
         self.revisions = revs
         self.summaries = summaries
+        self.pages = pages
+        self.page_count = 0
+        self.complete = pages is None
+
+    def fetch_page(self):
+        """Read the next page of commits. This is called from a worker thread."""
+        index = self.page_count
+        return (index, self.pages.page(index))
+
+    def add_page(self, index, page):
+        """Append a page read by fetch_page() and return the number of commits"""
+        if index != self.page_count:
+            return 0
+        revs, summaries = page
+        self.page_count += 1
+        self.revisions.extend(revs)
+        self.summaries.extend(summaries)
+        if len(revs) < self.pages.page_size:
+            self.complete = True
+        return len(revs)
 
 
 class SelectCommits(Dialog):
@@ -44,6 +82,12 @@ class SelectCommits(Dialog):
         Dialog.__init__(self, parent)
         self.context = context
         self.model = model
+        self.runtask = qtutils.RunTask(parent=self)
+        self.loading = False
+        # Lowercase summaries and the rows that match the current search.
+        self.folded = []
+        self.matches = []
+        self.search_text = ''
         if title:
             self.setWindowTitle(title)
 
@@ -92,6 +136,7 @@ class SelectCommits(Dialog):
 
         commits.itemSelectionChanged.connect(self.commit_oid_selected)
         commits.itemDoubleClicked.connect(self.commit_oid_double_clicked)
+        commits.verticalScrollBar().valueChanged.connect(self.scrolled)
 
         qtutils.connect_button(self.select_button, self.accept)
 
@@ -109,13 +154,19 @@ class SelectCommits(Dialog):
         return qtutils.selected_items(self.commits, self.model.revisions)
 
     def select_commits(self):
-        summaries = self.model.summaries
+        model = self.model
+        if not model.complete and not model.summaries:
+            model.add_page(*model.fetch_page())
+        summaries = model.summaries
         if not summaries:
             msg = N_('No commits exist in this branch.')
             Interaction.log(msg)
             return []
         qtutils.set_items(self.commits, summaries)
+        self.folded = [summary.lower() for summary in summaries]
+        self.matches = list(range(len(summaries)))
         self.show()
+        self.fetch_more_if_needed()
         if self.exec_() != QtWidgets.QDialog.Accepted:
             return []
         return self.selected_commits()
@@ -141,12 +192,68 @@ class SelectCommits(Dialog):
             self.accept()
 
     def search_list(self, text):
-        if text:
-            for i in range(self.commits.count()):
-                self.commits.item(i).setHidden(True)
-        search_items = self.commits.findItems(text, Qt.MatchContains)
-        for items in search_items:
-            items.setHidden(False)
+        """Hide the commits that do not contain the search text"""
+        text = text.lower()
+        previous = self.search_text
+        self.search_text = text
+        if previous and text.startswith(previous):
+            # A longer search can only match a subset of the current matches.
+            candidates = self.matches
+        else:
+            candidates = range(len(self.folded))
+        folded = self.folded
+        matches = [row for row in candidates if text in folded[row]]
+        old_matches = set(self.matches)
+        new_matches = set(matches)
+        commits = self.commits
+        for row in old_matches - new_matches:
+            commits.item(row).setHidden(True)
+        for row in new_matches - old_matches:
+            commits.item(row).setHidden(False)
+        self.matches = matches
+        self.fetch_more_if_needed()
+
+    def scrolled(self, value):
+        """Load more commits when the end of the list is reached"""
+        scrollbar = self.commits.verticalScrollBar()
+        if value >= scrollbar.maximum() - scrollbar.pageStep():
+            self.fetch_more()
+
+    def fetch_more_if_needed(self):
+        """Load more commits until the matching commits fill the list"""
+        commits = self.commits
+        row_height = max(1, commits.sizeHintForRow(0))
+        rows = commits.viewport().height() // row_height + 1
+        if len(self.matches) < rows:
+            self.fetch_more()
+
+    def fetch_more(self):
+        """Load the next page of commits in the background"""
+        model = self.model
+        if model.complete or self.loading:
+            return
+        self.loading = True
+        task = qtutils.SimpleTask(model.fetch_page)
+        self.runtask.start(task, result=self.page_loaded)
+
+    def page_loaded(self, result):
+        """Append a page of commits and apply the current search"""
+        self.loading = False
+        index, page = result
+        start = len(self.folded)
+        if not self.model.add_page(index, page):
+            return
+        summaries = page[1]
+        commits = self.commits
+        commits.addItems(summaries)
+        self.folded.extend(summary.lower() for summary in summaries)
+        text = self.search_text
+        for row in range(start, len(self.folded)):
+            if text in self.folded[row]:
+                self.matches.append(row)
+            else:
+                commits.item(row).setHidden(True)
+        self.fetch_more_if_needed()
 
 
 class SelectCommitsAndOutput(SelectCommits):
@@ -171,8 +278,10 @@ class SelectCommitsAndOutput(SelectCommits):
     def select_commits_and_output(self):
         to_export = SelectCommits.select_commits(self)
         output = self.output_dir
+        # All of the loaded revisions are needed to group contiguous selections.
+        revs = self.model.revisions
 
-        return {'to_export': to_export, 'output': output}
+        return {'to_export': to_export, 'revs': revs, 'output': output}
 
     def show_output_dialog(self):
         self.output_dir = qtutils.opendir_dialog(
@@ -1,4 +1,4 @@
-import re
+import collections
 
 from qtpy import QtCore
 from qtpy import QtGui
@@ -196,29 +196,62 @@ class SpellCheckLineEdit(SpellCheckTextEdit):
 
 
 class Highlighter(QtGui.QSyntaxHighlighter):
-    WORDS = r"(?iu)[\w']+"
+    # Block states. Lines inside of ``` fenced code blocks are not checked.
+    NORMAL = 0
+    FENCED = 1
+    FENCE = '```'
+    # The number of lines whose misspelled word ranges are remembered.
+    CACHE_SIZE = 1024
 
     def __init__(self, doc, spellcheck_widget):
         QtGui.QSyntaxHighlighter.__init__(self, doc)
         self.spellcheck = spellcheck_widget
         self.enabled = False
+        self._generation = None
+        self._ranges = collections.OrderedDict()
+        self._format = QtGui.QTextCharFormat()
+        self._format.setUnderlineColor(Qt.red)
+        self._format.setUnderlineStyle(QtGui.QTextCharFormat.SpellCheckUnderline)
 
     def enable(self, enabled):
+        # Qt re-highlights the edited blocks by itself. The whole document only
+        # needs to be re-highlighted when the results could have changed.
+        if enabled == self.enabled and self._generation == self.spellcheck.generation:
+            return
         self.enabled = enabled
         self.rehighlight()
 
     def highlightBlock(self, text):
-        if not self.enabled:
+        fenced = self.previousBlockState() == self.FENCED
+        if text.lstrip().startswith(self.FENCE):
+            self.setCurrentBlockState(self.NORMAL if fenced else self.FENCED)
+            return
+        self.setCurrentBlockState(self.FENCED if fenced else self.NORMAL)
+        if fenced or not self.enabled:
             return
-        fmt = QtGui.QTextCharFormat()
-        fmt.setUnderlineColor(Qt.red)
-        fmt.setUnderlineStyle(QtGui.QTextCharFormat.SpellCheckUnderline)
-
-        for word_object in re.finditer(self.WORDS, text):
-            if not self.spellcheck.check(word_object.group()):
-                self.setFormat(
-                    word_object.start(), word_object.end() - word_object.start(), fmt
-                )
+        for start, length in self.misspelled(text):
+            self.setFormat(start, length, self._format)
+
+    def misspelled(self, text):
+        """Return the (start, length) ranges of the misspelled words in a line"""
+        cache = self._ranges
+        generation = self.spellcheck.generation
+        if generation != self._generation:
+            cache.clear()
+            self._generation = generation
+        ranges = cache.get(text)
+        if ranges is not None:
+            cache.move_to_end(text)
+            return ranges
+        check = self.spellcheck.check
+        ranges = cache[text] = tuple(
+            (start, len(word))
+            for start, word in spellcheck.words(text)
+            if not check(word)
+        )
+        if len(cache) > self.CACHE_SIZE:
+            cache.popitem(last=False)
+        return ranges
 
 
 class SpellAction(QtWidgets.QAction):
@@ -14,6 +14,7 @@ from .. import guicmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
+from .. import settings as settings_mod
 from .. import utils
 from .. import version
 from . import clone
@@ -45,6 +46,9 @@ class StartupDialog(standard.Dialog):
             self.runtask = context.runtask
         else:
             self.runtask = context.runtask = qtutils.RunTask(parent=self)
+        # Validation results are discarded if the dialog goes away first.
+        self.validate_task = qtutils.RunTask(parent=self)
+        self.repo_status = {}
 
         self.new_button = qtutils.create_button(text=N_('New...'), icon=icons.new())
         self.open_button = qtutils.create_button(
@@ -128,6 +132,8 @@ class StartupDialog(standard.Dialog):
         qtutils.connect_button(self.clone_button, self.clone_repo)
         qtutils.connect_button(self.new_button, self.new_repo)
         qtutils.connect_button(self.close_button, self.reject)
+
+        self.validate_repos()
         self.tab_bar.currentChanged.connect(self.tab_changed)
 
         self.init_state(settings, self.resize_widget)
@@ -265,6 +271,37 @@ class StartupDialog(standard.Dialog):
             self.items.remove(item)
             self.bookmarks_model.removeRow(index.row())
 
+    def validate_repos(self):
+        """Show the cached repository status and check stale entries in a task"""
+        settings = self.context.settings
+        stale = []
+        for item in self.items:
+            valid = settings.cached_repo_status(item.path)
+            if valid is None:
+                stale.append(item.path)
+            else:
+                self.repo_status[item.path] = valid
+        self.update_repo_status()
+        if stale:
+            task = qtutils.SimpleTask(
+                settings_mod.validate_paths, stale, verify=settings.verify
+            )
+            self.validate_task.start(task, result=self.repos_validated)
+
+    def repos_validated(self, results):
+        """Cache the validation results and update the items"""
+        settings = self.context.settings
+        settings.update_repo_status(results)
+        settings.save(sync=False)
+        self.repo_status.update(results)
+        self.update_repo_status()
+
+    def update_repo_status(self):
+        """Apply the known repository status to the items"""
+        for item in self.items:
+            if item.path in self.repo_status:
+                item.set_valid(self.repo_status[item.path])
+
     def get_selected_bookmark(self):
         selected = self.bookmarks.selectedIndexes()
         if selected and selected[0].row() != 0:
@@ -284,6 +321,7 @@ class StartupDialog(standard.Dialog):
         for item in items:
             bookmarks_model.appendRow(item)
             new_items.append(item)
+        self.update_repo_status()
 
 
 def get_all_repos(context, settings):
@@ -446,6 +484,9 @@ class BookmarksListView(QtWidgets.QListView):
             menu.exec_(self.mapToGlobal(event.pos()))
 
     def item_changed(self, item):
+        # Icon and tooltip changes are also reported. Only text edits are renames.
+        if not item.isEditable() or item.text() == item.name:
+            return
         self.rename_entry(item, item.text())
 
     def rename_entry(self, item, new_name):
@@ -566,6 +607,7 @@ class BuildItem:
 class PromptWidgetItem(QtGui.QStandardItem):
     def __init__(self, path, name, mode, icon, is_default, is_bookmark):
         QtGui.QStandardItem.__init__(self, icon, name)
+        self.icon = icon
         self.path = path
         self.name = name
         self.mode = mode
@@ -585,6 +627,18 @@ class PromptWidgetItem(QtGui.QStandardItem):
         self.setText(item_text)
         self.setToolTip(path)
 
+    def set_valid(self, valid):
+        """Indicate whether the repository exists. None means that it is unknown"""
+        if valid is False:
+            self.setIcon(icons.from_style(QtWidgets.QStyle.SP_MessageBoxWarning))
+            self.setToolTip(N_('%s could not be found') % self.path)
+        elif valid is None:
+            self.setIcon(self.icon)
+            self.setToolTip(N_('%s could not be checked') % self.path)
+        else:
+            self.setIcon(self.icon)
+            self.setToolTip(self.path)
+
 
 def make_size(size):
     """Construct a QSize from a single value"""
@@ -1,4 +1,6 @@
 """Widgets for manipulating git stashes"""
+from functools import partial
+
 from qtpy.QtCore import Qt
 
 from ..i18n import N_
@@ -33,6 +35,11 @@ class StashView(standard.Dialog):
         self.stashes = []
         self.revids = []
         self.names = []
+        # The stash list and diffs are loaded in the background. Results from
+        # superseded requests are ignored.
+        self.runtask = qtutils.RunTask(parent=self)
+        self.list_generation = 0
+        self.diff_generation = 0
 
         self.setWindowTitle(N_('Stash'))
         if parent is not None:
@@ -202,8 +209,19 @@ class StashView(standard.Dialog):
         selection = self.selected_stash()
         if not selection:
             return
-        diff_text = self.model.stash_diff(selection)
-        self.stash_text.setPlainText(diff_text)
+        self.diff_generation += 1
+        diff_text = self.model.cached_stash_diff(selection)
+        if diff_text is not None:
+            self.stash_text.setPlainText(diff_text)
+            return
+        task = qtutils.SimpleTask(self.model.stash_diff, selection)
+        result = partial(self.stash_diff_loaded, self.diff_generation)
+        self.runtask.start(task, result=result)
+
+    def stash_diff_loaded(self, generation, diff_text):
+        """Display a diff loaded in the background"""
+        if generation == self.diff_generation:
+            self.stash_text.setPlainText(diff_text)
 
     def update_actions(self):
         is_staged = self.model.is_staged()
@@ -225,12 +243,26 @@ class StashView(standard.Dialog):
 
     def update_from_model(self):
         """Initiates git queries on the model and updates the view"""
-        stashes, revids, author_dates, names = self.model.stash_info()
+        # "Stash Index" depends on staged changes, so disable this option
+        # if there are no staged changes.
+        is_staged = self.model.is_staged()
+        if stash.should_stash_staged(self.save_modes.current_index()) and not is_staged:
+            self.save_modes.set_index(stash.SaveModes.ALL)
+
+        self.list_generation += 1
+        task = qtutils.SimpleTask(self.model.stash_info)
+        result = partial(self.stash_info_loaded, self.list_generation)
+        self.runtask.start(task, result=result)
+
+    def stash_info_loaded(self, generation, stash_info):
+        """Display the stash list loaded in the background"""
+        if generation != self.list_generation:
+            return
+        stashes, revids, author_dates, names = stash_info
         self.stashes = stashes
         self.revids = revids
         self.names = names
 
-        displayed = False
         self.stash_list.clear()
         self.stash_list.addItems(self.stashes)
         if self.stash_list.count() > 0:
@@ -238,15 +270,10 @@ class StashView(standard.Dialog):
                 self.stash_list.item(i).setToolTip(author_dates[i])
             item = self.stash_list.item(0)
             self.stash_list.setCurrentItem(item)
-            displayed = True
-
-        # "Stash Index" depends on staged changes, so disable this option
-        # if there are no staged changes.
-        is_staged = self.model.is_staged()
-        if stash.should_stash_staged(self.save_modes.current_index()) and not is_staged:
-            self.save_modes.set_index(stash.SaveModes.ALL)
-
-        return displayed
+        else:
+            self.diff_generation += 1
+            self.stash_text.setPlainText('')
+        self.update_actions()
 
     def stash_rename(self):
         """Renames the currently selected stash"""
@@ -319,8 +346,7 @@ class StashView(standard.Dialog):
         ):
             return
         cmds.do(stash.DropStash, self.context, selection)
-        if not self.update_from_model():
-            self.stash_text.setPlainText('')
+        self.update_from_model()
 
     def export_state(self):
         """Export persistent settings"""
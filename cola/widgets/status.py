@@ -3,6 +3,7 @@ import os
 from functools import partial
 
 from qtpy.QtCore import Qt
+from qtpy.QtCore import Signal
 from qtpy import QtCore
 from qtpy import QtWidgets
 
@@ -17,6 +18,7 @@ from .. import actions
 from .. import cmds
 from .. import core
 from .. import difftool
+from .. import gitcmds
 from .. import hotkeys
 from .. import icons
 from .. import qtutils
@@ -35,6 +37,16 @@ MODIFIED_IDX = 2
 UNTRACKED_IDX = 3
 END_IDX = 4
 
+# The delay before the status filter is applied while typing.
+FILTER_DELAY_MS = 150
+
+# The number of conflict marker line numbers listed in an unmerged item's tooltip.
+MAX_CONFLICT_LINES = 10
+
+# Item flags for the top-level headers and the paths in the status model.
+HEADER_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+PATH_FLAGS = HEADER_FLAGS | Qt.ItemIsDragEnabled | Qt.ItemNeverHasChildren
+
 # Indexes into the saved_selection entries.
 NEW_PATHS_IDX = 0
 OLD_PATHS_IDX = 1
@@ -108,7 +120,7 @@ class StatusWidget(QtWidgets.QFrame):
         """Set the filter text"""
         self.filter_widget.setVisible(True)
         self.filter_widget.text.set_value(txt)
-        self.filter_widget.apply_filter()
+        self.filter_widget.narrow_scan()
 
     def set_mode(self, mode):
         """React to changes in model's editing mode"""
@@ -131,17 +143,291 @@ class StatusWidget(QtWidgets.QFrame):
         self.tree.setFont(font)
 
 
-class StatusTreeWidget(QtWidgets.QTreeWidget):
+class StatusSection:
+    """The paths displayed under one of the top-level status headers"""
+
+    def __init__(self, idx, title, icon, staged=False, untracked=False):
+        self.idx = idx
+        self.title = title
+        self.icon = icon
+        self.staged = staged
+        self.untracked = untracked
+        self.paths = []
+        self.deleted_set = None
+        self.check_exists = False
+        self.tooltips = {}
+        self.icons = {}
+
+    def set_paths(self, paths, deleted_set=None, check_exists=False):
+        """Replace the paths and the state used to decorate them"""
+        self.paths = paths
+        self.deleted_set = deleted_set
+        self.check_exists = check_exists
+        self.icons = {}
+
+    def is_deleted(self, path):
+        """Has the path been deleted? Unmerged paths are checked on disk"""
+        if self.check_exists:
+            return not core.exists(path)
+        return self.deleted_set is not None and path in self.deleted_set
+
+    def path_icon(self, path):
+        """Return the icon for a path, creating it on first use"""
+        icon = self.icons.get(path)
+        if icon is None:
+            deleted = self.is_deleted(path)
+            icon_name = icons.status(path, deleted, self.staged, self.untracked)
+            icon = icons.from_name(icons.name_from_basename(icon_name))
+            self.icons[path] = icon
+        return icon
+
+
+class StatusModel(QtCore.QAbstractItemModel):
+    """Present the status sections as top-level rows with a child row per path
+
+    The paths are kept in flat lists and rows, icons and deleted flags are only
+    computed when the view asks for them, so large worktrees stay responsive.
+    """
+
+    def __init__(self, context, parent=None):
+        QtCore.QAbstractItemModel.__init__(self, parent)
+        self.context = context
+        self.sections = [
+            StatusSection(STAGED_IDX, N_('Staged'), icons.ok(), staged=True),
+            StatusSection(UNMERGED_IDX, N_('Unmerged'), icons.compare()),
+            StatusSection(MODIFIED_IDX, N_('Modified'), icons.compare()),
+            StatusSection(
+                UNTRACKED_IDX, N_('Untracked'), icons.question(), untracked=True
+            ),
+        ]
+        self.header_font = None
+        self.header_background = None
+        self.show_totals = False
+        self.include_urls = True
+
+    def header_index(self, idx):
+        """Return the index of a top-level header"""
+        return self.index(idx, 0)
+
+    def path_index(self, idx, row):
+        """Return the index of a path under a top-level header"""
+        return self.index(row, 0, self.header_index(idx))
+
+    def category(self, index):
+        """Return the section index for a path, or HEADER_IDX for a header"""
+        section = index.internalPointer()
+        if section is None:
+            return HEADER_IDX
+        return section.idx
+
+    def path(self, index):
+        """Return the path for an index"""
+        section = index.internalPointer()
+        if section is None:
+            return None
+        return section.paths[index.row()]
+
+    def is_deleted(self, index):
+        """Return True when the path for an index has been deleted"""
+        section = index.internalPointer()
+        return section is not None and section.is_deleted(section.paths[index.row()])
+
+    def set_paths(self, idx, paths, deleted_set=None, check_exists=False):
+        """Apply the differences between a section's paths and the new paths
+
+        Only the rows for paths that were added or removed are touched so the
+        selection and scroll position of the remaining rows are kept.
+        Returns True when rows were inserted or removed.
+        """
+        section = self.sections[idx]
+        parent = self.header_index(idx)
+        hunks = diff_paths(section.paths, paths)
+        if hunks:
+            # Edit a copy so that the caller's list is never modified.
+            current = section.paths = list(section.paths)
+            # Later hunks are applied first so that earlier row numbers stay valid.
+            for old_start, old_end, new_start, new_end in reversed(hunks):
+                if old_end > old_start:
+                    self.beginRemoveRows(parent, old_start, old_end - 1)
+                    del current[old_start:old_end]
+                    self.endRemoveRows()
+                if new_end > new_start:
+                    last = old_start + new_end - new_start - 1
+                    self.beginInsertRows(parent, old_start, last)
+                    current[old_start:old_start] = paths[new_start:new_end]
+                    self.endInsertRows()
+
+        deleted_changed = (
+            check_exists or section.check_exists or deleted_set != section.deleted_set
+        )
+        section.set_paths(paths, deleted_set=deleted_set, check_exists=check_exists)
+        self.dataChanged.emit(parent, parent)
+        if paths and deleted_changed:
+            # Repaint the icons because the deleted state of the paths changed.
+            self.dataChanged.emit(
+                self.index(0, 0, parent), self.index(len(paths) - 1, 0, parent)
+            )
+        return bool(hunks)
+
+    def set_tooltips(self, idx, tooltips):
+        """Set the tooltips for paths in a section"""
+        section = self.sections[idx]
+        section.tooltips = tooltips
+        if section.paths:
+            parent = self.header_index(idx)
+            first = self.index(0, 0, parent)
+            last = self.index(len(section.paths) - 1, 0, parent)
+            self.dataChanged.emit(first, last)
+
+    # Qt overrides
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        """Create indexes for the top-level headers and their paths"""
+        # This is called for every visible row when the view is laid out.
+        if parent.isValid():
+            if column == 0 and parent.internalPointer() is None:
+                section = self.sections[parent.row()]
+                if 0 <= row < len(section.paths):
+                    return self.createIndex(row, 0, section)
+        elif column == 0 and 0 <= row < len(self.sections):
+            return self.createIndex(row, 0)
+        return QtCore.QModelIndex()
+
+    def parent(self, index=None):
+        """Return the header index for a path"""
+        if index is None:
+            return super().parent()
+        section = index.internalPointer()
+        if section is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(section.idx, 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Return the number of headers or the number of paths in a section"""
+        if not parent.isValid():
+            return len(self.sections)
+        if parent.internalPointer() is not None:
+            return 0
+        return len(self.sections[parent.row()].paths)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        """Only the top-level headers have children"""
+        return self.rowCount(parent) > 0
+
+    def columnCount(self, _parent=QtCore.QModelIndex()):
+        """The status tree has a single column"""
+        return 1
+
+    def flags(self, index):
+        """Paths can be dragged"""
+        if index.internalPointer() is not None:
+            return PATH_FLAGS
+        if index.isValid():
+            return HEADER_FLAGS
+        return Qt.NoItemFlags
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return the text, icons and styling for headers and paths"""
+        if not index.isValid():
+            return None
+        section = index.internalPointer()
+        if section is None:
+            return self._header_data(self.sections[index.row()], role)
+        path = section.paths[index.row()]
+        if role == Qt.DisplayRole:
+            return path
+        if role == Qt.DecorationRole:
+            return section.path_icon(path)
+        if role == Qt.ToolTipRole:
+            return section.tooltips.get(path)
+        return None
+
+    def _header_data(self, section, role):
+        if role == Qt.DisplayRole:
+            if self.show_totals:
+                return f'{section.title} ({len(section.paths)})'
+            return section.title
+        if role == Qt.DecorationRole:
+            return section.icon
+        if role == Qt.FontRole:
+            return self.header_font
+        if role == Qt.BackgroundRole:
+            return self.header_background
+        return None
+
+    def mimeTypes(self):
+        """Return the mime types that this model generates"""
+        return qtutils.path_mimetypes(include_urls=self.include_urls)
+
+    def mimeData(self, indexes):
+        """Return a list of absolute-path URLs for paths that exist on disk"""
+        paths = []
+        for index in indexes:
+            path = self.path(index)
+            if path and not self.is_deleted(index) and core.exists(path):
+                paths.append(path)
+        return qtutils.mimedata_from_paths(
+            self.context, paths, include_urls=self.include_urls
+        )
+
+
+def diff_paths(old_paths, new_paths):
+    """Return the ranges that differ between two sorted lists of paths
+
+    Each hunk is an (old_start, old_end, new_start, new_end) tuple describing
+    the old_paths[old_start:old_end] slice that is replaced by the
+    new_paths[new_start:new_end] slice. Unsorted lists produce valid, but
+    larger, hunks.
+    """
+    if old_paths == new_paths:
+        return []
+    hunks = []
+    old_len = len(old_paths)
+    new_len = len(new_paths)
+    old_idx = new_idx = 0
+    while old_idx < old_len or new_idx < new_len:
+        # Skip over the paths that are in both lists.
+        while (
+            old_idx < old_len
+            and new_idx < new_len
+            and old_paths[old_idx] == new_paths[new_idx]
+        ):
+            old_idx += 1
+            new_idx += 1
+        old_start = old_idx
+        new_start = new_idx
+        # Merge the differing paths until the lists line up again.
+        while old_idx < old_len and new_idx < new_len:
+            old_path = old_paths[old_idx]
+            new_path = new_paths[new_idx]
+            if old_path == new_path:
+                break
+            if old_path < new_path:
+                old_idx += 1
+            else:
+                new_idx += 1
+        else:
+            old_idx = old_len
+            new_idx = new_len
+        if old_idx > old_start or new_idx > new_start:
+            hunks.append((old_start, old_idx, new_start, new_idx))
+    return hunks
+
+
+class StatusTreeWidget(QtWidgets.QTreeView):
     # Read-only access to the mode state
     mode = property(lambda self: self._model.mode)
+    # Emitted when the selected rows change.
+    selection_changed = Signal()
 
     def __init__(self, context, parent=None):
-        QtWidgets.QTreeWidget.__init__(self, parent)
+        QtWidgets.QTreeView.__init__(self, parent)
         self.context = context
         self.selection_model = context.selection
+        self.status_model = StatusModel(context, parent=self)
+        self.setModel(self.status_model)
 
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
-        self.headerItem().setHidden(True)
+        self.setHeaderHidden(True)
         self.setAllColumnsShowFocus(True)
         self.setSortingEnabled(False)
         self.setUniformRowHeights(True)
@@ -150,22 +436,13 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         self.setAutoScroll(False)
         self.setDragEnabled(True)
         self.setDragDropMode(QtWidgets.QAbstractItemView.DragOnly)
-        self._alt_drag = False
 
         if not prefs.status_indent(context):
             self.setIndentation(0)
 
-        ok_icon = icons.ok()
-        compare = icons.compare()
-        question = icons.question()
-        self._add_toplevel_item(N_('Staged'), ok_icon, hide=True)
-        self._add_toplevel_item(N_('Unmerged'), compare, hide=True)
-        self._add_toplevel_item(N_('Modified'), compare, hide=True)
-        self._add_toplevel_item(N_('Untracked'), question, hide=True)
+        self._init_headers()
 
         # Used to restore the selection
-        self.old_vscroll = None
-        self.old_hscroll = None
         self.old_selection = None
         self.old_contents = None
         self.old_current_item = None
@@ -174,6 +451,8 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         self.expanded_items = set()
 
         self.image_formats = qtutils.ImageFormats()
+        self.runtask = qtutils.RunTask(parent=self)
+        self.conflicts_generation = 0
 
         self.process_selection_action = qtutils.add_action(
             self,
@@ -319,7 +598,7 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         self.delete_untracked_files_action.setIcon(icons.discard())
 
         # The model is stored as self._model because self.model() is a
-        # QTreeWidgetItem method that returns a QAbstractItemModel.
+        # QTreeView method that returns the StatusModel.
         self._model = context.model
         self._model.previous_contents.connect(
             self._set_previous_contents, type=Qt.QueuedConnection
@@ -331,37 +610,51 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         self._model.diff_text_changed.connect(
             self._make_current_item_visible, type=Qt.QueuedConnection
         )
-        self.itemSelectionChanged.connect(self.show_selection)
-        self.itemDoubleClicked.connect(cmds.run(cmds.StageOrUnstage, self.context))
-        self.itemCollapsed.connect(lambda x: self._update_column_widths())
-        self.itemExpanded.connect(lambda x: self._update_column_widths())
+        self.selectionModel().selectionChanged.connect(self._selection_changed)
+        self.selection_changed.connect(self.show_selection)
+        self.doubleClicked.connect(cmds.run(cmds.StageOrUnstage, self.context))
+        self.collapsed.connect(lambda x: self._update_column_widths())
+        self.expanded.connect(lambda x: self._update_column_widths())
+
+    def _selection_changed(self, _selected, _deselected):
+        """Forward selection changes so that they can be blocked with the widget"""
+        self.selection_changed.emit()
 
     def _make_current_item_visible(self):
-        item = self.currentItem()
-        if item:
-            qtutils.scroll_to_item(self, item)
+        index = self.currentIndex()
+        if index.isValid():
+            self._scroll_to(index)
 
-    def _add_toplevel_item(self, txt, icon, hide=False):
+    def _init_headers(self):
+        """Style the top-level headers and hide them until they have paths"""
         context = self.context
         font = self.font()
         if prefs.bold_headers(context):
             font.setBold(True)
+            self.status_model.header_background = self.palette().midlight()
         else:
             font.setItalic(True)
-
-        item = QtWidgets.QTreeWidgetItem(self)
-        item.setFont(0, font)
-        item.setText(0, txt)
-        item.setIcon(0, icon)
-        if prefs.bold_headers(context):
-            item.setBackground(0, self.palette().midlight())
-        if hide:
-            item.setHidden(True)
+        self.status_model.header_font = font
+        for idx in range(len(self.status_model.sections)):
+            self.setRowHidden(idx, QtCore.QModelIndex(), True)
+
+    def _scroll_to(self, index):
+        """Scroll to an index while retaining the horizontal scroll position"""
+        hscrollbar = self.horizontalScrollBar()
+        hscroll = get(hscrollbar)
+        self.scrollTo(index)
+        hscrollbar.setValue(hscroll)
+
+    def _select_index(self, index):
+        """Scroll to and make an index selected and current"""
+        self._scroll_to(index)
+        self.setCurrentIndex(index)
+        self.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
 
     def _restore_selection(self):
         """Apply the old selection to the newly updated items"""
-        # This function is called after a new set of items have been added to
-        # the per-category file lists. Its purpose is to either restore the
+        # This function is called after the changed rows have been applied to
+        # the per-category file lists. Its purpose is to either keep the
         # existing selection or to create a new intuitive selection based on
         # a combination of the old items, the old selection and the new items.
         if not self.old_selection or not self.old_contents:
@@ -396,39 +689,19 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
             ),
         ]
 
-        # Restore the current item
+        # Restore the current header item
         if self.old_current_item:
             category, idx = self.old_current_item
             if _apply_toplevel_selection(self, category, idx):
                 return
-            # Reselect the current item
-            selection_info = saved_selection[category]
-            new = selection_info[NEW_PATHS_IDX]
-            old = selection_info[OLD_PATHS_IDX]
-            reselect = selection_info[SELECT_FN_IDX]
-            try:
-                item = old[idx]
-            except IndexError:
-                item = None
-            if item and item in new:
-                reselect(item, current=True)
-
-        # Restore previously selected items.
-        # When reselecting in this section we only care that the items are
-        # selected; we do not need to rerun the callbacks which were triggered
-        # above for the current item.  Block signals to skip the callbacks.
-        #
-        # Reselect items that were previously selected and still exist in the
-        # current path lists. This handles a common case such as a Ctrl-R
-        # refresh which results in the same exact path state.
-        did_reselect = False
 
-        with qtutils.BlockSignals(self):
-            for new, old, sel, reselect in saved_selection:
-                for item in sel:
-                    if item in new:
-                        reselect(item, current=False)
-                        did_reselect = True
+        # Rows for paths that still exist keep their selection and the current
+        # item across a refresh because only the changed rows are replaced.
+        # This handles a common case such as a Ctrl-R refresh which results in
+        # the same exact path state.
+        did_reselect = any(
+            item in new for new, old, sel, reselect in saved_selection for item in sel
+        )
 
         # The status widget is used to interactively work your way down the
         # list of Staged, Unmerged, Modified and Untracked items and perform
@@ -461,8 +734,9 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
                         reselect(j, current=True)
                         return
 
-        # If we already reselected stuff then there's nothing more to do.
+        # If items are still selected then refresh the diff for them.
         if did_reselect:
+            self.show_selection()
             return
         # If we got this far then nothing was reselected and made current.
         # Try a few more heuristics that we can use to keep something selected.
@@ -472,12 +746,6 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
                 category, idx, self.previous_contents, saved_selection
             )
 
-    def _restore_scrollbars(self):
-        """Restore scrollbars to the stored values"""
-        qtutils.set_scrollbar_values(self, self.old_hscroll, self.old_vscroll)
-        self.old_hscroll = None
-        self.old_vscroll = None
-
     def _stage_selection(self):
         """Stage or unstage files according to the selection"""
         context = self.context
@@ -534,59 +802,24 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
     def _untracked_item(self, itemidx):
         return self._subtree_item(UNTRACKED_IDX, itemidx)
 
-    def _unstaged_item(self, itemidx):
-        # is it modified?
-        item = self.topLevelItem(MODIFIED_IDX)
-        count = item.childCount()
-        if itemidx < count:
-            return item.child(itemidx)
-        # is it unmerged?
-        item = self.topLevelItem(UNMERGED_IDX)
-        count += item.childCount()
-        if itemidx < count:
-            return item.child(itemidx)
-        # is it untracked?
-        item = self.topLevelItem(UNTRACKED_IDX)
-        count += item.childCount()
-        if itemidx < count:
-            return item.child(itemidx)
-        # Nope..
-        return None
-
     def _subtree_item(self, idx, itemidx):
-        parent = self.topLevelItem(idx)
-        return parent.child(itemidx)
+        return self.status_model.path_index(idx, itemidx)
 
     def _set_previous_contents(self, staged, unmerged, modified, untracked):
         """Callback triggered right before the model changes its contents"""
         self.previous_contents = selection.State(staged, unmerged, modified, untracked)
 
     def _about_to_update(self):
-        self._save_scrollbars()
         self._save_selection()
 
-    def _save_scrollbars(self):
-        """Store the scrollbar values for later application"""
-        hscroll, vscroll = qtutils.get_scrollbar_values(self)
-        if hscroll is not None:
-            self.old_hscroll = hscroll
-        if vscroll is not None:
-            self.old_vscroll = vscroll
-
     def current_item(self):
         s = self.selected_indexes()
         if not s:
             return None
-        current = self.currentItem()
-        if not current:
+        current = self.currentIndex()
+        if not current.isValid():
             return None
-        idx = self.indexFromItem(current)
-        if idx.parent().isValid():
-            parent_idx = idx.parent()
-            entry = (parent_idx.row(), idx.row())
-        else:
-            entry = (HEADER_IDX, idx.row())
-        return entry
+        return (self.status_model.category(current), current.row())
 
     def _save_selection(self):
         self.old_contents = self.contents()
@@ -594,14 +827,15 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         self.old_current_item = self.current_item()
 
     def refresh(self):
-        self._set_staged(self._model.staged)
-        self._set_modified(self._model.modified)
-        self._set_unmerged(self._model.unmerged)
-        self._set_untracked(self._model.untracked)
-        self._update_column_widths()
+        self.status_model.show_totals = prefs.status_show_totals(self.context)
+        changed = self._set_staged(self._model.staged)
+        changed |= self._set_modified(self._model.modified)
+        changed |= self._set_unmerged(self._model.unmerged)
+        changed |= self._set_untracked(self._model.untracked)
+        if changed:
+            self._update_column_widths()
         self._update_actions()
         self._restore_selection()
-        self._restore_scrollbars()
 
     def _update_actions(self, selected=None):
         if selected is None:
@@ -619,60 +853,62 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
     def _set_staged(self, items):
         """Adds items to the 'Staged' sub-tree."""
         with qtutils.BlockSignals(self):
-            self._set_subtree(
-                items,
-                STAGED_IDX,
-                N_('Staged'),
-                staged=True,
-                deleted_set=self._model.staged_deleted,
+            return self._set_subtree(
+                items, STAGED_IDX, deleted_set=self._model.staged_deleted
             )
 
     def _set_modified(self, items):
         """Adds items to the 'Modified' sub-tree."""
         with qtutils.BlockSignals(self):
-            self._set_subtree(
-                items,
-                MODIFIED_IDX,
-                N_('Modified'),
-                deleted_set=self._model.unstaged_deleted,
+            return self._set_subtree(
+                items, MODIFIED_IDX, deleted_set=self._model.unstaged_deleted
             )
 
     def _set_unmerged(self, items):
         """Adds items to the 'Unmerged' sub-tree."""
-        deleted_set = {path for path in items if not core.exists(path)}
         with qtutils.BlockSignals(self):
-            self._set_subtree(
-                items, UNMERGED_IDX, N_('Unmerged'), deleted_set=deleted_set
-            )
+            changed = self._set_subtree(items, UNMERGED_IDX, check_exists=True)
+        self._scan_conflicts(items)
+        return changed
+
+    def _scan_conflicts(self, items):
+        """Scan unmerged files for conflict markers in the background"""
+        self.conflicts_generation += 1
+        if not items or not prefs.check_conflicts(self.context):
+            self.status_model.set_tooltips(UNMERGED_IDX, {})
+            return
+        task = qtutils.SimpleTask(gitcmds.conflict_markers, list(items))
+        result = partial(self._conflicts_scanned, self.conflicts_generation, items)
+        self.runtask.start(task, result=result)
+
+    def _conflicts_scanned(self, generation, items, markers):
+        """Show the conflict markers of unmerged files in their tooltips"""
+        # Discard results for unmerged files that have since been replaced.
+        if generation != self.conflicts_generation:
+            return
+        tooltips = {
+            path: conflict_markers_tooltip(lines)
+            for path, lines in markers.items()
+            if lines
+        }
+        self.status_model.set_tooltips(UNMERGED_IDX, tooltips)
 
     def _set_untracked(self, items):
         """Adds items to the 'Untracked' sub-tree."""
         with qtutils.BlockSignals(self):
-            self._set_subtree(items, UNTRACKED_IDX, N_('Untracked'), untracked=True)
-
-    def _set_subtree(
-        self, items, idx, parent_title, staged=False, untracked=False, deleted_set=None
-    ):
-        """Add a list of items to a treewidget item."""
-        parent = self.topLevelItem(idx)
-        hide = not bool(items)
-        parent.setHidden(hide)
-
-        # sip v4.14.7 and below leak memory in parent.takeChildren()
-        # so we use this backwards-compatible construct instead
-        while parent.takeChild(0) is not None:
-            pass
-
-        for item in items:
-            deleted = deleted_set is not None and item in deleted_set
-            treeitem = qtutils.create_treeitem(
-                item, staged=staged, deleted=deleted, untracked=untracked
-            )
-            parent.addChild(treeitem)
+            return self._set_subtree(items, UNTRACKED_IDX)
+
+    def _set_subtree(self, items, idx, deleted_set=None, check_exists=False):
+        """Update the paths under a top-level item and report whether rows changed"""
+        # setRowHidden() relayouts every row so only call it when needed.
+        hide = not items
+        if hide != self.isRowHidden(idx, QtCore.QModelIndex()):
+            self.setRowHidden(idx, QtCore.QModelIndex(), hide)
+        changed = self.status_model.set_paths(
+            idx, items, deleted_set=deleted_set, check_exists=check_exists
+        )
         self._expand_items(idx, items)
-
-        if prefs.status_show_totals(self.context):
-            parent.setText(0, f'{parent_title} ({len(items)})')
+        return changed
 
     def _update_column_widths(self):
         self.resizeColumnToContents(0)
@@ -689,9 +925,7 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         if idx in self.expanded_items:
             return
         self.expanded_items.add(idx)
-        item = self.topLevelItem(idx)
-        if item:
-            self.expandItem(item)
+        self.expand(self.status_model.header_index(idx))
 
     def contextMenuEvent(self, event):
         """Create context menus for the repo status tree."""
@@ -1007,16 +1241,8 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
 
     def selected_indexes(self):
         """Returns a list of (category, row) representing the tree selection."""
-        selected = self.selectedIndexes()
-        result = []
-        for idx in selected:
-            if idx.parent().isValid():
-                parent_idx = idx.parent()
-                entry = (parent_idx.row(), idx.row())
-            else:
-                entry = (HEADER_IDX, idx.row())
-            result.append(entry)
-        return result
+        category = self.status_model.category
+        return [(category(index), index.row()) for index in self.selectedIndexes()]
 
     def selection(self):
         """Return the current selection in the repo status tree."""
@@ -1025,12 +1251,9 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         )
 
     def contents(self):
-        """Return all of the current files in a selection.State container"""
+        """Return all of the displayed files in a selection.State container"""
         return selection.State(
-            self._model.staged,
-            self._model.unmerged,
-            self._model.modified,
-            self._model.untracked,
+            *(section.paths for section in self.status_model.sections)
         )
 
     def all_files(self):
@@ -1066,48 +1289,48 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
             if not content:
                 continue
             if idx < len(content):
-                parent = self.topLevelItem(toplevel_idx)
-                item = parent.child(idx)
-                if item is not None:
-                    qtutils.select_item(self, item)
+                index = self.status_model.path_index(toplevel_idx, idx)
+                if index.isValid():
+                    self._select_index(index)
                 return
             idx -= len(content)
 
     def staged(self):
-        return qtutils.get_selected_values(self, STAGED_IDX, self._model.staged)
+        return self._selected_paths(STAGED_IDX)
 
     def unstaged(self):
         return self.unmerged() + self.modified() + self.untracked()
 
     def modified(self):
-        return qtutils.get_selected_values(self, MODIFIED_IDX, self._model.modified)
+        return self._selected_paths(MODIFIED_IDX)
 
     def unmerged(self):
-        return qtutils.get_selected_values(self, UNMERGED_IDX, self._model.unmerged)
+        return self._selected_paths(UNMERGED_IDX)
 
     def untracked(self):
-        return qtutils.get_selected_values(self, UNTRACKED_IDX, self._model.untracked)
-
-    def staged_items(self):
-        return qtutils.get_selected_items(self, STAGED_IDX)
-
-    def unstaged_items(self):
-        return self.unmerged_items() + self.modified_items() + self.untracked_items()
-
-    def modified_items(self):
-        return qtutils.get_selected_items(self, MODIFIED_IDX)
-
-    def unmerged_items(self):
-        return qtutils.get_selected_items(self, UNMERGED_IDX)
+        return self._selected_paths(UNTRACKED_IDX)
+
+    def _selected_rows(self, idx):
+        """Return the sorted rows of the selected paths under a top-level item"""
+        section = self.status_model.sections[idx]
+        rows = [
+            index.row()
+            for index in self.selectionModel().selectedRows()
+            if index.internalPointer() is section
+        ]
+        rows.sort()
+        return rows
 
-    def untracked_items(self):
-        return qtutils.get_selected_items(self, UNTRACKED_IDX)
+    def _selected_paths(self, idx):
+        """Return the selected paths under a top-level item"""
+        paths = self.status_model.sections[idx].paths
+        return [paths[row] for row in self._selected_rows(idx)]
 
     def show_selection(self):
         """Show the selected item."""
         context = self.context
         runtask = self.context.runtask
-        qtutils.scroll_to_item(self, self.currentItem())
+        self._make_current_item_visible()
         # Sync the selection model
         selected = self.selection()
         selection_model = self.selection_model
@@ -1140,20 +1363,9 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
         unmerged = category == UNMERGED_IDX
         untracked = category == UNTRACKED_IDX
 
-        if staged:
-            item = self.staged_items()[0]
-        elif unmerged:
-            item = self.unmerged_items()[0]
-        elif modified:
-            item = self.modified_items()[0]
-        elif untracked:
-            item = self.unstaged_items()[0]
-        else:
-            item = None  # this shouldn't happen
-        assert item is not None
-
-        path = item.path
-        deleted = item.deleted
+        section = self.status_model.sections[category]
+        path = section.paths[self._selected_rows(category)[0]]
+        deleted = section.is_deleted(path)
         # Images are diffed differently.
         # DiffImage transitions the diff mode to image.
         # DiffText transitions the diff mode to text.
@@ -1198,10 +1410,9 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
             MODIFIED_IDX,
             UNTRACKED_IDX,
         ):
-            item = self.topLevelItem(idx)
-            if item.childCount() > 0:
+            if self.status_model.sections[idx].paths:
                 self.clearSelection()
-                self.setCurrentItem(item)
+                self.setCurrentIndex(self.status_model.header_index(idx))
                 return
 
     def move_up(self):
@@ -1213,9 +1424,10 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
             if selected_indexes:
                 category, toplevel_idx = selected_indexes[0]
                 if category == HEADER_IDX:
-                    item = self.itemAbove(self.topLevelItem(toplevel_idx))
-                    if item is not None:
-                        qtutils.select_item(self, item)
+                    header = self.status_model.header_index(toplevel_idx)
+                    index = self.indexAbove(header)
+                    if index.isValid():
+                        self._select_index(index)
                         return
             if all_files:
                 self.select_by_index(len(all_files) - 1)
@@ -1234,9 +1446,10 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
             if selected_indexes:
                 category, toplevel_idx = selected_indexes[0]
                 if category == HEADER_IDX:
-                    item = self.itemBelow(self.topLevelItem(toplevel_idx))
-                    if item is not None:
-                        qtutils.select_item(self, item)
+                    header = self.status_model.header_index(toplevel_idx)
+                    index = self.indexBelow(header)
+                    if index.isValid():
+                        self._select_index(index)
                         return
             if all_files:
                 self.select_by_index(0)
@@ -1248,30 +1461,14 @@ class StatusTreeWidget(QtWidgets.QTreeWidget):
 
     def mousePressEvent(self, event):
         """Keep track of whether to drag URLs or just text"""
-        self._alt_drag = event.modifiers() & Qt.AltModifier
+        self.status_model.include_urls = not event.modifiers() & Qt.AltModifier
         return super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
         """Keep track of whether to drag URLs or just text"""
-        self._alt_drag = event.modifiers() & Qt.AltModifier
+        self.status_model.include_urls = not event.modifiers() & Qt.AltModifier
         return super().mouseMoveEvent(event)
 
-    def mimeData(self, items):
-        """Return a list of absolute-path URLs"""
-        context = self.context
-        paths = qtutils.paths_from_items(items, item_filter=_item_filter)
-        include_urls = not self._alt_drag
-        return qtutils.mimedata_from_paths(context, paths, include_urls=include_urls)
-
-    def mimeTypes(self):
-        """Return the mime types that this widget generates"""
-        return qtutils.path_mimetypes(include_urls=not self._alt_drag)
-
-
-def _item_filter(item):
-    """Filter items down to just those that exist on disk"""
-    return not item.deleted and core.exists(item.path)
-
 
 def view_blame(context):
     """Signal that we should view blame for paths."""
@@ -1349,27 +1546,91 @@ class StatusFilterWidget(QtWidgets.QWidget):
 
         hint = N_('Filter paths...')
         self.text = completion.GitStatusFilterLineEdit(context, hint=hint, parent=self)
-        self.text.setToolTip(hint)
+        self.text.setToolTip(
+            N_(
+                'Filter paths using substrings or glob patterns.\n'
+                'Press Enter to limit the git status scan to matching paths.'
+            )
+        )
         self.setFocusProxy(self.text)
         self._filter = None
+        self.runtask = qtutils.RunTask(parent=self)
+        self.filter_generation = 0
+
+        # Typing is filtered once the user pauses.
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self._filter_paths)
+
+        # Shown while the git status scan is limited to the filter's pathspecs.
+        self.narrowed_label = qtutils.plain_text_label(
+            text=N_('Scan limited'), selectable=False, parent=self
+        )
+        self.narrowed_label.hide()
 
-        self.main_layout = qtutils.hbox(defs.no_margin, defs.spacing, self.text)
+        self.main_layout = qtutils.hbox(
+            defs.no_margin, defs.spacing, self.text, self.narrowed_label
+        )
         self.setLayout(self.main_layout)
 
         widget = self.text
-        widget.changed.connect(self.apply_filter)
-        widget.cleared.connect(self.apply_filter)
-        widget.enter.connect(self.apply_filter)
-        widget.editingFinished.connect(self.apply_filter)
+        widget.textChanged.connect(self.apply_filter)
+        widget.changed.connect(self._filter_paths)
+        widget.cleared.connect(self.clear_filter)
+        widget.enter.connect(self.narrow_scan)
+        widget.editingFinished.connect(self._filter_paths)
 
     def apply_filter(self):
-        """Apply the text filter to the model"""
+        """Filter the status lists after a short delay"""
+        self.filter_timer.start()
+
+    def _filter_paths(self):
+        """Filter the known status lists in the background"""
+        self.filter_timer.stop()
         value = get(self.text)
         if value == self._filter:
             return
         self._filter = value
-        paths = utils.shell_split(value)
+        model = self.context.model
+        if model.filter_paths and utils.shell_split(value) != model.filter_paths:
+            # The scan was limited to pathspecs that no longer match the filter.
+            self._update_path_filter([])
+        status_filter = utils.compile_path_filter(utils.shell_split(value))
+        state = model.worktree_state
+        self.filter_generation += 1
+        task = qtutils.SimpleTask(gitcmds.filter_worktree_state, state, status_filter)
+        result = partial(
+            self._paths_filtered, self.filter_generation, status_filter, state
+        )
+        self.runtask.start(task, result=result)
+
+    def _paths_filtered(self, generation, status_filter, state, filtered):
+        """Display the filtered status lists"""
+        # Discard results for filter text that has since been replaced.
+        if generation != self.filter_generation:
+            return
+        self.context.model.set_status_filter(
+            status_filter, state=state, filtered=filtered
+        )
+
+    def narrow_scan(self):
+        """Re-query git using the filter text as pathspecs"""
+        paths = utils.shell_split(get(self.text))
+        self._update_path_filter(paths)
+        self._filter_paths()
+
+    def clear_filter(self):
+        """Show every path and stop limiting the git status scan"""
+        self._filter_paths()
+        if self.context.model.filter_paths:
+            self._update_path_filter([])
+
+    def _update_path_filter(self, paths):
+        """Limit the git status scan to paths and show when it is limited"""
         self.context.model.update_path_filter(paths)
+        self.narrowed_label.setVisible(bool(paths))
+        self.narrowed_label.setToolTip(' '.join(paths))
 
 
 def customize_copy_actions(context, parent):
@@ -1517,10 +1778,10 @@ def _select_item(widget, path_list, widget_getter, item, current=False):
     # Lookup the item filename in the list and use that index to
     # retrieve the widget item and select it.
     idx = path_list.index(item)
-    item = widget_getter(idx)
+    index = widget_getter(idx)
     if current:
-        widget.setCurrentItem(item)
-    item.setSelected(True)
+        widget.setCurrentIndex(index)
+    widget.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
 
 
 def _apply_toplevel_selection(widget, category, idx):
@@ -1530,42 +1791,43 @@ def _apply_toplevel_selection(widget, category, idx):
     """
     is_top_level_item = category == HEADER_IDX
     if is_top_level_item:
-        root_item = widget.invisibleRootItem()
-        item = root_item.child(idx)
+        model = widget.status_model
+        index = model.header_index(idx)
 
-        if item is not None and item.childCount() == 0:
+        if not model.rowCount(index):
             # The item now has no children. Select a different top-level item
             # corresponding to the previously selected item.
             if idx == STAGED_IDX:
                 # If "Staged" was previously selected try "Modified" and "Untracked".
-                item = _get_first_item_with_children(
-                    root_item.child(MODIFIED_IDX), root_item.child(UNTRACKED_IDX)
+                index = _get_first_header_with_children(
+                    model, MODIFIED_IDX, UNTRACKED_IDX
                 )
             elif idx == UNMERGED_IDX:
                 # If "Unmerged" was previously selected try "Staged".
-                item = _get_first_item_with_children(root_item.child(STAGED_IDX))
+                index = _get_first_header_with_children(model, STAGED_IDX)
             elif idx == MODIFIED_IDX:
                 # If "Modified" was previously selected try "Staged" or "Untracked".
-                item = _get_first_item_with_children(
-                    root_item.child(STAGED_IDX), root_item.child(UNTRACKED_IDX)
+                index = _get_first_header_with_children(
+                    model, STAGED_IDX, UNTRACKED_IDX
                 )
             elif idx == UNTRACKED_IDX:
                 # If "Untracked" was previously selected try "Staged".
-                item = _get_first_item_with_children(root_item.child(STAGED_IDX))
+                index = _get_first_header_with_children(model, STAGED_IDX)
 
-        if item is not None:
+        if index is not None and index.isValid():
             with qtutils.BlockSignals(widget):
-                widget.setCurrentItem(item)
-                item.setSelected(True)
+                widget.setCurrentIndex(index)
+                widget.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
             widget.show_selection()
     return is_top_level_item
 
 
-def _get_first_item_with_children(*items):
-    """Return the first item that contains child items"""
-    for item in items:
-        if item.childCount() > 0:
-            return item
+def _get_first_header_with_children(model, *idxs):
+    """Return the index of the first top-level item that contains child items"""
+    for idx in idxs:
+        index = model.header_index(idx)
+        if model.rowCount(index) > 0:
+            return index
     return None
 
 
@@ -1708,3 +1970,14 @@ class CopyLeadingPathWidget(QtWidgets.QWidget):
     def set_value(self, value):
         """Set the spin-box value"""
         self.spinbox.setValue(value)
+
+
+def conflict_markers_tooltip(lines):
+    """Describe the conflict markers found on the specified lines"""
+    line_numbers = ', '.join(str(line) for line in lines[:MAX_CONFLICT_LINES])
+    if len(lines) > MAX_CONFLICT_LINES:
+        line_numbers += ', ...'
+    return N_('%(count)d conflict markers on lines %(lines)s') % {
+        'count': len(lines),
+        'lines': line_numbers,
+    }
@@ -1,5 +1,7 @@
 """Provides widgets related to submodules"""
 
+from functools import partial
+
 from qtpy import QtWidgets
 from qtpy.QtCore import Qt
 from qtpy.QtCore import Signal
@@ -10,6 +12,7 @@ from .. import core
 from .. import qtutils
 from .. import icons
 from ..i18n import N_
+from ..models import main
 from ..widgets import defs
 from ..widgets import standard
 from ..widgets import text
@@ -176,7 +179,7 @@ class SubmodulesTreeWidget(standard.TreeWidget):
         self.itemDoubleClicked.connect(self.tree_double_clicked)
         model.submodules_changed.connect(self.refresh, type=Qt.QueuedConnection)
         self.update_model.connect(
-            model.update_submodules_list, type=Qt.QueuedConnection
+            partial(model.request_refresh, main.SUBMODULES), type=Qt.QueuedConnection
         )
 
     def refresh(self):
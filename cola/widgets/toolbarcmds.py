@@ -1,21 +1,12 @@
+from functools import partial
+
 from .. import cmds
 from .. import difftool
 from .. import guicmds
-from ..widgets import archive
-from ..widgets import browse
-from ..widgets import compare
-from ..widgets import createbranch
-from ..widgets import createtag
-from ..widgets import dag
-from ..widgets import diff
-from ..widgets import editremotes
-from ..widgets import finder
-from ..widgets import grep
-from ..widgets import merge
-from ..widgets import recent
-from ..widgets import remote
-from ..widgets import search
-from ..widgets import stash
+from .. import utils
+
+# Dialogs and tool windows are imported when their actions are first triggered.
+lazy = partial(utils.lazy_callable, package=__package__)
 
 COMMANDS = {
     'Others::LaunchEditor': {
@@ -60,22 +51,22 @@ COMMANDS = {
     },
     'File::FindFiles': {
         'title': 'Find Files',
-        'action': finder.finder,
+        'action': lazy('.finder', 'finder'),
         'icon': 'zoom_in',
     },
     'File::EditRemotes': {
         'title': 'Edit Remotes...',
-        'action': editremotes.editor,
+        'action': lazy('.editremotes', 'editor'),
         'icon': 'edit',
     },
     'File::RecentModified': {
         'title': 'Recently Modified Files...',
-        'action': recent.browse_recent_files,
+        'action': lazy('.recent', 'browse_recent_files'),
         'icon': 'edit',
     },
     'File::ApplyPatches': {
         'title': 'Apply Patches...',
-        'action': diff.apply_patches,
+        'action': lazy('.diff', 'apply_patches'),
         'icon': 'diff',
     },
     'File::ExportPatches': {
@@ -85,7 +76,7 @@ COMMANDS = {
     },
     'File::SaveAsTarZip': {
         'title': 'Save As Tarball/Zip...',
-        'action': archive.save_archive,
+        'action': lazy('.archive', 'save_archive'),
         'icon': 'file_zip',
     },
     # 'File::Preferences': {
@@ -93,13 +84,29 @@ COMMANDS = {
     #     'action': prefs.preferences,
     #     'icon': 'configure'
     # },
-    'Actions::Fetch': {'title': 'Fetch...', 'action': remote.fetch, 'icon': 'download'},
-    'Actions::Pull': {'title': 'Pull...', 'action': remote.pull, 'icon': 'pull'},
-    'Actions::Push': {'title': 'Push...', 'action': remote.push, 'icon': 'push'},
-    'Actions::Stash': {'title': 'Stash...', 'action': stash.view, 'icon': 'commit'},
+    'Actions::Fetch': {
+        'title': 'Fetch...',
+        'action': lazy('.remote', 'fetch'),
+        'icon': 'download',
+    },
+    'Actions::Pull': {
+        'title': 'Pull...',
+        'action': lazy('.remote', 'pull'),
+        'icon': 'pull',
+    },
+    'Actions::Push': {
+        'title': 'Push...',
+        'action': lazy('.remote', 'push'),
+        'icon': 'push',
+    },
+    'Actions::Stash': {
+        'title': 'Stash...',
+        'action': lazy('.stash', 'view'),
+        'icon': 'commit',
+    },
     'Actions::CreateTag': {
         'title': 'Create Tag...',
-        'action': createtag.create_tag,
+        'action': lazy('.createtag', 'create_tag'),
         'icon': 'tag',
     },
     'Actions::CherryPick': {
@@ -109,7 +116,7 @@ COMMANDS = {
     },
     'Actions::Merge': {
         'title': 'Merge...',
-        'action': merge.local_merge,
+        'action': lazy('.merge', 'local_merge'),
         'icon': 'merge',
     },
     'Actions::AbortMerge': {
@@ -154,12 +161,12 @@ COMMANDS = {
     },
     'Actions::Grep': {
         'title': 'Grep',
-        'action': grep.grep,
+        'action': lazy('.grep', 'grep'),
         'icon': 'search',
     },
     'Actions::Search': {
         'title': 'Search...',
-        'action': search.search,
+        'action': lazy('.search', 'search'),
         'icon': 'search',
     },
     'Commit::Stage': {
@@ -219,7 +226,7 @@ COMMANDS = {
     },
     'Diff::Branches': {
         'title': 'Branches...',
-        'action': compare.compare_branches,
+        'action': lazy('.compare', 'compare_branches'),
         'icon': 'compare',
     },
     'Diff::Diffstat': {
@@ -234,7 +241,7 @@ COMMANDS = {
     },
     'Branch::Create': {
         'title': 'Create...',
-        'action': createbranch.create_new_branch,
+        'action': lazy('.createbranch', 'create_new_branch'),
         'icon': 'branch',
     },
     'Branch::Checkout': {
@@ -279,10 +286,10 @@ COMMANDS = {
     },
     'View::FileBrowser': {
         'title': 'File Browser...',
-        'action': browse.worktree_browser,
+        'action': lazy('.browse', 'worktree_browser'),
         'icon': 'cola',
     },
-    'View::DAG': {'title': 'DAG...', 'action': dag.git_dag, 'icon': 'cola'},
+    'View::DAG': {'title': 'DAG...', 'action': lazy('.dag', 'git_dag'), 'icon': 'cola'},
 }
 #     'Rebase::StartInteractive': {
 #         'title': 'Start Interactive Rebase...',
@@ -1,3 +1,9 @@
+import collections
+import os
+import time
+
+import pytest
+
 from cola import display
 
 
@@ -19,6 +25,88 @@ def test_shorten_paths():
     assert actual[paths[5]] == '/lib/src'
 
 
+def test_shorten_paths_edge_cases():
+    paths = ('b', 'a/b', 'x\\a/b', 'x/a/b', 'dup', 'dup', 'c/', 'c')
+    assert display.shorten_paths(paths) == {
+        'b': 'b',
+        'a/b': 'a/b',
+        'x\\a/b': 'x\\a/b',
+        'x/a/b': 'x/a/b',
+        'dup': 'dup',
+        'c/': '',
+        'c': 'c',
+    }
+    assert display.shorten_paths([]) == {}
+
+
+def shorten_paths_reference(source_paths, max_count=128):
+    """The original implementation that re-splits conflicting paths each round"""
+    result = {}
+    count = 0
+    conflicts = list(source_paths)
+    while conflicts:
+        count += 1
+        suffixes = collections.defaultdict(list)
+        for path in conflicts:
+            suffixes[display.path_suffix(path, count)].append(path)
+        conflicts = []
+        for suffix, paths in suffixes.items():
+            if len(paths) == 1:
+                result[paths[0]] = suffix
+            elif count >= max_count:
+                for path in paths:
+                    result[path] = path
+            else:
+                conflicts.extend(paths)
+    return result
+
+
+def monorepo_paths(depth):
+    """Return a deep monorepo layout with many identically named files"""
+    paths = []
+    for team in range(8):
+        for service in range(25):
+            nested = '/'.join(f'level{idx}' for idx in range(depth))
+            for name in ('BUILD', '__init__.py', 'index.ts'):
+                paths.append(f'teams/t{team}/s{service}/{nested}/src/{name}')
+                paths.append(f'teams/t{team}/{nested}/s{service}/src/{name}')
+    return paths
+
+
+def test_shorten_paths_matches_the_reference_implementation(monkeypatch):
+    paths = monorepo_paths(depth=6)
+    paths.extend(['BUILD', 'src/BUILD', '/abs/src/BUILD', 'src/BUILD'])
+    assert display.shorten_paths(paths) == shorten_paths_reference(paths)
+    # Paths that need more components than the limit are displayed in full.
+    monkeypatch.setattr(display, 'MAX_SUFFIX_COMPONENTS', 4)
+    deep = monorepo_paths(depth=3)
+    assert display.shorten_paths(deep) == shorten_paths_reference(deep, max_count=4)
+
+
+def test_shorten_paths_deep_monorepo():
+    """Conflicts that are only resolved deep in each path match the reference"""
+    paths = monorepo_paths(depth=60)
+    assert display.shorten_paths(paths) == shorten_paths_reference(paths)
+
+
+@pytest.mark.skipif(
+    not os.environ.get('COLA_BENCHMARKS'), reason='set COLA_BENCHMARKS=1 to run'
+)
+def test_shorten_paths_benchmark_deep_monorepo():
+    """Compare timings against the reference. Run with "pytest -s" to see them."""
+    paths = monorepo_paths(depth=60)
+
+    start = time.perf_counter()
+    display.shorten_paths(paths)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shorten_paths_reference(paths)
+    reference_elapsed = time.perf_counter() - start
+
+    print(f'\nshorten_paths: {elapsed:.3f}s reference: {reference_elapsed:.3f}s')
+
+
 def test_normalize_path():
     path = r'C:\games\doom2'
     expect = 'C:/games/doom2'
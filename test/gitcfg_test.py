@@ -23,6 +23,22 @@ def test_string(app_context):
     assert app_context.cfg.get('test.value') == 'test'
 
 
+def test_update_replaces_the_values(app_context):
+    """Readers of the previous values are not affected by an update"""
+    helper.run_git('config', 'test.value', 'old')
+    cfg = app_context.cfg
+    assert cfg.get('test.value') == 'old'
+    values = cfg._all
+
+    helper.run_git('config', 'test.value', 'new')
+    cfg.reset()
+    assert values['test.value'] == 'old'
+    assert cfg.get('test.value') == 'new'
+    assert cfg.get_user_or_system('test.value', 'default') == 'default'
+    assert cfg.get_repo('test.value') == 'new'
+    assert values['test.value'] == 'old'
+
+
 def test_int(app_context):
     """Test int values in get()."""
     helper.run_git('config', 'test.int', '42')
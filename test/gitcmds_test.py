@@ -1,11 +1,16 @@
 """Test the cola.gitcmds module"""
 import os
 
+import pytest
+
 from cola import core
 from cola import gitcmds
+from cola import utils
+from cola import version
 
 from . import helper
 from .helper import app_context
+from .helper import patch
 
 
 # Prevent unused imports lint errors.
@@ -219,3 +224,164 @@ def test_diff_helper(app_context):
     expect_rn = '+A change\r\n'
     actual = gitcmds.diff_helper(app_context, ref='HEAD', cached=True)
     assert expect_n in actual or expect_rn in actual
+
+
+def test_changed_files_for_oids(app_context):
+    """changed_files_for_oids() matches changed_files() for each commit"""
+    helper.commit_files()
+    helper.write_file('A', 'A change\n')
+    helper.write_file('C', 'C\n')
+    helper.run_git('add', 'A', 'C')
+    helper.run_git('commit', '-m', 'change A and add C')
+    helper.write_file('B', 'B change\n')
+    helper.run_git('commit', '-m', 'change B', 'B')
+    helper.run_git('commit', '--allow-empty', '-m', 'empty')
+
+    oids = [app_context.git.rev_parse('--short', f'HEAD~{idx}')[1] for idx in range(4)]
+    result = gitcmds.changed_files_for_oids(app_context, oids)
+    assert list(result) == oids
+    for oid in oids:
+        assert result[oid] == gitcmds.changed_files(app_context, oid)
+    assert result[oids[0]] == []
+    assert result[oids[1]] == ['B']
+    assert result[oids[2]] == ['A', 'C']
+    assert result[oids[3]] == ['A', 'B']
+
+    assert gitcmds.changed_files_for_oids(app_context, []) == {}
+    assert gitcmds.changed_files_for_oids(app_context, ['does-not-exist']) is None
+
+
+def test_log_pages(app_context):
+    """LogPages reads the history in pages that are cached by HEAD"""
+    helper.commit_files()
+    for idx in range(4):
+        helper.run_git('commit', '--allow-empty', '-m', f'commit {idx}')
+
+    revs, summaries = gitcmds.log_helper(app_context, max_count=2, skip=1)
+    assert summaries == ['commit 2', 'commit 1']
+    assert len(revs) == 2
+
+    pages = gitcmds.LogPages(app_context, page_size=2)
+    assert pages.page(0)[1] == ['commit 3', 'commit 2']
+    assert pages.page(1)[0][0] == revs[1]
+    assert pages.page(1)[1] == ['commit 1', 'commit 0']
+    assert pages.page(2)[1] == ['initial commit']
+    assert pages.page(3) == ([], [])
+    # Cached pages are returned until HEAD changes.
+    assert gitcmds.LogPages(app_context, page_size=2).page(0) is pages.page(0)
+    helper.run_git('commit', '--allow-empty', '-m', 'commit 4')
+    pages = gitcmds.LogPages(app_context, page_size=2)
+    assert pages.page(0)[1] == ['commit 4', 'commit 3']
+
+
+def test_worktree_state(app_context):
+    """worktree_state() gathers the results of its concurrent queries"""
+    helper.commit_files()
+    helper.write_file('A', 'change')
+    helper.write_file('B', 'staged')
+    helper.run_git('add', 'B')
+    helper.touch('D', 'C')
+
+    state = gitcmds.worktree_state(app_context, update_index=True)
+    assert state['staged'] == ['B']
+    assert state['modified'] == ['A']
+    assert state['untracked'] == ['C', 'D']
+    assert state['unmerged'] == []
+    assert state['upstream_changed'] == []
+
+    state = gitcmds.worktree_state(app_context, display_untracked=False)
+    assert state['untracked'] == []
+
+
+def test_filter_worktree_state():
+    """filter_worktree_state() only filters the status lists"""
+    state = {
+        'staged': ['a.py', 'b.txt'],
+        'modified': ['c.py'],
+        'unmerged': ['d.txt'],
+        'untracked': [],
+        'upstream_changed': ['b.txt'],
+    }
+    assert gitcmds.filter_worktree_state(state, None) is state
+
+    status_filter = utils.compile_path_filter(['*.py'])
+    filtered = gitcmds.filter_worktree_state(state, status_filter)
+    assert filtered['staged'] == ['a.py']
+    assert filtered['modified'] == ['c.py']
+    assert filtered['unmerged'] == []
+    assert filtered['upstream_changed'] == ['b.txt']
+    assert state['staged'] == ['a.py', 'b.txt']
+
+
+def test_run_queries():
+    """run_queries() returns results by name and raises errors from queries"""
+    results = gitcmds.run_queries({'a': lambda: 1, 'b': lambda: 2})
+    assert results == {'a': 1, 'b': 2}
+
+    def fail():
+        raise ValueError('query failed')
+
+    with pytest.raises(ValueError):
+        gitcmds.run_queries({'a': lambda: 1, 'fail': fail})
+
+
+@pytest.mark.parametrize('pathspec_from_file', (True, False))
+def test_add_reset_and_untrack_paths(app_context, pathspec_from_file):
+    """Paths are staged and unstaged in bulk with or without --pathspec-from-file"""
+    helper.commit_files()
+    paths = [f'file {idx:04d}' for idx in range(1200)]
+    helper.touch(*paths)
+    check_git = version.check_git
+
+    def check_feature(context, key):
+        if key == 'pathspec-from-file':
+            return pathspec_from_file
+        return check_git(context, key)
+
+    with patch('cola.version.check_git', side_effect=check_feature):
+        status, _, _ = gitcmds.add(app_context, paths)
+        assert status == 0
+        assert gitcmds.diff_index_filenames(app_context, 'HEAD') == paths
+
+        status, _, _ = gitcmds.reset_paths(app_context, 'HEAD', paths[:600])
+        assert status == 0
+        assert gitcmds.diff_index_filenames(app_context, 'HEAD') == paths[600:]
+
+    status, _, _ = gitcmds.untrack_paths(app_context, paths[600:])
+    assert status == 0
+    assert gitcmds.diff_index_filenames(app_context, 'HEAD') == []
+    assert gitcmds.untracked_files(app_context) == paths
+
+
+def test_conflict_markers(app_context):
+    """Conflict markers are reported with their line numbers"""
+    helper.write_file(
+        'conflict.txt',
+        'one\n<<<<<<< HEAD\ntwo\n||||||| base\n=======\nthree\n>>>>>>> other\n',
+    )
+    helper.write_file('clean.txt', 'no <<<<<<< markers\n=======\n')
+    helper.touch('empty.txt')
+
+    assert gitcmds.conflict_marker_lines('conflict.txt') == [2, 4, 7]
+    assert gitcmds.conflict_markers([
+        'conflict.txt',
+        'clean.txt',
+        'empty.txt',
+        'missing.txt',
+    ]) == {
+        'conflict.txt': [2, 4, 7],
+        'clean.txt': [],
+        'empty.txt': [],
+        'missing.txt': [],
+    }
+
+
+def test_read_blob(app_context):
+    """Blobs are read from the object database as bytes"""
+    with open('image.bin', 'wb') as f:
+        f.write(b'\x89PNG\r\n\x00\xff')
+    helper.run_git('add', 'image.bin')
+    oid = helper.run_git('rev-parse', ':image.bin').strip()
+
+    assert gitcmds.read_blob(app_context, oid, 'image.bin') == b'\x89PNG\r\n\x00\xff'
+    assert gitcmds.read_blob(app_context, '0' * 40, 'image.bin') is None
@@ -0,0 +1,50 @@
+"""Tests for the guicmds module"""
+import os
+
+from cola import guicmds
+from cola.widgets import selectcommits
+
+from . import helper
+from .helper import app_context
+from .helper import patch
+
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+
+class SelectCommitsAndOutputStub:
+    """Select two separate commits instead of running the dialog"""
+
+    output_dir = 'patches'
+    select_commits_and_output = (
+        selectcommits.SelectCommitsAndOutput.select_commits_and_output
+    )
+
+    def __init__(self, context, model, parent=None, title=None, multiselect=True):
+        self.model = model
+
+    def select_commits(self):
+        model = self.model
+        model.add_page(*model.fetch_page())
+        return [model.revisions[0], model.revisions[2]]
+
+
+def test_export_patches(app_context):
+    """export_patches() groups the selected commits using the loaded revisions"""
+    helper.commit_files()
+    for name in ('C', 'D', 'E'):
+        helper.write_file(name, name)
+        helper.run_git('add', name)
+        helper.run_git('commit', '-m', f'add {name}')
+
+    stub = SelectCommitsAndOutputStub
+    select_commits = patch.object(
+        selectcommits.SelectCommits, 'select_commits', stub.select_commits
+    )
+    with patch.object(selectcommits, 'SelectCommitsAndOutput', stub):
+        with select_commits, patch('cola.qtutils.active_window'):
+            guicmds.export_patches(app_context)
+
+    # The selected commits are not contiguous so they are exported separately.
+    assert sorted(os.listdir('patches')) == ['0001-add-C.patch', '0001-add-E.patch']
@@ -11,6 +11,7 @@ from cola import git
 from cola import gitcfg
 from cola import gitcmds
 from cola.models import main
+from cola.models import tracked
 
 
 # prevent unused imports lint errors.
@@ -94,6 +95,7 @@ def app_context():
     context.git.set_worktree(core.getcwd())
     context.cfg = gitcfg.create(context)
     context.model = main.create(context)
+    context.tracked_paths = tracked.create(context)
 
     context.cfg.reset()
     gitcmds.reset()
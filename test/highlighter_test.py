@@ -0,0 +1,41 @@
+"""Tests for the background syntax highlighter"""
+import pytest
+
+from cola.widgets import highlighter
+
+pytest.importorskip('pygments')
+
+
+def test_lex_blocks_splits_tokens_into_lines():
+    lexer = highlighter.get_lexer_for_filename('example.py', stripnl=False)
+    text = 'x = """a\nb"""\ny = 1\n'
+    blocks = highlighter.lex_blocks(text, lexer)
+    lines = text.split('\n')
+    for line, ranges in zip(lines, blocks):
+        assert sum(length for _, length, _ in ranges) == len(line)
+        assert [start for start, _, _ in ranges] == sorted(
+            start for start, _, _ in ranges
+        )
+    # The string token spans the first two lines.
+    assert blocks[0][-1][2] is blocks[1][0][2]
+
+
+def test_cache_is_keyed_by_oid_and_lexer():
+    lexer = highlighter.get_lexer_for_filename('example.py', stripnl=False)
+    key = highlighter.cache_key('text', lexer, oid='abc123')
+    assert key == ('abc123', lexer.name)
+
+    key = highlighter.cache_key('text', lexer)
+    assert key == highlighter.cache_key('text', lexer)
+    assert key != highlighter.cache_key('other text', lexer)
+
+    blocks = [[(0, 4, None)]]
+    highlighter.cache_blocks(key, blocks)
+    assert highlighter.cached_blocks(key) is blocks
+
+
+def test_cache_is_bounded():
+    for idx in range(highlighter.CACHE_SIZE + 1):
+        highlighter.cache_blocks(('key', idx), [])
+    assert highlighter.cached_blocks(('key', 0)) is None
+    assert highlighter.cached_blocks(('key', highlighter.CACHE_SIZE)) == []
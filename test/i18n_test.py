@@ -1,4 +1,6 @@
 """Tests for the i18n translation module"""
+import gettext
+import io
 import os
 
 import pytest
@@ -8,8 +10,9 @@ from cola.i18n import N_
 
 
 @pytest.fixture(autouse=True)
-def i18n_context():
+def i18n_context(tmp_path, monkeypatch):
     """Perform cleanup/teardown of the i18n module"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
     yield
     i18n.uninstall()
 
@@ -75,3 +78,85 @@ def test_get_filename_for_locale():
 
     actual = i18n.get_filename_for_locale('ja_JP')
     assert os.path.basename(actual) == 'ja.po'
+
+
+def test_compiled_catalog_is_cached():
+    """Compiled catalogs are written to the cache and reused"""
+    filename = i18n.get_filename_for_locale('de_DE')
+    path = i18n.catalog_filename(filename)
+    assert not os.path.exists(path)
+
+    i18n.install('de_DE')
+    assert os.path.exists(path)
+    assert i18n.State.translation.catalog is not None
+    expect = 'Commit aufnehmen'
+    actual = N_('Commit@@verb')
+    assert expect == actual
+
+    mtime = os.stat(path).st_mtime_ns
+    i18n.install('de_DE')
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_compiled_catalog_matches_po_file():
+    """Every translated message is found in the compiled catalog"""
+    filename = i18n.get_filename_for_locale('ja_JP')
+    messages = i18n.read_po_messages(filename)
+    catalog = i18n.load_catalog(filename)
+    assert catalog is not None
+    assert len(catalog) == len(messages) + 1  # Includes the header entry.
+    for msgid, msgstr in messages.items():
+        assert catalog.get(msgid) == msgstr
+    assert catalog.get('does not exist') is None
+    assert catalog.get('') is None
+    catalog.close()
+
+
+def test_corrupt_cached_catalog_is_compiled_again():
+    """Truncated catalogs in the cache are replaced"""
+    filename = i18n.get_filename_for_locale('de_DE')
+    path = i18n.catalog_filename(filename)
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as catalog_file:
+        catalog_file.write(b'\xde\x12\x04\x95\x00\x00\x00\x00')
+
+    catalog = i18n.load_catalog(filename)
+    assert catalog is not None
+    assert catalog.get('Commit@@verb') == 'Commit aufnehmen'
+    catalog.close()
+    assert os.path.getsize(path) > i18n.MO_HEADER.size
+
+
+def test_catalog_rejects_invalid_tables(tmp_path):
+    """Catalogs whose tables lie outside of the file are rejected"""
+    data = bytearray(i18n.mo_data({'Pull': 'Tirer'}))
+    header = list(i18n.MO_HEADER.unpack_from(data, 0))
+    header[6] = len(data)  # The hash table starts at the end of the file.
+    i18n.MO_HEADER.pack_into(data, 0, *header)
+    path = tmp_path / 'invalid.mo'
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        i18n.Catalog(str(path))
+
+
+def test_catalog_lookups_stop_on_a_corrupt_hash_table(tmp_path):
+    """Lookups terminate when every hash table slot is occupied"""
+    data = bytearray(i18n.mo_data({'Pull': 'Tirer', 'Push': 'Pousser'}))
+    _, _, count, _, _, hash_size, hash_offset = i18n.MO_HEADER.unpack_from(data, 0)
+    for idx in range(hash_size):
+        entry = count + 1 if idx % 2 else 1
+        i18n.MO_HASH_ENTRY.pack_into(data, hash_offset + idx * 4, entry)
+    path = tmp_path / 'corrupt.mo'
+    path.write_bytes(bytes(data))
+    catalog = i18n.Catalog(str(path))
+    assert catalog.get('does not exist', 'default') == 'default'
+    assert catalog.get('Pull', 'default') == 'default'
+    catalog.close()
+
+
+def test_mo_data_is_readable_by_gettext():
+    """Compiled catalogs use the standard .mo file format"""
+    messages = {'Pull': 'Tirer', 'Push': 'Pousser', 'Caf\u00e9': 'Caf\u00e9!'}
+    translations = gettext.GNUTranslations(io.BytesIO(i18n.mo_data(messages)))
+    for msgid, msgstr in messages.items():
+        assert translations.gettext(msgid) == msgstr
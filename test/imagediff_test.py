@@ -0,0 +1,67 @@
+"""Tests for the NumPy image comparison engine"""
+import pytest
+from qtpy import QtCore
+from qtpy import QtGui
+from qtpy.QtCore import Qt
+
+from cola.widgets import diff
+from cola.widgets import imagediff
+from cola.widgets import imageview
+
+pytest.importorskip('numpy')
+
+
+def create_image(width, height, color):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32)
+    image.fill(color)
+    return image
+
+
+def test_compare_counts_changed_pixels_and_regions():
+    old_image = create_image(100, 80, Qt.white)
+    new_image = create_image(100, 80, Qt.white)
+    painter = QtGui.QPainter(new_image)
+    painter.fillRect(10, 20, 5, 4, Qt.black)
+    painter.fillRect(70, 60, 3, 3, Qt.red)
+    painter.end()
+
+    result = imagediff.compare(old_image, new_image)
+    assert result.changed == 5 * 4 + 3 * 3
+    assert result.total == 100 * 80
+    assert result.percent == pytest.approx(100.0 * 29 / 8000)
+    assert result.regions == [
+        QtCore.QRect(10, 20, 5, 4),
+        QtCore.QRect(70, 60, 3, 3),
+    ]
+    assert result.heatmap.size() == QtCore.QSize(100, 80)
+    assert result.heatmap.pixelColor(12, 22) == QtGui.QColor(255, 0, 0)
+
+
+def test_compare_ignores_differences_below_the_threshold():
+    old_image = create_image(10, 10, QtGui.QColor(100, 100, 100))
+    new_image = create_image(10, 10, QtGui.QColor(110, 100, 100))
+    assert imagediff.compare(old_image, new_image).changed == 0
+    assert imagediff.compare(old_image, new_image, threshold=5).changed == 100
+
+
+def test_compare_centers_images_of_different_sizes():
+    old_image = create_image(4, 4, Qt.black)
+    new_image = create_image(8, 8, Qt.black)
+    result = imagediff.compare(old_image, new_image)
+    # The 8x8 image is compared against a transparent border around the 4x4 image.
+    assert result.changed == 64 - 16
+    assert result.regions == [QtCore.QRect(0, 0, 8, 8)]
+
+
+def test_load_images_skips_comparing_huge_images():
+    small = create_image(10, 10, Qt.black)
+    # Monochrome images keep the huge image cheap to allocate.
+    huge = QtGui.QImage(4097, 4096, QtGui.QImage.Format_Mono)
+    assert imageview.is_huge(huge)
+    sources = [None, None]
+
+    _, result = diff.load_images(None, sources, [small, small], None)
+    assert result is not None
+    _, result = diff.load_images(None, sources, [small, huge], None)
+    assert result is None
+    assert not diff.can_compare([huge])
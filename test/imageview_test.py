@@ -0,0 +1,53 @@
+"""Tests for the tiled image pyramid used by the image viewer"""
+from qtpy import QtCore
+from qtpy import QtGui
+
+from cola.widgets import imageview
+
+
+def test_pyramid_level():
+    assert imageview.pyramid_level(2.0) == 0
+    assert imageview.pyramid_level(1.0) == 0
+    assert imageview.pyramid_level(0.75) == 0
+    assert imageview.pyramid_level(0.5) == 1
+    assert imageview.pyramid_level(0.3) == 1
+    assert imageview.pyramid_level(0.25) == 2
+    assert imageview.pyramid_level(0.01) == 6
+
+
+def test_build_pyramid_halves_until_one_tile():
+    image = QtGui.QImage(2049, 1000, QtGui.QImage.Format_ARGB32)
+    levels = imageview.build_pyramid(image)
+    sizes = [(level.width(), level.height()) for level in levels]
+    assert sizes == [(1025, 500), (513, 250), (257, 125)]
+
+
+def test_visible_tiles_cover_the_exposed_rect():
+    image = QtGui.QImage(2000, 1200, QtGui.QImage.Format_ARGB32)
+    item = imageview.TiledImageItem()
+    item.set_image(image)
+    item.levels.extend(imageview.build_pyramid(image))
+
+    tiles = list(item.visible_tiles(0, QtCore.QRectF(600, 0, 500, 100)))
+    assert [key for key, _, _ in tiles] == [(0, 1, 0), (0, 2, 0)]
+    assert tiles[1][1] == QtCore.QRect(1024, 0, 512, 512)
+
+    # Level 1 has 1000x600 pixels that are scaled up to cover the whole image.
+    tiles = list(item.visible_tiles(1, item.boundingRect()))
+    assert [key for key, _, _ in tiles] == [
+        (1, 0, 0),
+        (1, 1, 0),
+        (1, 0, 1),
+        (1, 1, 1),
+    ]
+    _, source, target = tiles[-1]
+    assert source == QtCore.QRect(512, 512, 488, 88)
+    assert target == QtCore.QRectF(1024, 1024, 976, 176)
+
+
+def test_downscale_factor_bounds_the_pixel_count():
+    assert imageview.downscale_factor(4096, 4096) == 1
+    assert imageview.downscale_factor(8192, 4096) == 2
+    assert imageview.downscale_factor(40000, 20000) == 8
+    width, height = 40000 // 8, 20000 // 8
+    assert width * height <= imageview.TILED_IMAGE_PIXELS
@@ -4,6 +4,7 @@ import pytest
 
 from cola import core
 from cola import git
+from cola import utils
 from cola.models import main
 from cola.models.main import FETCH, FETCH_HEAD, PULL, PUSH
 
@@ -102,6 +103,143 @@ def test_tags(app_context):
     assert app_context.model.tags == ['test']
 
 
+def test_path_trie(app_context):
+    """Status lists are shared as path trees until they are replaced"""
+    helper.write_file('A', 'change')
+    helper.run_git('add', 'A')
+    os.makedirs('dir/sub')
+    helper.write_file('dir/sub/C', 'C')
+    model = app_context.model
+    model.update_status()
+
+    untracked = model.path_trie('untracked')
+    assert 'dir/sub/C' in untracked
+    assert 'dir/sub' in untracked
+    assert 'A' not in untracked
+    assert model.path_trie('untracked') is untracked
+    assert 'A' in model.path_trie('staged')
+
+    model.update_status()
+    assert model.path_trie('untracked') is not untracked
+
+
+def test_status_filter(app_context):
+    """The status filter applies to the status lists and survives refreshes"""
+    helper.write_file('A', 'change')
+    helper.write_file('C.txt', 'C')
+    helper.write_file('D.py', 'D')
+    model = app_context.model
+    model.update_status()
+    assert model.untracked == ['C.txt', 'D.py']
+
+    model.set_status_filter(utils.compile_path_filter(['*.py']))
+    assert model.modified == []
+    assert model.untracked == ['D.py']
+
+    helper.write_file('E.py', 'E')
+    model.update_status()
+    assert model.untracked == ['D.py', 'E.py']
+
+    model.set_status_filter(None)
+    assert model.modified == ['A']
+    assert model.untracked == ['C.txt', 'D.py', 'E.py']
+
+
+def test_merge_leaves_amend_mode_before_querying_staged(app_context):
+    """Staged paths are compared against HEAD once a merge ends amend mode"""
+    helper.commit_files()
+    helper.write_file('A', 'change')
+    helper.run_git('commit', '-a', '-m', 'change A')
+    model = app_context.model
+    model.update_status()
+    model.set_mode(model.mode_amend)
+    model.update_status()
+    assert model.staged == ['A']
+
+    oid = helper.run_git('rev-parse', 'HEAD').strip()
+    helper.write_file(os.path.join('.git', 'MERGE_HEAD'), oid + '\n')
+    model.update_status()
+    assert model.mode == model.mode_none
+    assert model.staged == []
+
+    # The refresh scheduler also leaves amend mode before querying.
+    model.is_merging = False
+    model.set_mode(model.mode_amend)
+    assert model.head == 'HEAD^'
+    model.request_refresh(main.FILES)
+    assert model.refresh_scheduler.run_pending() == {main.FILES}
+    assert model.mode == model.mode_none
+    assert model.staged == []
+
+
+def test_refresh_scheduler_merges_requests(app_context):
+    """Refresh requests are merged by kind into a single run"""
+    helper.commit_files()
+    helper.write_file('C', 'C')
+    model = app_context.model
+    scheduler = model.refresh_scheduler
+    model.request_refresh(main.FILES)
+    model.request_refresh(main.FILES, update_index=True)
+    model.request_refresh(main.REFS)
+
+    assert scheduler.run_pending() == {main.FILES, main.REFS}
+    assert scheduler.run_pending() == set()
+    assert model.untracked == ['C']
+    assert model.local_branches == ['main']
+    assert scheduler.report() == {
+        'requested': 3,
+        'runs': 1,
+        'saved': 2,
+        'cancelled': 0,
+    }
+
+
+def test_refresh_scheduler_direct_updates(app_context):
+    """Direct updates drop queued refreshes and cancel stale in-flight steps"""
+    model = app_context.model
+    scheduler = model.refresh_scheduler
+    model.request_refresh(main.FILES)
+    model.update_files()
+    assert scheduler.run_pending() == set()
+    assert scheduler.report()['saved'] == 1
+
+    # Updating the files while refreshing the refs makes the files step stale.
+    # Config requests made during the run are absorbed by the running refresh.
+    def refs_updated():
+        model.update_files()
+        model.request_refresh(main.CONFIG)
+
+    model.refs_updated.connect(refs_updated)
+    model.request_refresh(main.STATUS)
+    assert scheduler.run_pending() == {main.REFS, main.CONFIG}
+    assert scheduler.run_pending() == set()
+    assert scheduler.report() == {
+        'requested': 3,
+        'runs': 1,
+        'saved': 2,
+        'cancelled': 1,
+    }
+
+
+def test_refresh_scheduler_applies_config_when_finished(app_context):
+    """The configuration is only re-read by _finished() on the main thread"""
+    model = app_context.model
+    scheduler = model.refresh_scheduler
+    updates = []
+    model.update_config = lambda reset=False: updates.append(reset)
+    model.request_refresh((main.CONFIG, main.REFS))
+
+    kinds = scheduler.run(*scheduler._take_pending())
+    assert kinds == {main.REFS}
+    assert updates == []
+
+    finished = []
+    scheduler.finished.connect(finished.append)
+    scheduler._finished(kinds)
+    assert updates == [False]
+    assert finished == [{main.REFS, main.CONFIG}]
+
+
 def test_remote_args_fetch(mock_context):
     """FETCH swaps arguments vs. PUSH and PULL"""
     (args, kwargs) = main.remote_args(
@@ -0,0 +1,118 @@
+"""Startup benchmarks for the "git cola" command-line interface"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SUBCOMMANDS = (
+    'cola',
+    'about',
+    'am',
+    'archive',
+    'branch',
+    'browse',
+    'clone',
+    'config',
+    'dag',
+    'diff',
+    'fetch',
+    'find',
+    'grep',
+    'merge',
+    'open',
+    'pull',
+    'push',
+    'rebase',
+    'recent',
+    'remote',
+    'search',
+    'stash',
+    'tag',
+    'version',
+)
+
+# Upper bounds for the number of cola modules imported before a subcommand runs.
+# The bounds leave room for about ten new modules over today's counts (46 and 70).
+# Raise them deliberately when adding modules that are needed at startup.
+MAX_MODULES_PARSE_ARGS = 56
+MAX_MODULES_MAIN_VIEW = 80
+
+# Dialogs and tool windows should only be imported when they are used.
+LAZY_MODULES = (
+    'cola.widgets.about',
+    'cola.widgets.archive',
+    'cola.widgets.browse',
+    'cola.widgets.clone',
+    'cola.widgets.compare',
+    'cola.widgets.dag',
+    'cola.widgets.diff',
+    'cola.widgets.finder',
+    'cola.widgets.gitactivity',
+    'cola.widgets.grep',
+    'cola.widgets.main',
+    'cola.widgets.merge',
+    'cola.widgets.remote',
+    'cola.widgets.search',
+    'cola.widgets.stash',
+)
+
+SCRIPT = """
+import json
+import sys
+
+from cola import main
+
+def cola_modules():
+    return sorted(name for name in sys.modules if name.startswith('cola'))
+
+subcommand = sys.argv[1]
+main.parse_args([subcommand])
+result = {subcommand: cola_modules()}
+if subcommand == 'cola':
+    from cola.widgets import main as main_widget
+    result['MainView'] = cola_modules()
+
+json.dump(result, sys.stdout)
+"""
+
+
+@pytest.fixture(scope='module')
+def imported_modules():
+    """Return the cola modules imported after parsing each subcommand
+
+    Each subcommand is parsed in a fresh interpreter so that the modules imported
+    by one subcommand are not attributed to another.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-c', SCRIPT, subcommand],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for subcommand in SUBCOMMANDS
+    ]
+    result = {}
+    for process in processes:
+        output, _ = process.communicate()
+        assert process.returncode == 0
+        result.update(json.loads(output))
+    return result
+
+
+@pytest.mark.parametrize('subcommand', SUBCOMMANDS)
+def test_parse_args_imports_are_bounded(imported_modules, subcommand):
+    modules = imported_modules[subcommand]
+    assert len(modules) <= MAX_MODULES_PARSE_ARGS, modules
+    for name in LAZY_MODULES:
+        assert name not in modules
+
+
+def test_main_view_imports_are_bounded(imported_modules):
+    modules = imported_modules['MainView']
+    assert len(modules) <= MAX_MODULES_MAIN_VIEW, modules
+    assert 'cola.widgets.dag' not in modules
+    assert 'cola.widgets.remote' not in modules
@@ -0,0 +1,172 @@
+"""Tests for the startup performance measurements"""
+import json
+import sys
+
+from cola import perf
+
+
+def test_timer_phase_records_first_run_only():
+    timer = perf.Timer()
+    with timer.phase('startup'):
+        pass
+    elapsed = timer.elapsed('startup')
+    with timer.phase('startup'):
+        pass
+    assert timer.elapsed('startup') == elapsed
+    assert timer.is_stopped('startup')
+    assert not timer.is_stopped('missing')
+
+    phases = timer.phases()
+    assert len(phases) == 1
+    assert phases[0]['name'] == 'startup'
+    assert phases[0]['start'] >= 0.0
+
+
+def test_command_stats_stop_recording():
+    stats = perf.CommandStats()
+    stats.record(['git', 'status', '--porcelain', '-z'], perf.ORIGIN, 0.5)
+    stats.stop()
+    stats.record(['git', 'log'], perf.ORIGIN, 1.0)
+
+    report = stats.report()
+    assert report['count'] == 1
+    assert report['duration'] == 0.5
+    assert report['commands'][0]['command'] == 'git status --porcelain'
+
+
+def test_import_timer_records_new_modules(tmp_path, monkeypatch):
+    tmp_path.joinpath('perf_test_module.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'perf_test_module', raising=False)
+
+    timer = perf.ImportTimer()
+    timer.install()
+    try:
+        import cola.perf  # noqa: F401  (already imported; not recorded)
+        import perf_test_module  # noqa: F401
+    finally:
+        timer.uninstall()
+        sys.modules.pop('perf_test_module', None)
+
+    modules = [entry['module'] for entry in timer.report()]
+    assert modules == ['perf_test_module']
+    for entry in timer.report():
+        assert entry['cumulative'] >= entry['self']
+
+
+def test_startup_profile_completes_once(tmp_path):
+    profile = perf.StartupProfile()
+    calls = []
+    profile.on_complete(calls.append)
+    with profile.timer.phase('parse_args'):
+        pass
+    profile.complete()
+    profile.complete()
+    assert calls == [profile]
+
+    path = tmp_path / 'report.json'
+    profile.write(str(path))
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report['phases'][0]['name'] == 'parse_args'
+    assert report['git']['count'] == 0
+    assert 'imports' not in report
+
+
+def test_git_trace_aggregates_and_exports():
+    trace = perf.GitTrace(size=3)
+    stack = (perf.Frame('cola.gitcmds', 'status', 10), perf.Frame('cola.cmds', 'do', 5))
+    trace.record(['git', '-c', 'a=b', 'status'], perf.ORIGIN, 0.25, stack=stack)
+    trace.record(['git', 'log', '-1'], perf.ORIGIN + 0.5, 0.5, stdout_bytes=10)
+    trace.record(['git', 'status'], perf.ORIGIN + 1.0, 0.125, status=1, stack=stack)
+    trace.record(['git', 'status'], perf.ORIGIN + 2.0, 0.125, stack=stack)
+
+    # The oldest record was dropped from the ring buffer.
+    records = trace.snapshot()
+    assert len(records) == 3
+    assert records[0].subcommand == 'log'
+    assert records[1].caller == 'cola.gitcmds.status:10'
+    assert records[0].caller == '<unknown>'
+
+    commands = trace.by_command()
+    assert [group['name'] for group in commands] == ['log', 'status']
+    assert commands[1]['count'] == 2
+    assert commands[1]['total'] == 0.25
+    callers = trace.by_caller()
+    assert callers[0]['name'] == '<unknown>'
+    assert callers[0]['stdout_bytes'] == 10
+
+    events = trace.chrome_trace()['traceEvents']
+    complete = [event for event in events if event['ph'] == 'X']
+    assert [event['name'] for event in complete] == ['log', 'status', 'status']
+    assert complete[1]['dur'] == 125000.0
+
+    profile = trace.speedscope()
+    frames = [frame['name'] for frame in profile['shared']['frames']]
+    assert frames == ['git log', 'cola.cmds.do', 'cola.gitcmds.status', 'git status']
+    events = profile['profiles'][0]['events']
+    assert [event['type'] for event in events[:4]] == ['O', 'C', 'O', 'O']
+    assert events[-1] == {'type': 'C', 'frame': 1, 'at': events[-1]['at']}
+
+
+def test_git_trace_records_since():
+    trace = perf.GitTrace(size=2)
+    assert trace.records_since(0) == (0, [])
+    trace.record(['git', 'status'], perf.ORIGIN, 0.1)
+    count, records = trace.records_since(0)
+    assert count == 1
+    assert [record.subcommand for record in records] == ['status']
+
+    trace.record(['git', 'log'], perf.ORIGIN, 0.1)
+    trace.record(['git', 'diff'], perf.ORIGIN, 0.1)
+    count, records = trace.records_since(count)
+    assert count == 3
+    assert [record.subcommand for record in records] == ['log', 'diff']
+    assert trace.records_since(count) == (3, [])
+
+    # Commands dropped from the ring buffer are skipped.
+    trace.record(['git', 'a'], perf.ORIGIN, 0.1)
+    trace.record(['git', 'b'], perf.ORIGIN, 0.1)
+    trace.record(['git', 'c'], perf.ORIGIN, 0.1)
+    count, records = trace.records_since(count)
+    assert count == 6
+    assert [record.subcommand for record in records] == ['b', 'c']
+
+    trace.clear()
+    assert trace.records_since(count) == (0, [])
+
+
+def test_record_git_command_records_the_caller_when_enabled(monkeypatch):
+    trace = perf.GitTrace()
+    monkeypatch.setattr(perf, 'git_trace', trace)
+    stack = (
+        perf.Frame('cola.gitcmds', 'status', 10),
+        perf.Frame('cola.cmds', 'do', 20),
+    )
+    monkeypatch.setattr(
+        perf, 'call_stack', lambda limit=perf.MAX_STACK_DEPTH: stack[:limit]
+    )
+    perf.record_git_command(['git', 'status'], perf.ORIGIN, 0.1, 0, 6)
+    (record,) = trace.snapshot()
+    assert record.stdout_bytes == 6
+    assert record.thread
+    # Full stacks are only captured while the git activity panel is visible.
+    assert record.stack == stack[:1]
+    assert record.caller == 'cola.gitcmds.status:10'
+
+    trace.capture_stacks = True
+    perf.record_git_command(['git', 'status'], perf.ORIGIN, 0.1)
+    assert trace.snapshot()[-1].stack == stack
+
+
+def test_call_stack_skips_non_cola_frames():
+    # Test modules are not part of the cola package.
+    assert perf.call_stack(depth=1) == ()
+
+
+def test_call_stack_stops_at_the_limit(monkeypatch):
+    monkeypatch.setattr(perf, 'TRACE_SKIP_MODULES', ())
+    frames = perf.call_stack(depth=0, limit=1)
+    assert len(frames) == 1
+    assert frames[0].module == 'cola.perf'
+    assert frames[0].function == 'call_stack'
+    assert perf.call_stack(depth=0, limit=0) == ()
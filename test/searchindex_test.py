@@ -0,0 +1,90 @@
+"""Tests for the cola.searchindex module"""
+from cola import searchindex
+
+
+def test_substring_index_case_insensitive():
+    """Case-insensitive matches are returned in case-insensitive order"""
+    index = searchindex.SubstringIndex(['README.md', 'src/read.c', 'docs/index'])
+    assert index.filter('read', False) == ['README.md', 'src/read.c']
+
+
+def test_substring_index_case_sensitive():
+    """Case-sensitive matches are sorted by their case-sensitive value"""
+    index = searchindex.SubstringIndex(['b/Foo', 'a/Foo', 'a/foo'])
+    assert index.filter('Foo', True) == ['a/Foo', 'b/Foo']
+    assert index.filter('', True) == ['a/Foo', 'a/foo', 'b/Foo']
+
+
+def test_substring_index_long_queries():
+    """Queries longer than the n-gram size are verified against each candidate"""
+    candidates = ['abcdef', 'abcxdef', 'xabcdefx', 'def']
+    index = searchindex.SubstringIndex(candidates)
+    assert index.filter('abcdef', False) == ['abcdef', 'xabcdefx']
+    # Narrowing and widening queries reuse the cached postings.
+    assert index.filter('abc', False) == ['abcdef', 'abcxdef', 'xabcdefx']
+    assert index.filter('ab', False) == ['abcdef', 'abcxdef', 'xabcdefx']
+    assert index.filter('zzz', False) == []
+
+
+def test_substring_index_sort_key():
+    """A custom sort key controls the order of the results"""
+    refs = ['origin/main', 'main', 'topic/main']
+    index = searchindex.SubstringIndex(refs, sort_key=lambda ref: (len(ref), ref))
+    assert index.filter('main', False) == ['main', 'topic/main', 'origin/main']
+
+
+def test_path_index_adds_directories():
+    """Parent directories are matched alongside files"""
+    index = searchindex.PathIndex(['src/lib/a.py', 'src/lib/b.py', 'setup.py'])
+    assert index.dirs == {'src', 'src/lib'}
+    assert index.filter('lib', False) == ['src/lib', 'src/lib/a.py', 'src/lib/b.py']
+
+
+def test_path_trie_normalizes_slashes():
+    """Repeated slashes are collapsed when inserting paths"""
+    trie = searchindex.PathTrie(['foo///bar///baz'])
+    assert trie.files == {'foo/bar/baz'}
+    assert trie.dirs == {'foo', 'foo/bar'}
+    assert trie.children('foo') == ['bar']
+    assert trie.children('missing') == []
+
+
+def test_path_trie_membership_and_listing():
+    """Files and directories can be tested, listed and filtered by prefix"""
+    trie = searchindex.PathTrie([
+        'src/lib/__init__.py',
+        'src/app/__init__.py',
+        'src/app/main.py',
+        'src/sub',  # A submodule is a file and a directory.
+        'src/sub/file.txt',
+        'README.md',
+    ])
+    assert len(trie) == 10
+    assert 'src/app' in trie
+    assert 'src/app/main.py' in trie
+    assert 'src/ap' not in trie
+    assert trie.is_file('src/sub')
+    assert trie.is_dir('src/sub/')
+    assert not trie.is_dir('README.md')
+
+    assert trie.children('src') == ['app', 'lib', 'sub']
+    assert trie.listdir('src/') == (['src/app', 'src/lib', 'src/sub'], [])
+    assert trie.listdir('src/app') == ([], ['src/app/__init__.py', 'src/app/main.py'])
+    assert trie.startswith('src/a') == [
+        'src/app',
+        'src/app/__init__.py',
+        'src/app/main.py',
+    ]
+    assert trie.startswith('src/app/m') == ['src/app/main.py']
+    assert trie.startswith('missing/') == []
+    assert sorted(trie) == sorted(trie.paths())
+
+
+def test_path_trie_shares_components():
+    """Names are interned and directories link to their parents"""
+    trie = searchindex.PathTrie(['a/b/__init__.py', 'c/__init__.py'])
+    node_b = trie.root.dirs['a'].dirs['b']
+    node_c = trie.root.dirs['c']
+    assert node_b.path() == 'a/b'
+    assert node_b.parent.parent is trie.root
+    assert next(iter(node_b.files)) is next(iter(node_c.files))
@@ -1,8 +1,10 @@
 """Test the cola.settings module"""
 import os
+import threading
 
 import pytest
 
+from cola import settings as settings_mod
 from cola.settings import Settings
 
 from . import helper
@@ -87,3 +89,67 @@ def test_rename_bookmark():
     expect = ['a', 'test', 'c']
     actual = [i['name'] for i in settings.bookmarks]
     assert expect == actual
+
+
+def test_validate_paths_times_out_hung_paths():
+    """Paths that cannot be verified in time are reported as unknown"""
+    hung = threading.Event()
+
+    def verify(path):
+        if path == 'hung':
+            hung.wait()
+        return path == 'valid'
+
+    paths = ['valid', 'hung', 'invalid']
+    try:
+        result = settings_mod.validate_paths(paths, verify=verify, timeout=0.2)
+    finally:
+        hung.set()
+    assert result == {'valid': True, 'hung': None, 'invalid': False}
+
+
+def test_validate_repos_caches_results():
+    """Validation results are cached in the settings until they expire"""
+    calls = []
+
+    def verify(path):
+        calls.append(path)
+        return path == '/tmp/valid'
+
+    settings = Settings.read(verify=verify)
+    settings.add_bookmark('/tmp/valid', 'valid')
+    settings.add_bookmark('/tmp/missing', 'missing')
+    paths = ['/tmp/valid', '/tmp/missing']
+
+    expect = {'/tmp/valid': True, '/tmp/missing': False}
+    assert settings.validate_repos(paths) == expect
+    assert sorted(calls) == sorted(paths)
+    settings.save()
+
+    # The cached results are used after reloading the settings.
+    calls.clear()
+    settings = Settings.read(verify=verify)
+    assert settings.validate_repos(paths) == expect
+    assert calls == []
+
+    # Expired entries are verified again.
+    assert settings.validate_repos(paths, ttl=-1) == expect
+    assert sorted(calls) == sorted(paths)
+
+    # Entries for removed bookmarks are forgotten.
+    settings.remove_bookmark('/tmp/missing', 'missing')
+    settings.update_repo_status({})
+    assert settings.cached_repo_status('/tmp/valid')
+    assert settings.cached_repo_status('/tmp/missing') is None
+
+
+def test_remove_missing_ignores_cached_results():
+    """Pruning entries verifies the paths again"""
+    settings = Settings.read(verify=lambda path: False)
+    settings.add_bookmark('/tmp/missing', 'missing')
+    settings.add_recent('/tmp/missing', 8)
+    settings.update_repo_status({'/tmp/missing': True})
+    settings.remove_missing_bookmarks()
+    settings.remove_missing_recent()
+    assert settings.bookmarks == []
+    assert settings.recent == []
@@ -19,3 +19,23 @@ def assert_spellcheck(check):
     for word in check.read():
         assert word is not None
         assert isinstance(word, compat.ustr)
+
+
+def test_spellcheck_words_skips_code_urls_paths_and_oids():
+    text = ' '.join([
+        "Don't call `git_cola()` from https://example.com/x or",
+        '~/src/cola/main.py since abc1234 and deadbeef42',
+    ])
+    actual = [word for _, word in spellcheck.words(text)]
+    assert actual == ["Don't", 'call', 'from', 'or', 'since', 'and']
+
+
+def test_spellcheck_check_caches_verdicts():
+    path = helper.fixture('unicode.txt')
+    check = spellcheck.NorvigSpellCheck(words=path)
+    assert not check.check('colaword')
+    generation = check.generation
+    # Adding words invalidates the cached verdicts.
+    check.add_word('colaword')
+    assert check.generation != generation
+    assert check.check('colaword')
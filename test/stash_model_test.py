@@ -50,3 +50,20 @@ def test_stash_info_on_branch_with_slash(app_context):
         'On feature/a: some message',
         'On a: some message',
     )
+
+
+def test_stash_diff_includes_stat_and_patch(app_context):
+    helper.commit_files()
+    helper.write_file('A', 'change\n')
+    helper.run_git('stash', 'save', 'some message')
+    model = StashModel(app_context)
+    revid = model.stash_info()[1][0]
+    assert model.cached_stash_diff(revid) is None
+
+    diff = model.stash_diff(revid)
+    assert ' A | ' in diff
+    assert '1 file changed' in diff
+    assert '+change' in diff
+    # Diffs are cached by the stash commit's oid.
+    assert model.cached_stash_diff(revid) == diff
+    assert StashModel(app_context).stash_diff(revid) == diff
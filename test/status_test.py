@@ -0,0 +1,118 @@
+"""Tests for the status tree model"""
+from qtpy import QtCore
+from qtpy.QtCore import Qt
+
+from cola.widgets import status
+
+
+def create_model():
+    """Create a status model and record the rows that are inserted and removed"""
+    model = status.StatusModel(None)
+    model.changes = []
+    model.rowsInserted.connect(
+        lambda parent, first, last: model.changes.append(('insert', first, last))
+    )
+    model.rowsRemoved.connect(
+        lambda parent, first, last: model.changes.append(('remove', first, last))
+    )
+    return model
+
+
+def test_set_paths_only_changes_the_differing_rows():
+    model = create_model()
+    model.set_paths(status.MODIFIED_IDX, ['a', 'b', 'c', 'd'])
+    assert model.changes == [('insert', 0, 3)]
+    assert model.rowCount(model.header_index(status.MODIFIED_IDX)) == 4
+
+    model.changes = []
+    model.set_paths(status.MODIFIED_IDX, ['a', 'b', 'c', 'd'])
+    assert model.changes == []
+
+    model.set_paths(status.MODIFIED_IDX, ['a', 'b1', 'b2', 'd'])
+    assert model.changes == [('remove', 1, 2), ('insert', 1, 2)]
+
+    model.changes = []
+    model.set_paths(status.MODIFIED_IDX, [])
+    assert model.changes == [('remove', 0, 3)]
+    assert model.rowCount(model.header_index(status.STAGED_IDX)) == 0
+
+
+def test_diff_paths():
+    assert status.diff_paths([], []) == []
+    assert status.diff_paths(['a', 'b'], ['a', 'b']) == []
+    assert status.diff_paths([], ['a', 'b']) == [(0, 0, 0, 2)]
+    assert status.diff_paths(['a', 'b'], []) == [(0, 2, 0, 0)]
+    old = ['a', 'c', 'd', 'f', 'g']
+    new = ['b', 'c', 'e', 'f', 'g', 'h']
+    assert status.diff_paths(old, new) == [
+        (0, 1, 0, 1),
+        (2, 3, 2, 3),
+        (5, 5, 5, 6),
+    ]
+
+
+def test_set_paths_applies_scattered_changes_and_keeps_the_selection():
+    model = create_model()
+    paths = [f'file{idx:03d}' for idx in range(100)]
+    model.set_paths(status.MODIFIED_IDX, paths)
+    selection = QtCore.QItemSelectionModel(model)
+    selected = model.path_index(status.MODIFIED_IDX, 50)
+    selection.setCurrentIndex(selected, QtCore.QItemSelectionModel.ClearAndSelect)
+
+    model.changes = []
+    new_paths = sorted({'file000a', 'file089a'}.union(paths[:10], paths[11:]))
+    assert model.set_paths(status.MODIFIED_IDX, new_paths)
+    assert model.changes == [('insert', 90, 90), ('remove', 10, 10), ('insert', 1, 1)]
+    assert model.sections[status.MODIFIED_IDX].paths == new_paths
+    assert [model.path(index) for index in selection.selectedRows()] == ['file050']
+    assert model.path(selection.currentIndex()) == 'file050'
+
+    model.changes = []
+    assert not model.set_paths(status.MODIFIED_IDX, list(new_paths))
+    assert model.changes == []
+
+
+def test_path_indexes():
+    model = create_model()
+    model.set_paths(status.UNTRACKED_IDX, ['new.txt'])
+    header = model.header_index(status.UNTRACKED_IDX)
+    index = model.path_index(status.UNTRACKED_IDX, 0)
+    assert model.parent(index) == header
+    assert not model.parent(header).isValid()
+    assert model.category(header) == status.HEADER_IDX
+    assert model.category(index) == status.UNTRACKED_IDX
+    assert model.path(index) == 'new.txt'
+    assert model.data(index) == 'new.txt'
+    assert model.data(header) == 'Untracked'
+    assert not model.path_index(status.UNTRACKED_IDX, 1).isValid()
+    assert model.flags(index) & Qt.ItemIsDragEnabled
+    assert not model.flags(header) & Qt.ItemIsDragEnabled
+
+    model.show_totals = True
+    assert model.data(header) == 'Untracked (1)'
+
+
+def test_icons_and_deleted_flags_are_created_on_demand():
+    model = create_model()
+    paths = [f'file{idx}.txt' for idx in range(1000)]
+    model.set_paths(status.STAGED_IDX, paths, deleted_set={'file1.txt'})
+    section = model.sections[status.STAGED_IDX]
+    assert section.icons == {}
+
+    assert not model.is_deleted(model.path_index(status.STAGED_IDX, 0))
+    assert model.is_deleted(model.path_index(status.STAGED_IDX, 1))
+    icon = model.data(model.path_index(status.STAGED_IDX, 1), Qt.DecorationRole)
+    assert icon is not None
+    assert list(section.icons) == ['file1.txt']
+
+
+def test_unmerged_paths_are_checked_on_disk(tmp_path):
+    model = create_model()
+    existing = tmp_path / 'exists.txt'
+    existing.write_text('')
+    missing = tmp_path / 'missing.txt'
+    model.set_paths(
+        status.UNMERGED_IDX, [str(existing), str(missing)], check_exists=True
+    )
+    assert not model.is_deleted(model.path_index(status.UNMERGED_IDX, 0))
+    assert model.is_deleted(model.path_index(status.UNMERGED_IDX, 1))
@@ -0,0 +1,68 @@
+"""Tests for the cola.models.tracked module"""
+from cola.models import tracked
+
+from . import helper
+from .helper import app_context
+
+
+# Prevent unused imports lint errors.
+assert app_context is not None
+
+PATHS = [
+    'README.md',
+    'src/lib/a.py',
+    'src/lib/b.py',
+    'src/main.py',
+    'src/main.py.orig',
+    'test/a_test.py',
+]
+
+
+def test_snapshot_round_trip():
+    """Front-coded paths are decoded back into the original sorted list"""
+    paths = sorted(f'dir{idx % 7}/sub{idx % 3}/file{idx}.txt' for idx in range(100))
+    snapshot = tracked.PathSnapshot(paths)
+    assert len(snapshot) == 100
+    assert snapshot.paths() == paths
+    assert paths[42] in snapshot
+    assert 'dir0/missing.txt' not in snapshot
+    assert '' not in snapshot
+
+
+def test_snapshot_listdir():
+    """Directory listings come from the directory-children index"""
+    snapshot = tracked.PathSnapshot(PATHS)
+    assert snapshot.listdir('./') == (['src', 'test'], ['README.md'])
+    assert snapshot.listdir('src/') == (
+        ['src/lib'],
+        ['src/main.py', 'src/main.py.orig'],
+    )
+    assert snapshot.children('src/lib') == ['a.py', 'b.py']
+    assert snapshot.is_dir('src/lib')
+    assert not snapshot.is_dir('src/main.py')
+    assert snapshot.file_dirs() == {'', 'src', 'src/lib', 'test'}
+
+
+def test_snapshot_filter():
+    """Paths are filtered using "git ls-files" style glob patterns"""
+    snapshot = tracked.PathSnapshot(PATHS)
+    assert snapshot.filter([]) == PATHS
+    assert snapshot.filter(['*lib*']) == ['src/lib/a.py', 'src/lib/b.py']
+    assert snapshot.filter(['*main*', '*README*']) == [
+        'README.md',
+        'src/main.py',
+        'src/main.py.orig',
+    ]
+
+
+def test_tracked_paths_follow_the_index(app_context):
+    """The snapshot is reloaded when the index changes"""
+    tracked_paths = app_context.tracked_paths
+    snapshot = tracked_paths.snapshot()
+    assert snapshot.paths() == ['A', 'B']
+    assert tracked_paths.snapshot() is snapshot
+
+    helper.touch('C')
+    helper.run_git('add', 'C')
+    snapshot = tracked_paths.snapshot()
+    assert snapshot.paths() == ['A', 'B', 'C']
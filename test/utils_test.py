@@ -108,3 +108,44 @@ def test_select_directory_prefers_directories():
         assert expect == actual
     finally:
         os.remove(filename)
+
+
+def test_compile_path_filter():
+    """Substrings match anywhere and globs match whole paths with smart case"""
+    assert utils.compile_path_filter([]) is None
+    assert utils.compile_path_filter(['']) is None
+
+    search = utils.compile_path_filter(['readme', 'src/*.Py']).search
+    assert search('docs/README.md')
+    assert search('src/cola/app.Py')
+    assert not search('src/cola/app.py')
+    assert not search('lib/src/app.Py')
+
+    search = utils.compile_path_filter(['a[b]c', 'x.y']).search
+    assert search('abc')
+    assert search('dir/x.y')
+    assert not search('xzy')
+
+
+def test_lazy_callable_imports_on_call():
+    join = utils.lazy_callable('.path', 'join', package='os')
+    expect = os.path.join('a', 'b')
+    actual = join('a', 'b')
+    assert expect == actual
+
+
+def test_slice_func():
+    """slice_func() calls the function over slices and combines the results"""
+    items = [str(idx) for idx in range(300)]
+    slices = []
+
+    def map_func(paths):
+        slices.append(paths)
+        return (len(slices) - 1, paths[0], '')
+
+    status, out, err = utils.slice_func(items, map_func)
+    assert [len(paths) for paths in slices] == [128, 128, 44]
+    assert status == 2
+    assert out == '0\n128\n256'
+    assert err == '\n\n'
+    assert utils.slice_func([], map_func) == (0, '', '')